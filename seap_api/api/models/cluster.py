@@ -1,21 +1,61 @@
 from django_mongoengine import Document
-from mongoengine import ReferenceField, ListField
+from mongoengine import (
+    EmbeddedDocument, EmbeddedDocumentField, FloatField, IntField, ReferenceField, ListField, StringField
+)
 from ..models.item import Item
 
 
+class ClusterStats(EmbeddedDocument):
+    """
+    Statistics of a cluster, kept up to date on every write:
+    radius is the largest name distance from the core point to a member,
+    the price fields summarize the unit prices of the members
+    (price_quantiles in the order of PRICE_QUANTILES).
+    """
+
+    size = IntField(default=0)
+    radius = IntField(default=0)
+    price_median = FloatField(default=0)
+    price_quantiles = ListField(FloatField())
+    price_mad = FloatField(default=0)
+
+
+class ClusterPriceModel(EmbeddedDocument):
+    """
+    Reference unit price of a cluster used by the fraud scoring, computed
+    when the members change; version is the PRICE_MODEL_VERSION it was
+    computed with.
+    """
+
+    baseline = FloatField(required=True)
+    version = IntField(required=True)
+
+
 class Cluster(Document):
     """
     MongoDB Document for Cluster
     Usage: from api.models.cluster import Cluster
+    model_version is the cluster model version of the last online write to
+    the cluster, PENDING_MODEL_VERSION while the write is being saved.
     """
 
+    PENDING_MODEL_VERSION = -1
+
     core_point = ReferenceField(Item, required=True)
     list_of_items = ListField(ReferenceField(Item), required=True)
+    category = StringField()
+    # suma distantelor de la fiecare membru (in ordinea din list_of_items) la ceilalti
+    distance_sums = ListField(FloatField())
+    stats = EmbeddedDocumentField(ClusterStats)
+    price_model = EmbeddedDocumentField(ClusterPriceModel)
+    model_version = IntField(default=0)
 
     meta = {
         "collection": "clusters",
         "indexes": [
             "core_point",
+            "category",
+            "model_version",
             {"fields": ["list_of_items"], "sparse": True}
         ]
     }
@@ -0,0 +1,20 @@
+from django_mongoengine import Document
+from mongoengine import DateTimeField, IntField, StringField
+
+
+class ClusterVersion(Document):
+    """
+    MongoDB Document for the version of the published clusters
+    Usage: from api.models.cluster_version import ClusterVersion
+    One document per counter (name): the "cluster_model" version grows on
+    every write to a cluster, so the processes that keep the clusters in
+    memory know when to read the updated clusters and stored fraud scores
+    know they are stale; the "clusters" version grows only when clusters
+    are published or deleted, so those processes load all the clusters again.
+    """
+
+    name = StringField(primary_key=True, default="cluster_model")
+    version = IntField(default=0)
+    updated_at = DateTimeField()
+
+    meta = {"collection": "cluster_versions"}
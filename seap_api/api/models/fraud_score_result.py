@@ -0,0 +1,32 @@
+from django_mongoengine import Document
+from mongoengine import DateTimeField, IntField, StringField
+
+# rezultatele nerescrise in acest interval sunt sterse de MongoDB (index TTL)
+# schimbarea valorii cere stergerea indexului existent pe created_at
+RESULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+class FraudScoreResult(Document):
+    """
+    MongoDB Document for the last fraud score computed for an acquisition
+    Usage: from api.models.fraud_score_result import FraudScoreResult
+    The result is valid only for the cluster model version and the price
+    model version it was computed with, and for the same items (items_hash).
+    Entries not written again for RESULT_TTL_SECONDS are removed by MongoDB;
+    created_at is a UTC time, as the TTL index expects.
+    """
+
+    acquisition_id = IntField(primary_key=True)
+    model_version = IntField(required=True)
+    price_model_version = IntField(required=True)
+    items_hash = StringField(required=True)
+    # raspunsul este salvat ca JSON: denumirile item-urilor pot contine "." sau "$"
+    response = StringField(required=True)
+    created_at = DateTimeField()
+
+    meta = {
+        "collection": "fraud_score_results",
+        "indexes": [
+            {"fields": ["created_at"], "expireAfterSeconds": RESULT_TTL_SECONDS},
+        ],
+    }
@@ -54,6 +54,48 @@ class AcquisitionRepository:
                 item["acquisition"] = str(item["acquisition"])
             return result[0]
 
+    @staticmethod
+    @log_method_calls
+    @profile_resources
+    @trace_calls
+    @handle_exceptions(error_types=(ValueError, KeyError))
+    def get_acquisitions_with_items(acquisition_ids: list):
+        """
+        Retrieves several acquisitions and their associated items with a single
+        aggregation pipeline ($in on the acquisition ids).
+
+        Parameters:
+        -----------
+        acquisition_ids : list
+            The acquisition IDs to retrieve.
+
+        Returns:
+        --------
+        list
+            The acquisitions found, each with its items, like get_acquisition_with_items.
+        """
+        pipeline = [
+            {"$match": {"acquisition_id": {"$in": acquisition_ids}}},
+            {
+                "$lookup": {
+                    "from": "items",
+                    "localField": "_id",
+                    "foreignField": "acquisition",
+                    "as": "items",
+                }
+            },
+        ]
+
+        result = list(Acquisition.objects.aggregate(pipeline))
+
+        # Convert ObjectId fields to strings
+        for acquisition in result:
+            acquisition["_id"] = str(acquisition["_id"])
+            for item in acquisition["items"]:
+                item["_id"] = str(item["_id"])
+                item["acquisition"] = str(item["acquisition"])
+        return result
+
     @staticmethod
     @log_method_calls
     @profile_resources
@@ -1,5 +1,23 @@
+from datetime import datetime
+
 from api.models.cluster import Cluster
-from mongoengine import ValidationError
+from api.models.cluster_version import ClusterVersion
+from mongoengine import Q, ValidationError
+
+# colectia in care se scrie noul set de clustere inainte de a fi publicat
+STAGING_COLLECTION = "clusters_staging"
+
+# numarul de clustere trimise intr-un singur insert_many
+INSERT_BATCH_SIZE = 1000
+
+# de cate ori se reface colectia de staging cand un cluster pastrat este scris in timpul copierii
+STAGING_ATTEMPTS = 3
+
+# versiunea modelului, marita la orice scriere a unui cluster (inclusiv adaugarea unui item)
+MODEL_VERSION = "cluster_model"
+
+# versiunea setului de clustere, marita doar la publicare si stergere (reincarcare completa)
+CLUSTERS_VERSION = "clusters"
 
 class ClusterRepository:
     @staticmethod
@@ -17,6 +35,18 @@ class ClusterRepository:
     def find_all():
         return Cluster.objects.all()
 
+    @staticmethod
+    def find_all_with_items():
+        # item-urile tuturor clusterelor sunt citite in bloc, nu cate o interogare pe item
+        return Cluster.objects.select_related()
+
+    @staticmethod
+    def find_updated_since(model_version):
+        """Clusters written online after model_version, or still being written, with their items."""
+        return Cluster.objects(
+            Q(model_version__gt=model_version) | Q(model_version=Cluster.PENDING_MODEL_VERSION)
+        ).select_related()
+
     @staticmethod
     def find_by_id(cluster_id):
         return Cluster.objects.get(id=cluster_id)
@@ -25,6 +55,15 @@ class ClusterRepository:
     def update(cluster):
         cluster.save()
 
+    @staticmethod
+    def update_price_model(cluster_id, price_model):
+        Cluster.objects(id=cluster_id).update_one(set__price_model=price_model)
+
+    @staticmethod
+    def update_model_version(cluster_id, model_version):
+        # $max: o scriere mai veche, terminata mai tarziu, nu coboara versiunea clusterului
+        Cluster.objects(id=cluster_id).update_one(max__model_version=model_version)
+
     @staticmethod
     def delete(cluster):
         cluster.delete()
@@ -32,3 +71,68 @@ class ClusterRepository:
     @staticmethod
     def delete_all():
         Cluster.objects.delete()
+
+    @staticmethod
+    def write_staging(staging, clusters, keep_filter=None):
+        """
+        Fills the staging collection with the clusters matching keep_filter,
+        copied server side, and the new clusters, and creates the indexes of
+        the clusters collection on it.
+        """
+        collection = Cluster._get_collection()
+        staging.drop()
+
+        if keep_filter is not None:
+            collection.aggregate([{"$match": keep_filter}, {"$out": staging.name}])
+
+        for start in range(0, len(clusters), INSERT_BATCH_SIZE):
+            batch = clusters[start:start + INSERT_BATCH_SIZE]
+            result = staging.insert_many([cluster.to_mongo() for cluster in batch], ordered=False)
+            for cluster, inserted_id in zip(batch, result.inserted_ids):
+                cluster.id = inserted_id
+
+        # indecsii sunt creati inainte de redenumire, ca si colectia publicata sa-i aiba de la inceput
+        for index_spec in Cluster._meta["index_specs"]:
+            options = dict(index_spec)
+            staging.create_index(options.pop("fields"), **options)
+
+    @classmethod
+    def replace_all(cls, clusters, keep_filter=None):
+        """
+        Replaces the clusters collection in a single step. The new clusters
+        are written with insert_many into a staging collection, which then
+        takes the place of the clusters collection through renameCollection,
+        so readers see either the old or the new set, never a partial one.
+        The existing clusters matching keep_filter are copied (server side)
+        into the staging collection first. A cluster written online during
+        the copy changes the model version, and the staging collection is
+        then filled again, up to STAGING_ATTEMPTS times. A write just before
+        the rename (or any write during a full replacement) is still lost
+        with the old collection; its item gets a cluster again the next time
+        it is scored.
+        """
+        for cluster in clusters:
+            cluster.validate()
+
+        collection = Cluster._get_collection()
+        staging = collection.database[STAGING_COLLECTION]
+
+        for _ in range(STAGING_ATTEMPTS):
+            version = cls.get_version()
+            cls.write_staging(staging, clusters, keep_filter)
+            if keep_filter is None or cls.get_version() == version:
+                break
+
+        staging.rename(collection.name, dropTarget=True)
+
+    @staticmethod
+    def get_version(name=MODEL_VERSION):
+        cluster_version = ClusterVersion.objects(name=name).first()
+        return cluster_version.version if cluster_version else 0
+
+    @staticmethod
+    def increment_version(name=MODEL_VERSION):
+        cluster_version = ClusterVersion.objects(name=name).modify(
+            upsert=True, new=True, inc__version=1, set__updated_at=datetime.now()
+        )
+        return cluster_version.version
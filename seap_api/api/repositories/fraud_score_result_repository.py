@@ -0,0 +1,29 @@
+from api.models.fraud_score_result import FraudScoreResult
+from pymongo import ReplaceOne
+
+
+class FraudScoreResultRepository:
+    @staticmethod
+    def find_by_acquisition_ids(acquisition_ids, model_version, price_model_version):
+        return FraudScoreResult.objects(
+            acquisition_id__in=list(acquisition_ids),
+            model_version=model_version,
+            price_model_version=price_model_version,
+        )
+
+    @staticmethod
+    def save_all(results):
+        """Writes the results in one bulk_write, replacing the previous result of each acquisition."""
+        for result in results:
+            result.validate()
+        if not results:
+            return
+
+        FraudScoreResult._get_collection().bulk_write(
+            [ReplaceOne({"_id": result.pk}, result.to_mongo(), upsert=True) for result in results],
+            ordered=False,
+        )
+
+    @staticmethod
+    def delete_older_than(model_version):
+        return FraudScoreResult.objects(model_version__lt=model_version).delete()
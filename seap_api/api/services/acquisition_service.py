@@ -75,6 +75,28 @@ class AcquisitionService:
         """
         return AcquisitionRepository.get_acquisition_with_items(acquisition_id)
 
+    @staticmethod
+    @log_method_calls
+    @handle_exceptions(error_types=(ValueError, KeyError))
+    @validate_types
+    @profile_resources
+    @trace_calls
+    def get_acquisitions_with_items(acquisition_ids: list):
+        """
+        Retrieves several acquisitions along with their items in a single query.
+
+        Parameters:
+        -----------
+        acquisition_ids : list of int
+            The IDs of the acquisitions to retrieve.
+
+        Returns:
+        --------
+        list of dict
+            The acquisitions found and their items; missing IDs are left out.
+        """
+        return AcquisitionRepository.get_acquisitions_with_items(acquisition_ids)
+
     @staticmethod
     @log_method_calls
     @handle_exceptions(error_types=(ValueError, TypeError))
@@ -1,5 +1,10 @@
-from api.models.cluster import Cluster
-from api.repositories.cluster_repository import ClusterRepository
+from api.models.cluster import Cluster, ClusterPriceModel, ClusterStats
+from api.repositories.cluster_repository import CLUSTERS_VERSION, ClusterRepository
+from decision_module.DecisionalMethods.FraudDetectionClustering import (
+    PRICE_MODEL_VERSION,
+    FraudDetectionClustering,
+)
+from decision_module.utils.cluster_stats import get_cluster_stats, get_distance_to_core
 
 
 class ClusterService:
@@ -9,40 +14,156 @@ class ClusterService:
         return ClusterRepository.find_all()
 
     @staticmethod
-    def create_cluster(core_point, members):
+    def get_all_clusters_with_items():
+        """Retrieve all clusters with their items, read in bulk."""
+        return ClusterRepository.find_all_with_items()
+
+    @staticmethod
+    def get_clusters_updated_since(model_version):
+        """Retrieve the clusters written online after the given model version, with their items."""
+        return ClusterRepository.find_updated_since(model_version)
+
+    @staticmethod
+    def get_cluster(cluster_id):
+        """Retrieve a cluster by id."""
+        return ClusterRepository.find_by_id(cluster_id)
+
+    @staticmethod
+    def get_model_version():
+        """Version of the cluster model, increased on every write to a cluster."""
+        return ClusterRepository.get_version()
+
+    @staticmethod
+    def increment_model_version():
+        """Increase the version of the cluster model after a write to a cluster."""
+        return ClusterRepository.increment_version()
+
+    @staticmethod
+    def get_clusters_version():
+        """Version of the set of clusters, increased when clusters are published or deleted."""
+        return ClusterRepository.get_version(CLUSTERS_VERSION)
+
+    @classmethod
+    def increment_versions(cls):
+        """
+        Increase both versions after clusters are published or deleted; the
+        clusters version first, so a reader that sees the new model version
+        sees the new clusters version too.
+        """
+        ClusterRepository.increment_version(CLUSTERS_VERSION)
+        cls.increment_model_version()
+
+    @staticmethod
+    def mark_pending(cluster):
+        """Marks a cluster as being written, before it is saved."""
+        cluster.model_version = Cluster.PENDING_MODEL_VERSION
+
+    @classmethod
+    def stamp_model_version(cls, cluster):
+        """
+        Increases the model version after an online write to a cluster and
+        records it on the cluster, so the processes that keep the clusters in
+        memory read again only the clusters written since their version.
+        """
+        model_version = cls.increment_model_version()
+        ClusterRepository.update_model_version(cluster.id, model_version)
+        cluster.model_version = model_version
+        return model_version
+
+    @staticmethod
+    def get_stats(core_point, members, radius=None):
+        """Statistics of a cluster with the given core point and members."""
+        return ClusterStats(**get_cluster_stats(core_point, members, radius))
+
+    @staticmethod
+    def get_price_model(members, baseline=None):
+        """Price model of a cluster with the given members; the baseline is computed unless given."""
+        if baseline is None:
+            baseline = FraudDetectionClustering(None, members).get_price_baseline()
+        return ClusterPriceModel(baseline=baseline, version=PRICE_MODEL_VERSION)
+
+    @classmethod
+    def update_price_model(cls, cluster):
+        """Compute the price model of a cluster again and save only that field."""
+        cluster.price_model = cls.get_price_model(cluster.list_of_items)
+        ClusterRepository.update_price_model(cluster.id, cluster.price_model)
+        return cluster.price_model
+
+    @classmethod
+    def create_cluster(cls, core_point, members, category=None):
         """Create a new cluster and save it to the database."""
-        new_cluster = Cluster(core_point=core_point, list_of_items=members)
+        new_cluster = Cluster(
+            core_point=core_point, list_of_items=members, category=category,
+            stats=cls.get_stats(core_point, members),
+            price_model=cls.get_price_model(members),
+        )
+        cls.mark_pending(new_cluster)
         ClusterRepository.save(new_cluster)
+        cls.stamp_model_version(new_cluster)
         return new_cluster
 
-    @staticmethod
-    def update_core_point(cluster_id, new_core_point):
+    @classmethod
+    def update_core_point(cls, cluster_id, new_core_point):
         """Update the core point of a cluster."""
         cluster = Cluster.objects.get(id=cluster_id)
         cluster.core_point = new_core_point
+        cluster.stats = cls.get_stats(new_core_point, cluster.list_of_items)
+        cls.mark_pending(cluster)
         ClusterRepository.update(cluster)
+        cls.stamp_model_version(cluster)
 
-    @staticmethod
-    def add_item(cluster_id, item):
-        """Add an item to a cluster."""
+    @classmethod
+    def add_item(cls, cluster_id, item, distance_sums=None, core_point=None):
+        """
+        Add an item to a cluster, together with the distance sums of the
+        members after the addition and the new core point, when known.
+        The statistics and the price model are updated as well.
+        Returns the updated cluster.
+        """
         cluster = ClusterRepository.find_by_id(cluster_id)
         if item not in cluster.list_of_items:
             cluster.list_of_items.append(item)
+            # fara sumele noi, cele vechi nu mai corespund membrilor
+            cluster.distance_sums = distance_sums or []
+
+            radius = None
+            if cluster.stats is not None and (core_point is None or core_point == cluster.core_point):
+                # acelasi core point: raza creste doar daca noul item este mai departe
+                radius = max(cluster.stats.radius, get_distance_to_core(cluster.core_point, item))
+            if core_point is not None:
+                cluster.core_point = core_point
+            cluster.stats = cls.get_stats(cluster.core_point, cluster.list_of_items, radius)
+            cluster.price_model = cls.get_price_model(cluster.list_of_items)
+            cls.mark_pending(cluster)
             ClusterRepository.update(cluster)
+            cls.stamp_model_version(cluster)
+        return cluster
 
-    @staticmethod
-    def remove_item(cluster_id, item):
-        """Remove an item from a cluster."""
+    @classmethod
+    def remove_item(cls, cluster_id, item):
+        """Remove an item from a cluster and update its statistics and price model."""
         cluster = ClusterRepository.find_by_id(cluster_id)
         if item in cluster.list_of_items:
             cluster.list_of_items.remove(item)
+            # sumele se recalculeaza la urmatoarea adaugare
+            cluster.distance_sums = []
+
+            radius = None
+            if cluster.stats is not None and get_distance_to_core(cluster.core_point, item) < cluster.stats.radius:
+                # item-ul scos nu era cel mai departat, raza ramane aceeasi
+                radius = cluster.stats.radius
+            cluster.stats = cls.get_stats(cluster.core_point, cluster.list_of_items, radius)
+            cluster.price_model = cls.get_price_model(cluster.list_of_items)
+            cls.mark_pending(cluster)
             ClusterRepository.update(cluster)
+            cls.stamp_model_version(cluster)
 
-    @staticmethod
-    def delete_cluster(cluster_id):
+    @classmethod
+    def delete_cluster(cls, cluster_id):
         """Delete a cluster from the database."""
         cluster = ClusterRepository.find_by_id(cluster_id)
         ClusterRepository.delete(cluster)
+        cls.increment_versions()
 
     @classmethod
     def get_all_items(cls):
@@ -58,8 +179,34 @@ class ClusterService:
         cluster = ClusterRepository.find_by_id(cluster_id)
         return list(cluster.list_of_items)
 
-    @staticmethod
-    def delete_all_clusters():
+    @classmethod
+    def delete_all_clusters(cls):
         """Delete all clusters from database."""
         ClusterRepository.delete_all()
-        
+        cls.increment_versions()
+
+    @classmethod
+    def publish_clusters(cls, clusters, replaced_categories=None):
+        """
+        Publish a new set of clusters in one atomic swap.
+        clusters holds (core_point, members, category, distance_sums,
+        price_baseline) tuples; a None price_baseline is computed here. With
+        replaced_categories only the clusters of those categories are
+        replaced and the others are kept; otherwise all clusters are replaced.
+        The statistics of every cluster are computed before the swap and
+        both versions are increased after it.
+        """
+        documents = [
+            Cluster(
+                core_point=core_point, list_of_items=members, category=category,
+                distance_sums=distance_sums, stats=cls.get_stats(core_point, members),
+                price_model=cls.get_price_model(members, price_baseline),
+            )
+            for core_point, members, category, distance_sums, price_baseline in clusters
+        ]
+        keep_filter = None
+        if replaced_categories is not None:
+            keep_filter = {"category": {"$nin": list(replaced_categories)}}
+        ClusterRepository.replace_all(documents, keep_filter)
+        cls.increment_versions()
+        return documents
@@ -0,0 +1,59 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+
+from api.models.fraud_score_result import FraudScoreResult
+from api.repositories.fraud_score_result_repository import FraudScoreResultRepository
+from decision_module.DecisionalMethods.FraudDetectionClustering import PRICE_MODEL_VERSION
+
+
+class FraudScoreResultService:
+    @staticmethod
+    def get_items_hash(acquisition):
+        """Fingerprint of the items of an acquisition, the fields the fraud score depends on."""
+        items = [
+            [str(item["_id"]), item["name"], item["quantity"], item["closing_price"]]
+            for item in acquisition["items"]
+        ]
+        return hashlib.md5(json.dumps(items, default=str).encode("utf-8")).hexdigest()
+
+    @classmethod
+    def get_results(cls, acquisitions, model_version):
+        """
+        Stored fraud score responses of the acquisitions, by acquisition_id,
+        for the ones computed with this cluster model version and the
+        current price model from the same items.
+        """
+        items_hashes = {
+            acquisition["acquisition_id"]: cls.get_items_hash(acquisition) for acquisition in acquisitions
+        }
+        results = FraudScoreResultRepository.find_by_acquisition_ids(
+            items_hashes, model_version, PRICE_MODEL_VERSION
+        )
+        return {
+            result.acquisition_id: json.loads(result.response)
+            for result in results
+            if result.items_hash == items_hashes[result.acquisition_id]
+        }
+
+    @classmethod
+    def save_results(cls, acquisitions, responses, model_version):
+        """Store the fraud score responses of the acquisitions, computed with this cluster model version."""
+        # indexul TTL compara created_at cu ora UTC
+        created_at = datetime.now(timezone.utc)
+        FraudScoreResultRepository.save_all([
+            FraudScoreResult(
+                acquisition_id=acquisition["acquisition_id"],
+                model_version=model_version,
+                price_model_version=PRICE_MODEL_VERSION,
+                items_hash=cls.get_items_hash(acquisition),
+                response=json.dumps(response),
+                created_at=created_at,
+            )
+            for acquisition, response in zip(acquisitions, responses)
+        ])
+
+    @staticmethod
+    def delete_stale_results(model_version):
+        """Delete the results computed with an older cluster model version."""
+        return FraudScoreResultRepository.delete_older_than(model_version)
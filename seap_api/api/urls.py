@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import AcquisitionListView, ItemDetailView, ItemsByCpvCodeView, FraudScoreAcquisitionView
+from .views import AcquisitionListView, ItemDetailView, ItemsByCpvCodeView, FraudScoreAcquisitionView, FraudScoreBulkView
 from .views import AcquisitionDetailView, ItemsListView
 
 urlpatterns = [
@@ -11,4 +11,5 @@ urlpatterns = [
     path('items/<str:item_id>/', ItemDetailView.as_view(), name='item-detail'),
 
     path('acquisitions/<int:acquisition_id>/fraud_score', FraudScoreAcquisitionView.as_view(), name='acquisition-fraud-score'),
+    path('acquisitions/fraud_scores', FraudScoreBulkView.as_view(), name='acquisitions-fraud-scores'),
 ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -9,6 +10,7 @@ from decision_module.fraud_scoring import (
     compute_fraud_score_for_item,
     dict_to_item,
     get_fraud_score_for_acquisition,
+    get_fraud_scores_for_acquisitions,
 )
 
 from .scrape.acquisition_fetcher import AcquisitionFetcher
@@ -285,3 +287,60 @@ class FraudScoreAcquisitionView(APIView):
         return Response(
             {"error": "Acquisition not found"}, status=status.HTTP_404_NOT_FOUND
         )
+
+
+class FraudScoreBulkView(APIView):
+    """
+    API endpoint that allows the fraud scores of many acquisitions to be calculated in one request.
+    """
+
+    @log_method_calls
+    @handle_exceptions(error_types=(ValueError, KeyError))
+    def post(self, request):
+        """
+        Expects {"acquisition_ids": [...]} with at most FRAUD_SCORE_MAX_BATCH_SIZE ids.
+        The acquisitions are read with a single query and all their items are
+        scored against one load of the clusters. Acquisitions that are not in
+        our database are listed in "not_found"; the single acquisition
+        endpoint fetches them from SEAP.
+        """
+        if not isinstance(request.data, dict):
+            return Response(
+                {"error": "Expected a JSON object with acquisition_ids"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        acquisition_ids = request.data.get("acquisition_ids")
+        if not isinstance(acquisition_ids, list) or not acquisition_ids:
+            return Response(
+                {"error": "acquisition_ids must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(acquisition_ids) > settings.FRAUD_SCORE_MAX_BATCH_SIZE:
+            return Response(
+                {"error": f"At most {settings.FRAUD_SCORE_MAX_BATCH_SIZE} acquisitions per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # doar intregi sau siruri de cifre: int() ar accepta si True sau 2.9
+        if not all(
+            (isinstance(acquisition_id, int) and not isinstance(acquisition_id, bool))
+            or (isinstance(acquisition_id, str) and acquisition_id.isascii() and acquisition_id.isdigit())
+            for acquisition_id in acquisition_ids
+        ):
+            return Response(
+                {"error": "acquisition_ids must contain integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # ordinea este pastrata, duplicatele sunt calculate o singura data
+        acquisition_ids = list(dict.fromkeys(int(acquisition_id) for acquisition_id in acquisition_ids))
+
+        acquisitions = AcquisitionService.get_acquisitions_with_items(acquisition_ids) or []
+        responses = get_fraud_scores_for_acquisitions(acquisitions)
+
+        results = {
+            str(acquisition["acquisition_id"]): response
+            for acquisition, response in zip(acquisitions, responses)
+        }
+        not_found = [
+            acquisition_id for acquisition_id in acquisition_ids if str(acquisition_id) not in results
+        ]
+        return Response({"results": results, "not_found": not_found}, status=status.HTTP_200_OK)
@@ -47,6 +47,11 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--task_id", type=str, required=True)
+        parser.add_argument(
+            "--full_rebuild",
+            action="store_true",
+            help="Delete all clusters and cluster every category again",
+        )
 
     def handle(self, *args, **options):
         task_id = options["task_id"]
@@ -62,8 +67,10 @@ class Command(BaseCommand):
         self.logger.info(f"Starting clustering task {task_id}")
 
         try:
-            self.logger.info("Initiating clustering process")
-            create_clusters()
+            self.logger.info(
+                f"Initiating clustering process (full_rebuild={options['full_rebuild']})"
+            )
+            create_clusters(task, full_rebuild=options["full_rebuild"])
 
             task.status = TaskStatus.COMPLETED
             task.progress = 100
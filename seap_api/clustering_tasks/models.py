@@ -1,7 +1,7 @@
 # Create your models here.
 from django_mongoengine import Document
 from mongoengine import (
-    DateTimeField, DictField, FloatField, StringField, ReferenceField, IntField
+    DateTimeField, DictField, FloatField, StringField, ReferenceField, IntField, ObjectIdField
 )
 
 from custom_auth.models.user import User
@@ -32,3 +32,19 @@ class ClusteringTask(Document):
     result_stats = DictField(default=dict)
 
     meta = {"collection": "clustering_tasks", "indexes": ["user", "status", "created_at"]}
+
+
+class CategoryWatermark(Document):
+    """
+    Items of a category seen by the last clustering: the newest item id, the
+    number of items and a hash of their names, prices and quantities. A
+    category is clustered again only when they change.
+    """
+
+    category = StringField(primary_key=True)
+    last_item_id = ObjectIdField()
+    item_count = IntField(default=0)
+    items_hash = StringField()
+    updated_at = DateTimeField(required=True)
+
+    meta = {"collection": "clustering_watermarks"}
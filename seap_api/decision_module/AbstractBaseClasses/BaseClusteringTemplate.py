@@ -1,19 +1,42 @@
-import re
+import logging
 from abc import ABC, abstractmethod
 from collections import defaultdict
 
 import numpy as np
 from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics import silhouette_score, calinski_harabasz_score, davies_bouldin_score
-import Levenshtein
 from sklearn.metrics.pairwise import cosine_similarity
+
+from decision_module.utils.name_features import (
+    NameFeatures,
+    compare_features,
+    get_name_features,
+    name_distance,
+    normalize_string,
+    remove_colour,
+)
+from decision_module.utils.distance_matrix import CondensedDistanceMatrix, submatrix
+from decision_module.utils.k_evaluation import KEvaluator
+from decision_module.utils.medoid import medoid_distance_sums
+from decision_module.KSearch.LinearKSearch import LinearKSearch
 # from decision_module.MOP.ClusteringMeta import ClusteringMeta, monitor_function
 
+logger = logging.getLogger(__name__)
+
 
 class BaseClusteringTemplate():
-    def __init__(self, list_of_items, clustering_strategy):
+    def __init__(self, list_of_items, clustering_strategy, n_workers=None, blocking=None,
+                 distance_cache=None, search_policy=None, distance_matrix=None):
         self.list_of_items = list_of_items
-        self.distance_matrix = self.get_distance_matrix(list_of_items)
+        self.n_workers = n_workers
+        self.blocking = blocking
+        self.distance_cache = distance_cache
+        self.search_policy = search_policy or LinearKSearch()
+        self.search_result = None
+        self.deduplicate_items()
+        # distance_matrix poate fi primita gata calculata, pentru denumirile din unique_items
+        if distance_matrix is None:
+            distance_matrix = self.get_distance_matrix(self.unique_items)
+        self.distance_matrix = distance_matrix
         self.max_clusters = self.calculate_max_clusters()
         self.clustering_strategy = clustering_strategy
 
@@ -53,91 +76,58 @@ class BaseClusteringTemplate():
 
     def execute_clustering(self):
         n_clusters = self.find_optimal_clusters()
+        if n_clusters is None:
+            # prea putine denumiri distincte pentru a alege un numar de clustere
+            return {0: list(self.list_of_items)}
         return self.perform_clustering(n_clusters)
 
-    def calculate_max_clusters(self):
-        list_of_strings = [item.name.lower() for item in self.list_of_items]
-        unique_strings = np.unique(list_of_strings)
-        return min(len(unique_strings) - 1, len(self.list_of_items) - 1)
+    def deduplicate_items(self):
+        """
+        Collapses the items with the same normalized name: the clustering runs
+        on one representative per name, weighted by the number of duplicates.
+        """
+        name_features = get_name_features([item.name for item in self.list_of_items])
+
+        unique_index = {}
+        self.unique_items = []
+        item_to_unique = []
+        for item, features in zip(self.list_of_items, name_features):
+            if features.normalized not in unique_index:
+                unique_index[features.normalized] = len(self.unique_items)
+                self.unique_items.append(item)
+            item_to_unique.append(unique_index[features.normalized])
+
+        self.item_to_unique = np.array(item_to_unique, dtype=np.intp)
+        self.weights = np.bincount(self.item_to_unique, minlength=len(self.unique_items))
+
+    def expand_labels(self, unique_labels):
+        """Maps the labels of the unique names back to every original item."""
+        return np.asarray(unique_labels)[self.item_to_unique]
+
+    def find_medoid(self, member_indices):
+        """
+        Returns the position of the medoid among the given item indices and
+        the sum of the distances from every member to the others, read from
+        self.distance_matrix (no distance is computed again).
+        """
+        member_indices = np.asarray(member_indices, dtype=np.intp)
+        unique_indices, inverse, counts = np.unique(
+            self.item_to_unique[member_indices], return_inverse=True, return_counts=True
+        )
+        # duplicatele au distanta 0 intre ele, deci fiecare denumire este citita o singura data
+        distance_sums = medoid_distance_sums(self.distance_matrix, unique_indices, counts)[inverse]
+        return int(np.argmin(distance_sums)), distance_sums
 
-    def replace_synonyms(self, string, synonyms):
-        for key, values in synonyms.items():
-            for value in values:
-                string = re.sub(rf'\b{re.escape(value)}\b', key, string, flags=re.IGNORECASE)
-        return string
+    def calculate_max_clusters(self):
+        return len(self.unique_items) - 1
 
     def remove_colour(self, string):
-        parts = string.rsplit(",", 1)
-        if len(parts) > 1:
-            before_last_comma = parts[0]
-            after_last_comma = parts[1].strip()
-
-            words_after_comma = after_last_comma.split()
-
-            # daca dupa virgula nu exista cuvinte alfanumerice (5g,..) eliminam culoarea
-            if not (len(words_after_comma) > 3 or re.search(r'\b[a-zA-Z]+\d|\d+[a-zA-Z]\b', after_last_comma)):
-                return before_last_comma.strip()
-
-        return string.strip()
+        return remove_colour(string)
 
     def processes_strings(self, str1, str2):
-
-        synonyms = {"telefon": ["telefon mobil", "smartphone"]}
-
-        str1 = self.replace_synonyms(str1, synonyms)
-        str2 = self.replace_synonyms(str2, synonyms)
-
-        # elimin stringurile neimportante din str
-        strings_to_remove = ["dual sim", "midnight black"]
-
-        for string in strings_to_remove:
-            if string in str1:
-                str1 = str1.replace(string, "")
-            if string in str2:
-                str2 = str2.replace(string, "")
-
-        # eliminam culorile
-        str1 = self.remove_colour(str1)
-        str2 = self.remove_colour(str2)
-
-        # eliminam virgulele si spatiile suplimentare
-        str1 = str1.replace(",", " ")
-        str2 = str2.replace(",", " ")
-
-        str1 = re.sub(r'\s+', ' ', str1).strip()
-        str2 = re.sub(r'\s+', ' ', str2).strip()
-
-        if str1.startswith(str2):
-            return str2, str2
-        elif str2.startswith(str1):
-            return str1, str1
-
-        new_str1 = []
-        new_str2 = []
-
-        words1 = str1.split()
-        words2 = str2.split()
-
-        # eliminam cuvintele comune
-        set1 = set(words1)
-        set2 = set(words2)
-
-        words1 = list(set1 - set2)
-        words2 = list(set2 - set1)
-
-        # sortam alfabetic
-        words1.sort()
-        words2.sort()
-
-        for word1, word2 in zip(words1, words2):
-            if word1.startswith(word2) or word2.startswith(word1):
-                new_str1.append(word2)
-                new_str2.append(word2)
-            else:
-                new_str1.append(word1)
-                new_str2.append(word2)
-
-        return " ".join(new_str1), " ".join(new_str2)
+        features1 = NameFeatures(normalize_string(str1))
+        features2 = NameFeatures(normalize_string(str2))
+        return compare_features(features1, features2)
 
     def jaccard_similarity(self, string1, string2):
         words1 = set(string1.split())
@@ -149,40 +139,50 @@ class BaseClusteringTemplate():
         return len(intersection) / len(union)
 
     def get_distance_matrix(self, items):
-        n = len(items)
-        distance_matrix = np.zeros((n, n))
-        for i in range(n):
-            for j in range(i + 1, n):
-                str1_to_cmp, str2_to_cmp = self.processes_strings(items[i].name.lower(), items[j].name.lower())
-
-                dist = Levenshtein.distance(str1_to_cmp, str2_to_cmp)
-
-                distance_matrix[i, j] = dist
-                distance_matrix[j, i] = dist
-
-        return distance_matrix
-
-    def find_optimal_clusters(self, metric="calinski_harabasz"):
-        scores = []
-        for n_clusters in range(2, self.max_clusters + 1):
-            cluster_labels = self.clustering_strategy.cluster(self.distance_matrix, n_clusters)
-
-            if metric == "silhouette":
-                score = silhouette_score(self.distance_matrix, cluster_labels, metric="precomputed")
-
-            elif metric == "calinski_harabasz":
-                score = calinski_harabasz_score(self.distance_matrix, cluster_labels)
-
-            else:
-                raise ValueError(
-                    f"Metric {metric} not supported. Choose from 'silhouette', 'calinski_harabasz', or 'davies_bouldin'.")
-
-            scores.append((n_clusters, score))
-
-        if not scores:
-            return None
-
-        return max(scores, key=lambda x: x[1])[0]
+        # fiecare denumire este normalizata o singura data, nu pentru fiecare pereche
+        name_features = get_name_features([item.name for item in items])
+
+        if self.blocking is not None:
+            # se compara doar perechile care au destule cuvinte comune
+            return self.blocking.get_distance_matrix(name_features, name_distance)
+
+        if self.distance_cache is not None:
+            # se calculeaza doar distantele pentru denumirile noi fata de rularea anterioara
+            return self.distance_cache.get_distance_matrix(name_features, name_distance, self.n_workers)
+
+        # distantele Levenshtein sunt intregi mici, deci incap in uint16
+        max_length = max((len(features.normalized) for features in name_features), default=0)
+        dtype = np.uint16 if max_length <= np.iinfo(np.uint16).max else np.float32
+
+        return CondensedDistanceMatrix.build(name_features, name_distance, self.n_workers, dtype)
+
+    def find_optimal_clusters(self, metric="calinski_harabasz", search_policy=None):
+        """
+        Returns the number of clusters with the best score, or None when there
+        is nothing to choose from. search_policy decides which values are
+        evaluated; the outcome and the number of fits are kept in search_result.
+        With n_workers > 1 the candidates are evaluated on a process pool.
+        """
+        search_policy = search_policy or self.search_policy
+
+        sample = search_policy.sample_indices(len(self.unique_items))
+        scoring_matrix = self.distance_matrix if sample is None else submatrix(self.distance_matrix, sample)
+
+        with KEvaluator(
+            self.clustering_strategy,
+            self.distance_matrix,
+            self.weights,
+            metric,
+            sample,
+            scoring_matrix,
+            self.n_workers,
+        ) as evaluator:
+            self.search_result = search_policy.run(evaluator.evaluate, range(2, self.max_clusters + 1))
+        logger.info(
+            f"{type(search_policy).__name__}: {self.search_result.n_fits} fits for "
+            f"{len(self.unique_items)} names, n_clusters={self.search_result.n_clusters}"
+        )
+        return self.search_result.n_clusters
 
     """
     def dynamic_filter_by_model(self):
@@ -2,7 +2,29 @@ from abc import ABC, abstractmethod
 
 
 class ClusteringStrategy(ABC):
+    # False pentru strategiile care primesc direct valorile 1-D in locul matricei de distante
+    precomputed = True
+
     @abstractmethod
-    def cluster(self, distance_matrix, n_clusters):
-        """Clusters data points given a distance matrix and the number of clusters."""
+    def cluster(self, distance_matrix, n_clusters, sample_weight=None):
+        """
+        Clusters data points given a distance matrix and the number of clusters.
+        sample_weight holds the multiplicity of each point, for the strategies that support it.
+        """
         pass
+
+    def cluster_range(self, distance_matrix, n_clusters_range, sample_weight=None):
+        """
+        Yields (n_clusters, labels) for every number of clusters in the range.
+        Strategies that can reuse a single fit for all the values override it.
+        """
+        for n_clusters in n_clusters_range:
+            yield n_clusters, self.cluster(distance_matrix, n_clusters, sample_weight=sample_weight)
+
+    def for_workers(self, distance_matrix, sample_weight=None):
+        """
+        The strategy sent to the worker processes that cluster distance_matrix.
+        Strategies with a fit shared by every number of clusters make it here,
+        once, so the workers do not repeat it.
+        """
+        return self
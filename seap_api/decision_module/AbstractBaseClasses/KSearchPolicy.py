@@ -0,0 +1,67 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class KSearchResult:
+    def __init__(self, n_clusters, scores):
+        self.n_clusters = n_clusters
+        self.scores = scores
+
+    @property
+    def n_fits(self):
+        """Number of clusterings that were actually fitted and scored."""
+        return len(self.scores)
+
+    def __repr__(self):
+        return f"KSearchResult(n_clusters={self.n_clusters}, n_fits={self.n_fits})"
+
+
+class KSearchPolicy(ABC):
+    """
+    Decides which numbers of clusters are evaluated when searching for the
+    best one. sample_size limits the scoring to a random subsample of points.
+    """
+
+    def __init__(self, sample_size=None, random_state=0):
+        self.sample_size = sample_size
+        self.random_state = random_state
+
+    def sample_indices(self, n_samples):
+        """Returns the sorted indices of the points used for scoring, or None for all of them."""
+        if self.sample_size is None or self.sample_size >= n_samples:
+            return None
+        generator = np.random.default_rng(self.random_state)
+        return np.sort(generator.choice(n_samples, self.sample_size, replace=False))
+
+    def run(self, evaluate, candidates):
+        """
+        evaluate(list of n_clusters) returns their scores. Every value is
+        evaluated at most once; the best evaluated value is returned.
+        """
+        candidates = list(candidates)
+        scores = {}
+
+        def score(n_clusters_list):
+            missing = [n_clusters for n_clusters in n_clusters_list if n_clusters not in scores]
+            if missing:
+                scores.update(zip(missing, evaluate(missing)))
+            return [scores[n_clusters] for n_clusters in n_clusters_list]
+
+        if candidates:
+            self.search(score, candidates)
+
+        if not scores:
+            return KSearchResult(None, scores)
+
+        # la egalitate se pastreaza cel mai mic numar de clustere, ca la parcurgerea liniara
+        best = max(sorted(scores), key=lambda n_clusters: scores[n_clusters])
+        return KSearchResult(best, scores)
+
+    @abstractmethod
+    def search(self, score, candidates):
+        """
+        Evaluates candidates through score(list of n_clusters), which returns
+        their scores. candidates is a sorted, non empty list.
+        """
+        pass
@@ -1,12 +1,73 @@
+import numpy as np
 from decision_module.AbstractBaseClasses.ClusteringStrategy import ClusteringStrategy
-from sklearn.cluster import AgglomerativeClustering
+from decision_module.utils.linkage import average_linkage
 
 
 class AgglomerativeClusteringStrategy(ClusteringStrategy):
-    def cluster(self, distance_matrix, n_clusters):
+    def __init__(self, tree=None):
+        # tree: arbore construit de procesul parinte, folosit de workeri pentru matricea primita
+        self._fixed_tree = tree
+        self._tree_key = None
+        self._tree = None
+
+    def __getstate__(self):
+        # arborele memorat pentru o matrice nu este trimis proceselor worker odata cu strategia
+        return {"_fixed_tree": self._fixed_tree, "_tree_key": None, "_tree": None}
+
+    def build_tree(self, distance_matrix, sample_weight=None):
+        """
+        Builds the average linkage tree, the same one sklearn's
+        AgglomerativeClustering computes for a precomputed metric, with each
+        point counted sample_weight times (as if its duplicates were there).
+        The tree is kept for the last distance matrix and weights, so every
+        flat cut of the same matrix reuses a single fit.
+        """
+        if self._fixed_tree is not None:
+            return self._fixed_tree
+        if self._tree_key is None or self._tree_key[0] is not distance_matrix \
+                or self._tree_key[1] is not sample_weight:
+            self._tree = average_linkage(distance_matrix, sample_weight)
+            self._tree_key = (distance_matrix, sample_weight)
+        return self._tree
+
+    def for_workers(self, distance_matrix, sample_weight=None):
+        """A strategy holding the tree of distance_matrix, built once here."""
+        return AgglomerativeClusteringStrategy(tree=self.build_tree(distance_matrix, sample_weight))
+
+    @staticmethod
+    def cut_tree(tree, n_samples, n_clusters_list):
+        """
+        Returns {n_clusters: labels} for the requested numbers of clusters.
+        A cut with k clusters is the state after the first n - k merges.
+        """
+        wanted = set(n_clusters_list)
+        cuts = {}
+
+        current = np.arange(n_samples)
+        if n_samples in wanted:
+            cuts[n_samples] = current.copy()
+
+        for step, (first, second) in enumerate(tree[:, :2].astype(np.intp)):
+            current[(current == first) | (current == second)] = n_samples + step
+
+            n_clusters = n_samples - step - 1
+            if n_clusters in wanted:
+                cuts[n_clusters] = np.unique(current, return_inverse=True)[1]
+
+        return cuts
+
+    def cluster(self, distance_matrix, n_clusters, sample_weight=None):
         """Clusters data points using Agglomerative Clustering."""
-        model = AgglomerativeClustering(
-            n_clusters=n_clusters, metric="precomputed", linkage="average"
-        )
-        cluster_labels = model.fit_predict(distance_matrix)
-        return cluster_labels
+        tree = self.build_tree(distance_matrix, sample_weight)
+        return self.cut_tree(tree, len(distance_matrix), [n_clusters])[n_clusters]
+
+    def cluster_range(self, distance_matrix, n_clusters_range, sample_weight=None):
+        """Cuts a single linkage tree at every number of clusters in the range."""
+        n_clusters_list = list(n_clusters_range)
+        if not n_clusters_list:
+            return
+
+        tree = self.build_tree(distance_matrix, sample_weight)
+        cuts = self.cut_tree(tree, len(distance_matrix), n_clusters_list)
+        for n_clusters in n_clusters_list:
+            yield n_clusters, cuts[n_clusters]
@@ -1,20 +1,20 @@
 import warnings
 
-import numpy as np
 from sklearn.cluster import KMeans
-from AbstractBaseClasses.ClusteringStrategy import ClusteringStrategy
+from decision_module.AbstractBaseClasses.ClusteringStrategy import ClusteringStrategy
+from decision_module.utils.distance_matrix import similarity_matrix
 warnings.filterwarnings("ignore", category=UserWarning, message=".*found smaller than n_clusters.*")
 
 class KMeansClusteringStrategy(ClusteringStrategy):
-    def cluster(self, distance_matrix, n_clusters):
-        similarity_matrix = 1 / (1 + distance_matrix)
-        np.fill_diagonal(similarity_matrix, 0)
+    def cluster(self, distance_matrix, n_clusters, sample_weight=None):
+        similarity = similarity_matrix(distance_matrix)
 
         kmeans = KMeans(n_clusters=n_clusters, n_init=20)
 
         from sklearn.decomposition import PCA
-        pca = PCA(n_components=2)
-        reduced_data = pca.fit_transform(similarity_matrix)
+        # copy=False: PCA centreaza matricea de similaritate pe loc
+        pca = PCA(n_components=2, copy=False)
+        reduced_data = pca.fit_transform(similarity)
 
-        labels = kmeans.fit_predict(reduced_data)
+        labels = kmeans.fit_predict(reduced_data, sample_weight=sample_weight)
         return labels
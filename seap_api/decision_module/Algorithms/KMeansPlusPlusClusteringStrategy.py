@@ -1,27 +1,174 @@
 import numpy as np
 from decision_module.AbstractBaseClasses.ClusteringStrategy import ClusteringStrategy
+from decision_module.utils.distance_matrix import similarity_matrix
 from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
+
+# de la acest numar de puncte PCA foloseste SVD randomizat in loc de SVD complet
+RANDOMIZED_SVD_MIN_ITEMS = 500
+
+# n_init scade de la MAX_N_INIT la MIN_N_INIT cand n_samples * n_clusters depaseste N_INIT_WORK
+MAX_N_INIT = 20
+MIN_N_INIT = 2
+N_INIT_WORK = 50_000
+
+# restarturi K-Means++ pastrate langa pornirea din centroizii valorii anterioare
+WARM_START_N_INIT = 3
+
+# fiecare numar de clustere porneste din centroizii multiplului de WARM_START_STEP de sub el,
+# calculati la rece, ca rezultatul sa nu depinda de valorile evaluate impreuna
+WARM_START_STEP = 4
 
 
 class KMeansPlusPlusClusteringStrategy(ClusteringStrategy):
-    def cluster(self, distance_matrix, n_clusters):
+    def __init__(self, random_state=None):
+        self.random_state = random_state
+        self._embedding_matrix = None
+        self._embedding = None
+        self._n_unique_points = None
+
+    def __getstate__(self):
+        # proiectia memorata nu este trimisa proceselor worker odata cu strategia
+        return {
+            "random_state": self.random_state,
+            "_embedding_matrix": None,
+            "_embedding": None,
+            "_n_unique_points": None,
+        }
+
+    def embed(self, distance_matrix):
         """
-        Perform decision_module using K-Means++ initialization.
+        Projects the similarity matrix on its first 2 principal components.
+        The projection is kept for the last distance matrix, so a sweep over
+        the number of clusters computes it once.
+        """
+        if self._embedding_matrix is not distance_matrix:
+            # Convert the distance matrix to a similarity matrix for decision_module
+            similarity = similarity_matrix(distance_matrix)
+
+            # pentru matrici mari sunt suficiente primele 2 componente, aproximate
+            svd_solver = "randomized" if len(similarity) >= RANDOMIZED_SVD_MIN_ITEMS else "full"
+            # copy=False: PCA centreaza matricea de similaritate pe loc
+            pca = PCA(n_components=2, svd_solver=svd_solver, random_state=self.random_state, copy=False)
+            self._embedding = pca.fit_transform(similarity)
+            self._n_unique_points = len(np.unique(self._embedding, axis=0))
+            self._embedding_matrix = distance_matrix
+        return self._embedding
+
+    @staticmethod
+    def adaptive_n_init(n_samples, n_clusters, warm_start=False):
+        """
+        Fewer K-Means++ restarts as the problem grows, and only a few when a
+        warm started run is also tried.
+        """
+        if warm_start:
+            return WARM_START_N_INIT
+        n_init = MAX_N_INIT * N_INIT_WORK // max(1, n_samples * n_clusters)
+        return int(np.clip(n_init, MIN_N_INIT, MAX_N_INIT))
+
+    @staticmethod
+    def extend_centers(points, centers, labels, n_clusters, sample_weight, generator):
+        """
+        Adds K-Means++ seeds to the centroids found for a smaller number of
+        clusters (labels assigns every point to its closest centroid), until
+        there are n_clusters of them.
         """
-        # Convert the distance matrix to a similarity matrix for decision_module
-        similarity_matrix = 1 / (1 + distance_matrix)
-        np.fill_diagonal(similarity_matrix, 0)
+        closest = ((points - centers[labels]) ** 2).sum(axis=1)
+        centers = list(centers)
 
-        # Reduce dimensionality for better decision_module performance
-        from sklearn.decomposition import PCA
+        while len(centers) < n_clusters:
+            probabilities = sample_weight * closest
+            total = probabilities.sum()
+            if total <= 0:
+                return None
 
-        pca = PCA(n_components=2)
-        reduced_data = pca.fit_transform(similarity_matrix)
+            index = generator.choice(len(points), p=probabilities / total)
+            centers.append(points[index])
+            closest = np.minimum(closest, ((points - points[index]) ** 2).sum(axis=1))
 
-        unique_points = np.unique(reduced_data, axis=0)
-        n_clusters = min(n_clusters, len(unique_points))
+        return np.asarray(centers)
+
+    def fit(self, embedding, n_clusters, sample_weight=None, init_centers=None):
+        """
+        K-Means++ with an adaptive number of restarts; when init_centers is
+        given, a warm started run is added and the lower inertia is kept.
+        """
+        warm_start = init_centers is not None and len(init_centers) == n_clusters
 
         # Use K-Means with the K-Means++ initialization strategy
-        kmeans = KMeans(n_clusters=n_clusters, init="k-means++", n_init=20)
-        labels = kmeans.fit_predict(reduced_data)
-        return labels
+        kmeans = KMeans(
+            n_clusters=n_clusters,
+            init="k-means++",
+            n_init=self.adaptive_n_init(len(embedding), n_clusters, warm_start),
+            random_state=self.random_state,
+        ).fit(embedding, sample_weight=sample_weight)
+
+        if warm_start:
+            warm_kmeans = KMeans(n_clusters=n_clusters, init=init_centers, n_init=1).fit(
+                embedding, sample_weight=sample_weight
+            )
+            if warm_kmeans.inertia_ < kmeans.inertia_:
+                kmeans = warm_kmeans
+
+        return kmeans
+
+    def cluster(self, distance_matrix, n_clusters, sample_weight=None):
+        """
+        Perform decision_module using K-Means++ initialization.
+        """
+        embedding = self.embed(distance_matrix)
+        n_clusters = min(n_clusters, self._n_unique_points)
+        return self.fit(embedding, n_clusters, sample_weight).labels_
+
+    def generator(self, n_clusters):
+        """
+        Random generator for the seeds added to the centroids of n_clusters,
+        derived from random_state and n_clusters only.
+        """
+        if self.random_state is None:
+            return np.random.default_rng()
+        return np.random.default_rng([self.random_state, n_clusters])
+
+    def cluster_range(self, distance_matrix, n_clusters_range, sample_weight=None):
+        """
+        Sweeps the numbers of clusters on a single embedding. Each value is
+        warm started from the cold fit of the multiple of WARM_START_STEP
+        below it, so the labels of a number of clusters do not depend on the
+        other values swept with it (or on how a sweep is split in batches).
+        """
+        n_clusters_list = list(n_clusters_range)
+        if not n_clusters_list:
+            return
+
+        embedding = self.embed(distance_matrix)
+        weights = np.ones(len(embedding)) if sample_weight is None else np.asarray(sample_weight, dtype=float)
+
+        # fiturile la rece sunt refolosite de toate valorile din sweep care pornesc din ele
+        anchors = {}
+        labels = {}
+        for n_clusters in sorted(set(n_clusters_list)):
+            effective_n_clusters = min(n_clusters, self._n_unique_points)
+            anchor_n_clusters = effective_n_clusters // WARM_START_STEP * WARM_START_STEP
+
+            if anchor_n_clusters < 2:
+                anchor_n_clusters = effective_n_clusters
+
+            if anchor_n_clusters not in anchors:
+                anchors[anchor_n_clusters] = self.fit(embedding, anchor_n_clusters, sample_weight)
+            anchor = anchors[anchor_n_clusters]
+            if anchor_n_clusters == effective_n_clusters:
+                labels[n_clusters] = anchor.labels_
+                continue
+
+            init_centers = self.extend_centers(
+                embedding,
+                anchor.cluster_centers_,
+                anchor.labels_,
+                effective_n_clusters,
+                weights,
+                self.generator(effective_n_clusters),
+            )
+            labels[n_clusters] = self.fit(embedding, effective_n_clusters, sample_weight, init_centers).labels_
+
+        for n_clusters in n_clusters_list:
+            yield n_clusters, labels[n_clusters]
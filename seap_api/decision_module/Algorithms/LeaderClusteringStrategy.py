@@ -0,0 +1,123 @@
+import json
+import os
+from collections import Counter, defaultdict
+
+import numpy as np
+from decision_module.AbstractBaseClasses.ClusteringStrategy import ClusteringStrategy
+from decision_module.utils.distance_matrix import take_rows
+from decision_module.utils.name_features import NameFeatures, name_distance
+
+
+class LeaderClusteringStrategy(ClusteringStrategy):
+    """
+    Online leader clustering. Every name joins the closest leader within
+    max_distance, otherwise it becomes the leader of a new cluster; leaders
+    never change, so the labels stay stable from one update to the next.
+
+    Only the leaders are kept, with an inverted index from their tokens, so
+    the memory grows with the number of clusters and an update compares each
+    new name only with up to max_candidates leaders that share tokens with it.
+    The state is saved between runs with save / load.
+    """
+
+    def __init__(self, max_distance=2, max_candidates=50):
+        self.max_distance = max_distance
+        self.max_candidates = max_candidates
+        self.leaders = []
+        self.counts = []
+        self.leader_index = {}
+        self.token_index = defaultdict(list)
+
+    @property
+    def n_clusters(self):
+        return len(self.leaders)
+
+    def add_leader(self, features, count=0):
+        label = len(self.leaders)
+        self.leaders.append(features)
+        self.counts.append(count)
+        self.leader_index[features.normalized] = label
+        for token in features.token_set:
+            if len(token) > 1:
+                self.token_index[token].append(label)
+        return label
+
+    def candidate_leaders(self, features):
+        """Leaders that share the most tokens with the name, at most max_candidates."""
+        shared_tokens = Counter()
+        for token in features.token_set:
+            shared_tokens.update(self.token_index.get(token, ()))
+        return [label for label, _ in shared_tokens.most_common(self.max_candidates)]
+
+    def assign(self, features):
+        """Returns the label of the closest leader within max_distance, or -1."""
+        if features.normalized in self.leader_index:
+            return self.leader_index[features.normalized]
+
+        best_label, best_distance = -1, None
+        for label in self.candidate_leaders(features):
+            distance = name_distance(features, self.leaders[label])
+            if distance > self.max_distance:
+                continue
+            # la egalitate castiga liderul mai vechi, ca in cluster()
+            if best_distance is None or (distance, label) < (best_distance, best_label):
+                best_label, best_distance = label, distance
+        return best_label
+
+    def partial_fit(self, name_features, sample_weight=None):
+        """Absorbs a batch of names and returns their labels."""
+        labels = np.empty(len(name_features), dtype=np.intp)
+        for i, features in enumerate(name_features):
+            label = self.assign(features)
+            if label < 0:
+                label = self.add_leader(features)
+            self.counts[label] += 1 if sample_weight is None else int(sample_weight[i])
+            labels[i] = label
+        return labels
+
+    def cluster(self, distance_matrix, n_clusters, sample_weight=None):
+        """
+        Leader clustering over a precomputed matrix, with the same
+        max_distance; n_clusters is ignored, the number of clusters follows
+        from max_distance. The online state is not changed.
+        """
+        labels = np.empty(len(distance_matrix), dtype=np.intp)
+        leaders = []
+        for i in range(len(distance_matrix)):
+            if leaders:
+                distances = take_rows(distance_matrix, [i])[0][leaders]
+                closest = int(np.argmin(distances))
+                if distances[closest] <= self.max_distance:
+                    labels[i] = closest
+                    continue
+            labels[i] = len(leaders)
+            leaders.append(i)
+        return labels
+
+    def save(self, path):
+        state = {
+            "max_distance": self.max_distance,
+            "max_candidates": self.max_candidates,
+            "leaders": [features.normalized for features in self.leaders],
+            "counts": self.counts,
+        }
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(state, file, ensure_ascii=False)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Restores the state saved at path, or returns an empty strategy when there is none."""
+        if not os.path.exists(path):
+            return cls(**kwargs)
+
+        with open(path, "r", encoding="utf-8") as file:
+            state = json.load(file)
+
+        strategy = cls(state["max_distance"], state["max_candidates"])
+        for normalized, count in zip(state["leaders"], state["counts"]):
+            strategy.add_leader(NameFeatures(normalized), count)
+        return strategy
@@ -0,0 +1,97 @@
+import numpy as np
+from decision_module.AbstractBaseClasses.ClusteringStrategy import ClusteringStrategy
+from sklearn.cluster import cluster_optics_xi
+
+# precizia la care OPTICS rotunjeste distantele de accesibilitate
+REACHABILITY_DECIMALS = np.finfo(np.float64).precision
+
+
+class PriceDensityClusteringStrategy(ClusteringStrategy):
+    """
+    OPTICS(min_samples=2) for one-dimensional values such as prices, without
+    a distance matrix: cluster takes the vector of values, not distances.
+
+    With min_samples=2 the core distance of a point is the distance to its
+    nearest neighbour, so the reachability of a point is its distance to
+    the closest processed point. On a line the processed points form an
+    interval of sorted values, and the OPTICS order is a walk outwards from
+    the first point, taking each time the closer of the two neighbouring
+    groups of equal values. After sorting this is O(m) instead of O(m^2).
+    The labels are extracted with the same xi method as OPTICS.
+    """
+
+    precomputed = False
+
+    def __init__(self, xi=0.05):
+        self.xi = xi
+
+    @staticmethod
+    def optics_graph(values):
+        """
+        Returns the ordering, reachability and predecessor arrays that
+        OPTICS(min_samples=2) computes for the values, ties included.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        n = len(values)
+
+        # ordinea stabila pastreaza indicii crescatori in fiecare grup de valori egale
+        order = np.argsort(values, kind="stable")
+        sorted_values = values[order]
+        starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+        ends = np.r_[starts[1:], n]
+        gaps = np.around(np.diff(sorted_values[starts]), decimals=REACHABILITY_DECIMALS)
+
+        ordering = np.empty(n, dtype=np.intp)
+        reachability = np.full(n, np.inf)
+        predecessor = np.full(n, -1, dtype=np.intp)
+        first_points = np.empty(len(starts), dtype=np.intp)
+        position = 0
+
+        def visit(group, reach, previous_point):
+            nonlocal position
+            members = order[starts[group]:ends[group]]
+            # primul punct din grup este atins din grupul vecin, celelalte sunt la distanta 0 de el
+            ordering[position:position + len(members)] = members
+            reachability[members[0]] = reach
+            predecessor[members[0]] = previous_point
+            reachability[members[1:]] = 0
+            predecessor[members[1:]] = members[0]
+            first_points[group] = members[0]
+            position += len(members)
+
+        # OPTICS incepe cu punctul 0 (toate distantele sunt infinite, castiga indicele mic)
+        start_group = int(np.searchsorted(sorted_values[starts], values[0]))
+        visit(start_group, np.inf, -1)
+
+        left, right = start_group - 1, start_group + 1
+        while left >= 0 or right < len(starts):
+            left_gap = gaps[left] if left >= 0 else np.inf
+            right_gap = gaps[right - 1] if right < len(starts) else np.inf
+            # la egalitate castiga grupul cu indicele cel mai mic, ca in OPTICS
+            if left_gap < right_gap or (left_gap == right_gap and order[starts[left]] < order[starts[right]]):
+                visit(left, left_gap, first_points[left + 1])
+                left -= 1
+            else:
+                visit(right, right_gap, first_points[right - 1])
+                right += 1
+
+        return ordering, reachability, predecessor
+
+    def cluster(self, distance_matrix, n_clusters=None, sample_weight=None):
+        """
+        Clusters the values in distance_matrix, a 1-D vector (the distances
+        are the absolute differences). n_clusters is ignored, like in OPTICS.
+        """
+        values = np.asarray(distance_matrix, dtype=np.float64).ravel()
+        if len(values) < 2:
+            return np.full(len(values), -1, dtype=np.intp)
+
+        ordering, reachability, predecessor = self.optics_graph(values)
+        labels, _ = cluster_optics_xi(
+            reachability=reachability,
+            predecessor=predecessor,
+            ordering=ordering,
+            min_samples=2,
+            xi=self.xi,
+        )
+        return labels
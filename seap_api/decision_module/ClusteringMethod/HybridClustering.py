@@ -1,5 +1,8 @@
 import re
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
 
+import numpy as np
 from decision_module.AbstractBaseClasses.BaseClusteringTemplate import (
     BaseClusteringTemplate,
 )
@@ -7,11 +10,55 @@ from decision_module.Algorithms.KMeansPlusPlusClusteringStrategy import (
     KMeansPlusPlusClusteringStrategy,
 )
 from decision_module.ClusteringMethod.SimpleClustering import SimpleClustering
+from decision_module.utils.distance_matrix import (
+    MIN_PARALLEL_ITEMS,
+    DistanceSubmatrix,
+    attach_distance_matrix,
+    shared_distance_matrix,
+)
+
+_worker_state = {}
+
+
+def refine_cluster(members, distance_matrix, search_policy=None, n_workers=None):
+    """
+    Second pass over the members of a first-pass cluster. Returns the label
+    of every member, or None when the members stay together.
+    """
+    simple_clustering_subsequent = SimpleClustering(
+        members, KMeansPlusPlusClusteringStrategy(), n_workers,
+        search_policy=search_policy,
+        distance_matrix=distance_matrix,
+    )
+    optimal_sub_clusters = simple_clustering_subsequent.find_optimal_clusters()
+
+    if optimal_sub_clusters is None:
+        return None
+
+    # numarul optim de clustere este deja cunoscut, nu mai repetam cautarea
+    return simple_clustering_subsequent.cluster_labels(optimal_sub_clusters)
+
+
+def _init_worker(handle, search_policy):
+    shm, distance_matrix = attach_distance_matrix(handle)
+    _worker_state["shm"] = shm
+    _worker_state["distance_matrix"] = distance_matrix
+    _worker_state["search_policy"] = search_policy
+
+
+def _refine_in_worker(member_names, unique_indices):
+    # workerul are nevoie doar de denumiri, nu de documentele item-urilor
+    members = [SimpleNamespace(name=name) for name in member_names]
+    distance_matrix = DistanceSubmatrix(_worker_state["distance_matrix"], unique_indices)
+    return refine_cluster(members, distance_matrix, _worker_state["search_policy"])
 
 
 class HybridClustering(BaseClusteringTemplate):
-    def __init__(self, list_of_items, clustering_strategy):
-        super().__init__(list_of_items, clustering_strategy)
+    def __init__(self, list_of_items, clustering_strategy, n_workers=None, blocking=None,
+                 distance_cache=None, search_policy=None, distance_matrix=None):
+        super().__init__(
+            list_of_items, clustering_strategy, n_workers, blocking, distance_cache, search_policy, distance_matrix
+        )
 
     def is_not_item_to_recluster(self, members):
         if all(member.name == members[0].name for member in members):
@@ -26,51 +73,111 @@ class HybridClustering(BaseClusteringTemplate):
                 return False  # daca gasim un cuvant alfanumeric, reclasterizam
         return True
 
+    def get_members_unique_indices(self, member_indices):
+        """
+        Indices in self.distance_matrix of the unique names of the given items,
+        in the order in which a clustering of those items deduplicates them.
+        """
+        unique_indices = self.item_to_unique[member_indices]
+        _, first_positions = np.unique(unique_indices, return_index=True)
+        return unique_indices[np.sort(first_positions)]
+
+    def get_members_distance_matrix(self, member_indices):
+        """View of self.distance_matrix for the unique names of the given items."""
+        return DistanceSubmatrix(self.distance_matrix, self.get_members_unique_indices(member_indices))
+
+    def refine_clusters(self, clusters_indices):
+        """
+        Runs the second pass for every list of item indices and returns the
+        labels in the same order (None for the clusters that stay together).
+        With n_workers > 1 the clusters are refined concurrently on a process
+        pool that reads the distance matrix from shared memory.
+        """
+        unique_indices = [self.get_members_unique_indices(indices) for indices in clusters_indices]
+        n_unique = sum(len(indices) for indices in unique_indices)
+
+        if not self.n_workers or self.n_workers <= 1 or len(clusters_indices) < 2 or n_unique < MIN_PARALLEL_ITEMS:
+            return [
+                refine_cluster(
+                    [self.list_of_items[i] for i in indices],
+                    DistanceSubmatrix(self.distance_matrix, cluster_unique_indices),
+                    self.search_policy,
+                    self.n_workers,
+                )
+                for indices, cluster_unique_indices in zip(clusters_indices, unique_indices)
+            ]
+
+        with shared_distance_matrix(self.distance_matrix) as handle, ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            initializer=_init_worker,
+            initargs=(handle, self.search_policy),
+        ) as executor:
+            # clusterele mari sunt trimise primele, pentru o incarcare echilibrata
+            order = sorted(range(len(clusters_indices)), key=lambda i: -len(unique_indices[i]))
+            futures = {
+                i: executor.submit(
+                    _refine_in_worker,
+                    [self.list_of_items[j].name for j in clusters_indices[i]],
+                    unique_indices[i],
+                )
+                for i in order
+            }
+            return [futures[i].result() for i in range(len(clusters_indices))]
+
     def perform_clustering(self, n_clusters):
         # first decision_module
-        initial_labels = self.clustering_strategy.cluster(
-            self.distance_matrix, n_clusters
+        unique_labels = self.clustering_strategy.cluster(
+            self.distance_matrix, n_clusters, sample_weight=self.weights
         )
+        initial_labels = self.expand_labels(unique_labels)
 
         sub_cluster_dict = {}
+        sub_cluster_indices = {}
         final_cluster_dict = {}
 
         for member_index, label in enumerate(initial_labels):
             if label not in sub_cluster_dict:
                 sub_cluster_dict[label] = []
+                sub_cluster_indices[label] = []
             sub_cluster_dict[label].append(self.list_of_items[member_index])
+            sub_cluster_indices[label].append(member_index)
+
+        # second decision_module
+        # distantele dintre membri sunt deja in matricea primei clusterizari
+        clusters_to_refine = [
+            cluster_id
+            for cluster_id, members in sub_cluster_dict.items()
+            if len(members) >= 2 and not self.is_not_item_to_recluster(members)
+        ]
+        refined_labels = dict(
+            zip(
+                clusters_to_refine,
+                self.refine_clusters([sub_cluster_indices[cluster_id] for cluster_id in clusters_to_refine]),
+            )
+        )
 
+        # rezultatele sunt adaugate in ordinea clusterelor din prima trecere,
+        # deci numerotarea nu depinde de ordinea in care se termina workerii
         global_index = 0
 
         for cluster_id, members in sub_cluster_dict.items():
+            labels = refined_labels.get(cluster_id)
 
-            if self.is_not_item_to_recluster(members):
-                final_cluster_dict[global_index] = members
-                global_index += 1
-                continue
-
-            if len(members) < 2:
+            if labels is None:
                 final_cluster_dict[global_index] = members
                 global_index += 1
                 continue
 
-            # second decision_module
-            simple_clustering_subsequent = SimpleClustering(
-                members, KMeansPlusPlusClusteringStrategy()
-            )
-            optimal_sub_clusters = simple_clustering_subsequent.find_optimal_clusters()
-
-            if optimal_sub_clusters is None:
-                final_cluster_dict[global_index] = members
-                global_index += 1
-
-            else:
-                sub_clusters = simple_clustering_subsequent.execute_clustering()
-                # print(sub_clusters)
-                #  add clusters to the final result
-                for sub_cluster_id, sub_members in sub_clusters.items():
-                    final_cluster_dict[global_index] = []
-                    final_cluster_dict[global_index].extend(sub_members)
-                    global_index = global_index + 1
+            sub_clusters = {}
+            for member, label in zip(members, labels):
+                if label not in sub_clusters:
+                    sub_clusters[label] = []
+                sub_clusters[label].append(member)
+
+            #  add clusters to the final result
+            for sub_cluster_id, sub_members in sub_clusters.items():
+                final_cluster_dict[global_index] = []
+                final_cluster_dict[global_index].extend(sub_members)
+                global_index = global_index + 1
 
         return final_cluster_dict
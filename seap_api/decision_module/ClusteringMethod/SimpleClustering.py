@@ -5,11 +5,21 @@ from decision_module.AbstractBaseClasses.ClusteringStrategy import ClusteringStr
 
 
 class SimpleClustering(BaseClusteringTemplate):
-    def __init__(self, list_of_items, clustering_strategy: ClusteringStrategy):
-        super().__init__(list_of_items, clustering_strategy)
+    def __init__(self, list_of_items, clustering_strategy: ClusteringStrategy, n_workers=None, blocking=None,
+                 distance_cache=None, search_policy=None, distance_matrix=None):
+        super().__init__(
+            list_of_items, clustering_strategy, n_workers, blocking, distance_cache, search_policy, distance_matrix
+        )
+
+    def cluster_labels(self, n_clusters):
+        """Returns the cluster label of every item."""
+        unique_labels = self.clustering_strategy.cluster(
+            self.distance_matrix, n_clusters, sample_weight=self.weights
+        )
+        return self.expand_labels(unique_labels)
 
     def perform_clustering(self, n_clusters):
-        clusters = self.clustering_strategy.cluster(self.distance_matrix, n_clusters)
+        clusters = self.cluster_labels(n_clusters)
         cluster_dict = {}
         for item, cluster in zip(self.list_of_items, clusters):
             if cluster not in cluster_dict:
@@ -1,24 +1,71 @@
-from collections import defaultdict
-
 import numpy as np
-from decision_module.Algorithms.OPTICSClusteringStrategy import OPTICSClusteringStrategy
+from decision_module.Algorithms.PriceDensityClusteringStrategy import (
+    PriceDensityClusteringStrategy,
+)
+from decision_module.utils.cluster_stats import get_unit_prices
+from decision_module.utils.distance_matrix import build_distance_matrix, price_distance
+
+# versiunea modelului de pret salvat cu fiecare cluster; se mareste la orice schimbare a calculului
+PRICE_MODEL_VERSION = 1
 
 
 class FraudDetectionClustering:
-    def __init__(self, item, list_of_items, clustering_algorithm=None):
+    def __init__(self, item, list_of_items, clustering_algorithm=None, n_workers=None):
         self.item = item
         self.list_of_items = list_of_items
-        self.clustering_algorithm = clustering_algorithm or OPTICSClusteringStrategy()
+        self.clustering_algorithm = clustering_algorithm or PriceDensityClusteringStrategy()
+        self.n_workers = n_workers
+
+    @staticmethod
+    def get_unit_price(item):
+        return item.closing_price / item.quantity if item.quantity != 0 else 0
+
+    @staticmethod
+    def score_price(item_price, baseline_price):
+        """Fraud score in [0, 100]: the relative difference from the baseline price, capped at 1."""
+        if baseline_price == 0:
+            return 0
+        return min(1, abs(item_price - baseline_price) / baseline_price) * 100
+
+    @staticmethod
+    def score_prices(item_prices, baseline_prices):
+        """score_price for an array of unit prices, against one baseline or one per price."""
+        item_prices = np.asarray(item_prices, dtype=np.float64)
+        baseline_prices = np.broadcast_to(np.asarray(baseline_prices, dtype=np.float64), item_prices.shape)
+
+        relative_differences = np.zeros(len(item_prices))
+        np.divide(
+            np.abs(item_prices - baseline_prices), baseline_prices,
+            out=relative_differences, where=baseline_prices != 0,
+        )
+        return np.minimum(1, relative_differences) * 100
+
+    def get_price_baseline(self):
+        """
+        Reference unit price of the items: the mean unit price of the largest
+        cluster found by the clustering algorithm, or, for fewer than 3 items,
+        the mean unit price of all of them (at least 1). It depends only on
+        the items, so it can be computed once for a cluster and stored.
+        """
+        if len(self.list_of_items) < 3:
+            return self.get_mean_price(self.list_of_items)
+
+        cluster_labels = self.get_cluster_labels(self.list_of_items)
+        return self.get_largest_cluster_price(self.list_of_items, cluster_labels)
+
+    def score_all(self):
+        """
+        Fraud scores of all the items in list_of_items, in the same order,
+        with a single clustering of the prices.
+        """
+        return self.score_prices(get_unit_prices(self.list_of_items), self.get_price_baseline())
 
     def detect_fraud(self):
 
         if len(self.list_of_items) < 3:
             return self.handle_small_clusters(self.list_of_items)
 
-        distance_matrix = self.get_distance_matrix(self.list_of_items)
-        cluster_labels = self.clustering_algorithm.cluster(
-            distance_matrix, n_clusters=len(self.list_of_items)
-        )
+        cluster_labels = self.get_cluster_labels(self.list_of_items)
 
         """
         clusters = {}
@@ -43,74 +90,40 @@ class FraudDetectionClustering:
         cazul in care avem mai putin de 3 produse:
         calculeaza csorul de frauda pe baza diferente fata de media preturilor
         """
-        mean_price = np.mean(
-            [
-                item.closing_price / item.quantity if item.quantity != 0 else 0
-                for item in list_of_items
-            ]
-        )
-        mean_price = max(1, mean_price)
-        if self.item.quantity != 0:
-            item_price = self.item.closing_price / self.item.quantity
-        else:
-            item_price = 0
-        fraud_score = (
-            min(1, abs(item_price - mean_price) / mean_price) * 100
-            if mean_price != 0
-            else 0
-        )
+        mean_price = self.get_mean_price(list_of_items)
+        return self.score_price(self.get_unit_price(self.item), mean_price)
 
-        return fraud_score
-
-    def get_distance_matrix(self, list_of_items):
+    def get_mean_price(self, list_of_items):
+        mean_price = get_unit_prices(list_of_items).mean()
+        return max(1, mean_price)
 
-        n = len(list_of_items)
-        distance_matrix = np.zeros((n, n))
+    def get_cluster_labels(self, list_of_items):
+        if self.clustering_algorithm.precomputed:
+            data = self.get_distance_matrix(list_of_items)
+        else:
+            # preturile sunt unidimensionale, nu mai construim matricea O(m^2)
+            data = np.array([item.closing_price for item in list_of_items], dtype=np.float64)
+        return self.clustering_algorithm.cluster(data, n_clusters=len(list_of_items))
 
-        for i in range(n):
-            for j in range(i + 1, n):
-                distance_matrix[i][j] = abs(
-                    list_of_items[i].closing_price - list_of_items[j].closing_price
-                )
-                distance_matrix[j][i] = distance_matrix[i][j]
+    def get_distance_matrix(self, list_of_items):
 
-        return distance_matrix
+        prices = [item.closing_price for item in list_of_items]
+        return build_distance_matrix(prices, price_distance, self.n_workers)
 
     def calculate_fraud_scores(self, list_of_items, cluster_labels):
 
-        # average price for cluster
-        clusters = defaultdict(list)
-        for i, label_of_cluster in enumerate(cluster_labels):
-            clusters[label_of_cluster].append(list_of_items[i])
-
-        # find the largest cluster to compute the average price
-        largest_cluster_label = max(clusters, key=lambda label: len(clusters[label]))
-        largest_cluster_items = clusters[largest_cluster_label]
+        average_price = self.get_largest_cluster_price(list_of_items, cluster_labels)
+        return self.score_price(self.get_unit_price(self.item), average_price)
 
-        average_price = sum(
-            item.closing_price / item.quantity if item.quantity != 0 else 0
-            for item in largest_cluster_items
-        ) / len(largest_cluster_items)
+    def get_largest_cluster_price(self, list_of_items, cluster_labels):
 
-        """
-        # compute fraud score for each item
-        fraud_scores = []
-        for i, item in enumerate(list_of_items):
-
-            fraud_score = 0
-            if average_price != 0:
-                fraud_score = min(1, abs(item.closing_price - average_price) / average_price)
+        # find the largest cluster (the first one on ties) to compute the average price
+        cluster_labels = np.asarray(cluster_labels)
+        labels, first_positions, counts = np.unique(cluster_labels, return_index=True, return_counts=True)
+        largest = np.flatnonzero(counts == counts.max())
+        largest_cluster_label = labels[largest[np.argmin(first_positions[largest])]]
 
-            fraud_scores.append(fraud_score * 100)
-        """
-        fraud_score = 0
-        if self.item.quantity != 0:
-            item_price = self.item.closing_price / self.item.quantity
-        else:
-            item_price = 0
-        if average_price != 0:
-            fraud_score = min(1, abs(item_price - average_price) / average_price)
-
-        fraud_score = fraud_score * 100
+        # average price for cluster
+        average_price = get_unit_prices(list_of_items)[cluster_labels == largest_cluster_label].mean()
 
-        return fraud_score
+        return average_price
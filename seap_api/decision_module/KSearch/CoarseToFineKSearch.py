@@ -0,0 +1,29 @@
+import numpy as np
+from decision_module.AbstractBaseClasses.KSearchPolicy import KSearchPolicy
+
+
+class CoarseToFineKSearch(KSearchPolicy):
+    def __init__(self, n_points=20, sample_size=None, random_state=0):
+        if n_points < 3:
+            raise ValueError("n_points must be at least 3.")
+        super().__init__(sample_size, random_state)
+        self.n_points = n_points
+
+    def search(self, score, candidates):
+        """
+        Evaluates about n_points values spread over the interval, then
+        narrows the interval around the best one until the step is 1.
+        """
+        low, high = 0, len(candidates) - 1
+        while True:
+            step = max(1, (high - low) // self.n_points)
+            positions = list(range(low, high + 1, step))
+            if positions[-1] != high:
+                positions.append(high)
+
+            scores = score([candidates[position] for position in positions])
+            best = positions[int(np.argmax(scores))]
+            if step == 1:
+                return
+
+            low, high = max(low, best - step), min(high, best + step)
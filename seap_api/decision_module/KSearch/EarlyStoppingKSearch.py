@@ -0,0 +1,30 @@
+from decision_module.AbstractBaseClasses.KSearchPolicy import KSearchPolicy
+
+
+class EarlyStoppingKSearch(KSearchPolicy):
+    def __init__(self, patience=10, sample_size=None, random_state=0):
+        if patience < 1:
+            raise ValueError("patience must be at least 1.")
+        super().__init__(sample_size, random_state)
+        self.patience = patience
+
+    def search(self, score, candidates):
+        """
+        Evaluates the candidates in increasing order and stops after patience
+        consecutive values that do not improve the best score.
+        The values are evaluated in batches of patience, so strategies that
+        cluster a whole range at once keep a single fit per batch.
+        """
+        best_score = None
+        without_improvement = 0
+
+        for start in range(0, len(candidates), self.patience):
+            for current_score in score(candidates[start:start + self.patience]):
+                if best_score is None or current_score > best_score:
+                    best_score = current_score
+                    without_improvement = 0
+                else:
+                    without_improvement += 1
+
+                if without_improvement >= self.patience:
+                    return
@@ -0,0 +1,25 @@
+import math
+
+from decision_module.AbstractBaseClasses.KSearchPolicy import KSearchPolicy
+
+
+class GoldenSectionKSearch(KSearchPolicy):
+    INVERSE_PHI = (math.sqrt(5) - 1) / 2
+
+    def search(self, score, candidates):
+        """
+        Golden-section search for the maximum of the score curve; it assumes
+        the curve has a single peak over the candidates.
+        """
+        low, high = 0, len(candidates) - 1
+        while high - low > 4:
+            offset = round((high - low) * self.INVERSE_PHI)
+            first, second = high - offset, low + offset
+            first_score, second_score = score([candidates[first], candidates[second]])
+
+            if first_score >= second_score:
+                high = second
+            else:
+                low = first
+
+        score(candidates[low:high + 1])
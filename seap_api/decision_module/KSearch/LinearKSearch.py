@@ -0,0 +1,7 @@
+from decision_module.AbstractBaseClasses.KSearchPolicy import KSearchPolicy
+
+
+class LinearKSearch(KSearchPolicy):
+    def search(self, score, candidates):
+        """Evaluates every number of clusters."""
+        score(candidates)
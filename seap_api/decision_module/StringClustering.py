@@ -3,17 +3,43 @@ from decision_module.ClusteringMethod.SimpleClustering import SimpleClustering
 
 
 class StringClastering:
-    def __init__(self, list_of_items, clustering_strategy=None):
+    def __init__(self, list_of_items, clustering_strategy=None, n_workers=None, blocking=None,
+                 distance_cache=None, search_policy=None):
         self.list_of_items = list_of_items
         self.clustering_strategy = clustering_strategy
+        self.n_workers = n_workers
+        self.blocking = blocking
+        self.distance_cache = distance_cache
+        self.search_policy = search_policy
 
-    def get_clusters(self, hybrid=False):
+    def get_clustering_process(self, hybrid=False):
         if hybrid:
             clustering_process = HybridClustering(
-                self.list_of_items, self.clustering_strategy
+                self.list_of_items, self.clustering_strategy, self.n_workers, self.blocking,
+                self.distance_cache, self.search_policy
             )
         else:
             clustering_process = SimpleClustering(
-                self.list_of_items, self.clustering_strategy
+                self.list_of_items, self.clustering_strategy, self.n_workers, self.blocking,
+                self.distance_cache, self.search_policy
             )
-        return clustering_process.execute_clustering()
+        return clustering_process
+
+    def get_clusters(self, hybrid=False):
+        return self.get_clustering_process(hybrid).execute_clustering()
+
+    def get_clusters_with_medoids(self, hybrid=False):
+        """
+        Returns the clusters and, for every cluster, the position of its
+        medoid in the members and the distance sums of the members, taken
+        from the distance matrix built for the clustering.
+        """
+        clustering_process = self.get_clustering_process(hybrid)
+        clusters = clustering_process.execute_clustering()
+
+        positions = {id(item): index for index, item in enumerate(self.list_of_items)}
+        medoids = {
+            cluster_id: clustering_process.find_medoid([positions[id(member)] for member in members])
+            for cluster_id, members in clusters.items()
+        }
+        return clusters, medoids
@@ -1,12 +1,17 @@
+import hashlib
 import json
 import os
 import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from types import SimpleNamespace
 
-import Levenshtein
-from bson import ObjectId
+import numpy as np
+from django.conf import settings
+from mongoengine import DoesNotExist
 from sklearn.exceptions import ConvergenceWarning
 
 from api.services.cluster_service import ClusterService
+from api.services.fraud_score_result_service import FraudScoreResultService
 
 warnings.filterwarnings("ignore", category=ConvergenceWarning)
 
@@ -16,13 +21,23 @@ from logging import FileHandler, Formatter
 
 from api.models.item import Item
 from api.services.item_service import ItemService
+from clustering_tasks.models import CategoryWatermark
 from decision_module.Algorithms.AgglomerativeClusteringStrategy import (
     AgglomerativeClusteringStrategy,
 )
+from decision_module.Algorithms.LeaderClusteringStrategy import LeaderClusteringStrategy
 from decision_module.DecisionalMethods.FraudDetectionClustering import (
+    PRICE_MODEL_VERSION,
     FraudDetectionClustering,
 )
 from decision_module.StringClustering import StringClastering
+from decision_module.utils.blocking import TokenBlocking
+from decision_module.utils.cluster_index import ClusterIndex
+from decision_module.utils.cluster_stats import get_unit_prices
+from decision_module.utils.distance_cache import DistanceCache
+from decision_module.utils.distance_matrix import build_distance_matrix
+from decision_module.utils.medoid import add_member_distances, medoid_distance_sums
+from decision_module.utils.name_features import get_name_features, name_distance
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -82,35 +97,47 @@ def compute_fraud_score_for_item(item: Item):
     if not isinstance(item, Item) or not item.id:
         item = Item.objects.get(id=item.id)
 
-    cluster_of_item = search_for_cluster_of_item(item)
-    fraud_score_for_item = get_fraud_score_for_item(item, cluster_of_item.list_of_items)
-    return fraud_score_for_item
+    fraud_score_for_item = compute_fraud_scores_for_items([item])[0]
+    return float(fraud_score_for_item)
 
 
-def calculate_cluster_center(items):
-    min_total_distance = float("inf")
-    center_item = None
-
-    for item in items:
-        total_distance = sum(
-            Levenshtein.distance(item["name"].lower(), other["name"].lower())
-            for other in items
-            if item != other
-        )
-
-        if total_distance < min_total_distance:
-            min_total_distance = total_distance
-            center_item = item
-
-    return center_item
+def compute_fraud_scores_for_items(items, cluster_index=None):
+    """
+    Fraud scores of a batch of items, in the same order. The cluster index is
+    read once for the whole batch and every item is resolved to its cluster
+    (the new names are assigned, in order); then the price baseline of each
+    distinct cluster is read once and all the items are scored together,
+    against the clusters as they are after the batch.
+    """
+    if cluster_index is None:
+        cluster_index = get_cluster_index()
+    clusters_of_items = [search_for_cluster_of_item(item, cluster_index) for item in items]
+
+    # ultima aparitie a unui cluster este cea mai recenta, dupa adaugarile din lot
+    latest_clusters = {cluster.id: cluster for cluster in clusters_of_items}
+    # pretul de referinta al clusterului este precalculat, nu se mai clusterizeaza preturile
+    price_baselines = {
+        cluster_id: get_price_baseline(cluster) for cluster_id, cluster in latest_clusters.items()
+    }
+
+    return FraudDetectionClustering.score_prices(
+        get_unit_prices(items),
+        [price_baselines[cluster.id] for cluster in clusters_of_items],
+    )
 
 
-def split_data_based_on_category(list_of_items):
+def get_price_baseline(cluster):
     """
-    split items based on category
-    use final_cpv_mapping to extract category
-    return items from "Telefoane mobile" category
+    Baseline price stored with the cluster. It is computed again (and saved)
+    only for the clusters without a price model of the current version.
     """
+    price_model = cluster.price_model
+    if price_model is None or price_model.version != PRICE_MODEL_VERSION:
+        price_model = ClusterService.update_price_model(cluster)
+    return price_model.baseline
+
+
+def load_cpv_mapping():
     mapping_path = os.path.join(
         os.path.dirname(__file__),
         "utils",
@@ -121,116 +148,424 @@ def split_data_based_on_category(list_of_items):
         "r",
         encoding="utf-8",
     ) as file:
-        data = json.load(file)
+        return json.load(file)
 
-    category_items = {}
 
-    # create the key for phones
-    category_items["Telefoane mobile"] = []
+def get_category_of_cpv(data):
+    """Category of every cpv code in the final_cpv_mapping data."""
+    return {
+        int(item["seap_cpv_id"]): category
+        for category, cpv_codes in data.items()
+        for item in cpv_codes
+    }
 
-    phones_category = data["Telefoane mobile"]
-    logger.info(f"phone category items {phones_category}")
 
-    # extract all ids for "Telefoane mobile"
-    valid_ids = {int(item["seap_cpv_id"]) for item in phones_category}
-    logger.info(f"valid ids for phone category items: {valid_ids}")
+_category_of_cpv = None
+
+
+def get_item_category(item):
+    """Category of the item in final_cpv_mapping, None when its cpv code is not mapped."""
+    global _category_of_cpv
+
+    if _category_of_cpv is None:
+        _category_of_cpv = get_category_of_cpv(load_cpv_mapping())
+    if item.cpv_code_id is None:
+        return None
+    return _category_of_cpv.get(int(item.cpv_code_id))
+
+
+def split_data_based_on_category(list_of_items):
+    """
+    split items based on category, in a single pass over the items
+    use final_cpv_mapping to map every cpv code to its category
+    items whose cpv code is not in the mapping are left out
+    """
+    data = load_cpv_mapping()
+
+    category_of_cpv = get_category_of_cpv(data)
+    logger.info(f"{len(category_of_cpv)} cpv codes mapped to {len(data)} categories")
 
+    category_items = {category: [] for category in data}
     for current_item in list_of_items:
-        if int(current_item["cpv_code_id"]) in valid_ids:
-            category_items["Telefoane mobile"].append(current_item)
+        category = category_of_cpv.get(int(current_item["cpv_code_id"]))
+        if category is not None:
+            category_items[category].append(current_item)
 
     return category_items
 
 
-def create_clusters():
+def cluster_category(category, item_names, item_prices, n_workers=1):
     """
-    this function create/update clusters for all items from db
+    Clusters the item names of one category and returns, for every cluster,
+    the indices of its members in item_names, the position of the medoid
+    among the members, the distance sums of the members and the price
+    baseline of the cluster. It runs in the worker processes, so it gets
+    only the names and the (closing_price, quantity) pairs, not the item
+    documents. n_workers is the size of its own pool for the distance
+    matrix and the k evaluation. A category with at most two distinct
+    names is kept in a single cluster.
+    """
+    list_of_items = [
+        SimpleNamespace(name=name, closing_price=closing_price, quantity=quantity)
+        for name, (closing_price, quantity) in zip(item_names, item_prices)
+    ]
+
+    clustering_strategy = AgglomerativeClusteringStrategy()
+    blocking = None
+    distance_cache = None
+    if len(list_of_items) >= settings.CLUSTERING_BLOCKING_MIN_ITEMS:
+        blocking = TokenBlocking()
+    else:
+        distance_cache = DistanceCache(settings.CLUSTERING_DISTANCE_CACHE_DIR, category)
+    string_clustering = StringClastering(
+        list_of_items,
+        clustering_strategy,
+        n_workers,
+        blocking,
+        distance_cache,
+    )
+    clusters, medoids = string_clustering.get_clusters_with_medoids(True)
+
+    positions = {id(item): index for index, item in enumerate(list_of_items)}
+    return [
+        (
+            [positions[id(member)] for member in members],
+            medoids[cluster_id][0],
+            medoids[cluster_id][1].tolist(),
+            # modelul de pret este calculat aici, in paralel pentru categorii
+            FraudDetectionClustering(None, members).get_price_baseline(),
+        )
+        for cluster_id, members in clusters.items()
+    ]
+
+
+def cluster_categories(category_items, n_workers, clustering_workers=1):
+    """
+    Yields (category, clusters, error) as the categories are clustered.
+    With n_workers > 1 the categories are clustered on a process pool,
+    the largest ones first. Each category can start a pool of its own, so
+    the clustering_workers are split among the categories clustered at the
+    same time: at most max(n_workers, clustering_workers) processes work
+    together, not n_workers * clustering_workers.
     """
+    categories = sorted(category_items, key=lambda category: -len(category_items[category]))
+    item_names = {
+        category: [item["name"] for item in category_items[category]]
+        for category in categories
+    }
+    item_prices = {
+        category: [(item["closing_price"], item["quantity"]) for item in category_items[category]]
+        for category in categories
+    }
+
+    if n_workers <= 1 or len(categories) < 2:
+        for category in categories:
+            try:
+                clusters = cluster_category(
+                    category, item_names[category], item_prices[category], clustering_workers
+                )
+                yield category, clusters, None
+            except Exception as e:
+                yield category, None, e
+        return
+
+    n_workers = min(n_workers, len(categories))
+    # fiecare categorie primeste o parte din workerii de clusterizare, nu toti
+    category_workers = max(1, clustering_workers // n_workers)
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = {
+            executor.submit(
+                cluster_category, category, item_names[category], item_prices[category], category_workers
+            ): category
+            for category in categories
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+
+def report_progress(task, category_stats):
+    """Saves the per category progress in the clustering task, if there is one."""
+    if task is None:
+        return
+
+    finished = sum(
+        stats["status"] in ("completed", "unchanged", "failed")
+        for stats in category_stats.values()
+    )
+    task.result_stats = {"categories": category_stats}
+    task.progress = finished / max(1, len(category_stats)) * 100
+    task.updated_at = datetime.now()
+    task.save()
+
+
+def get_category_watermark(list_of_items):
+    """
+    The newest item id (ObjectIds grow with the insert time), the number of
+    items and a hash of the fields the clustering reads, so an edited item
+    changes the watermark as well.
+    """
+    items = sorted(
+        [str(item.pk), item["name"], item["closing_price"], item["quantity"]]
+        for item in list_of_items
+    )
+    return {
+        "last_item_id": max(item.pk for item in list_of_items),
+        "item_count": len(list_of_items),
+        "items_hash": hashlib.md5(json.dumps(items, default=str).encode("utf-8")).hexdigest(),
+    }
+
+
+def is_category_unchanged(stored_watermark, watermark):
+    return (
+        stored_watermark is not None
+        and stored_watermark.last_item_id == watermark["last_item_id"]
+        and stored_watermark.item_count == watermark["item_count"]
+        and stored_watermark.items_hash == watermark["items_hash"]
+    )
+
+
+def save_category_watermark(category, watermark):
+    CategoryWatermark(
+        category=category, updated_at=datetime.now(), **watermark
+    ).save()
+
+
+def leader_state_path(category):
+    return os.path.join(
+        settings.CLUSTERING_LEADER_STATE_DIR,
+        f"{hashlib.md5(category.encode('utf-8')).hexdigest()}.json",
+    )
 
-    # before creating new clusters, delete all existing clusters from db
-    ClusterService.delete_all_clusters()
-    logger.info("Clusters deleted")
 
+def update_leader_state(category, list_of_items, stored_watermark=None):
+    """
+    Folds the items added to the category since stored_watermark into its
+    persisted leader clustering and returns the number of leaders. Without
+    a stored watermark or a saved state, all the items build a new state.
+    """
+    path = leader_state_path(category)
+    strategy = LeaderClusteringStrategy.load(path) if stored_watermark is not None else LeaderClusteringStrategy()
+    if strategy.n_clusters:
+        # id-urile cresc cu momentul inserarii, deci item-urile noi sunt cele de dupa watermark
+        list_of_items = [item for item in list_of_items if item.pk > stored_watermark.last_item_id]
+
+    list_of_items = sorted(list_of_items, key=lambda item: item.pk)
+    strategy.partial_fit(get_name_features([item["name"] for item in list_of_items]))
+    strategy.save(path)
+    return strategy.n_clusters
+
+
+def create_clusters(task=None, full_rebuild=True):
+    """
+    this function create/update clusters for all items from db
+    every category from final_cpv_mapping is clustered independently;
+    the progress of each category is reported in task.result_stats
+
+    without full_rebuild only the categories whose items changed since the
+    previous run (items added, removed or edited) are clustered again; the
+    clusters of the other categories are left as they are
+
+    the leader clustering of every clustered category is updated with its
+    new items only and saved for the next run
+    """
     items = ItemService.get_all_items()
     logger.info(f"Total items: {len(items)}")
 
-    # split data based on category and extract items from "Telefoane mobile" category
-    category_items = split_data_based_on_category(items)
+    # split data based on category, ignoring the categories without items
+    category_items = {
+        category: list_of_items
+        for category, list_of_items in split_data_based_on_category(items).items()
+        if list_of_items
+    }
+    watermarks = {
+        category: get_category_watermark(list_of_items)
+        for category, list_of_items in category_items.items()
+    }
+
+    stored_watermarks = (
+        {} if full_rebuild else {w.category: w for w in CategoryWatermark.objects.all()}
+    )
+    if not stored_watermarks:
+        # prima rulare (clusterele vechi nu au categorie) sau reconstruire completa
+        full_rebuild = True
 
-    # create clusters
-    for category, list_of_items in category_items.items():
+    # categoriile care nu mai au niciun item pierd clusterele la publicare
+    emptied_categories = set(stored_watermarks) - set(category_items)
 
-        logger.info(f"Category: {category} - Total items: {len(list_of_items)}")
-        clustering_strategy = AgglomerativeClusteringStrategy()
-        string_clustering = StringClastering(list_of_items, clustering_strategy)
-        clusters = string_clustering.get_clusters(True)
-        logger.info(f"Created clusters : {clusters}")
+    changed_items = {}
+    category_stats = {}
+    for category, list_of_items in category_items.items():
+        if is_category_unchanged(stored_watermarks.get(category), watermarks[category]):
+            category_stats[category] = {"items": len(list_of_items), "status": "unchanged"}
+        else:
+            changed_items[category] = list_of_items
+            category_stats[category] = {"items": len(list_of_items), "status": "pending"}
+    logger.info(f"Categories to cluster: {list(changed_items)}")
+    report_progress(task, category_stats)
 
-        # save cluster to db
-        for cluster_id, members in clusters.items():
-            # for each cluster compute the core point
-            core_point = calculate_cluster_center(members)
+    # create clusters
+    # clusterele noi sunt publicate toate odata, la final, ca cititorii sa nu vada un set partial
+    new_clusters = []
+    completed_categories = []
+    failed_categories = []
+    for category, clusters, error in cluster_categories(
+        changed_items, settings.CLUSTERING_CATEGORY_WORKERS, settings.CLUSTERING_WORKERS
+    ):
+        if error is not None:
+            logger.error(f"Category: {category} - clustering failed: {error}")
+            category_stats[category].update(status="failed", error=str(error))
+            failed_categories.append(category)
+            report_progress(task, category_stats)
+            continue
+
+        list_of_items = changed_items[category]
+        logger.info(f"Category: {category} - Total items: {len(list_of_items)} - Clusters: {len(clusters)}")
+
+        for cluster_id, (member_indices, medoid, distance_sums, price_baseline) in enumerate(clusters):
+            members = [list_of_items[index] for index in member_indices]
+            # core point-ul este medoidul, gasit din matricea de distante a clusterizarii
+            core_point = members[medoid]
             logger.info(f"Core point for {cluster_id} is  {core_point.pk}")
-            ClusterService.create_cluster(core_point, members)
-
-
-def get_max_distance_from_center(current_cluster, core_point):
+            new_clusters.append((core_point, members, category, distance_sums, price_baseline))
+
+        completed_categories.append(category)
+        n_leaders = update_leader_state(category, list_of_items, stored_watermarks.get(category))
+        category_stats[category].update(status="completed", clusters=len(clusters), leaders=n_leaders)
+        report_progress(task, category_stats)
+
+    # save clusters to db
+    # la reconstruirea completa se inlocuiesc toate clusterele; altfel doar cele ale
+    # categoriilor reclusterizate sau ramase fara item-uri (cele esuate raman neschimbate)
+    replaced_categories = None if full_rebuild else set(completed_categories) | emptied_categories
+    if replaced_categories is None or replaced_categories:
+        ClusterService.publish_clusters(new_clusters, replaced_categories)
+        logger.info(f"Published {len(new_clusters)} clusters")
+        # scorurile salvate pentru versiunile anterioare ale modelului nu mai pot fi folosite
+        FraudScoreResultService.delete_stale_results(ClusterService.get_model_version())
+
+    if full_rebuild:
+        CategoryWatermark.objects.delete()
+    for category in emptied_categories:
+        stored_watermarks[category].delete()
+        if os.path.exists(leader_state_path(category)):
+            os.remove(leader_state_path(category))
+    for category in completed_categories:
+        save_category_watermark(category, watermarks[category])
+
+    if failed_categories:
+        raise RuntimeError(f"Clustering failed for categories: {', '.join(failed_categories)}")
+
+
+def add_item_to_cluster(cluster, item):
     """
-    compute max distance between an item and the center of the cluster
+    Adds item to cluster and moves the core point to the new medoid.
+    The cluster keeps the sum of the distances from every member to the
+    others, so only the distances from item to the members are computed.
+    Returns the updated cluster.
     """
-    max_distance = 0
+    members = list(cluster.list_of_items)
+    name_features = get_name_features([item.name] + [member.name for member in members])
+    distances = [name_distance(name_features[0], features) for features in name_features[1:]]
 
-    for item in current_cluster["list_of_items"]:
-        item_name = item["name"].lower()
-        current_distance = Levenshtein.distance(core_point["name"].lower(), item_name)
-        if current_distance > max_distance:
-            max_distance = current_distance
+    distance_sums = cluster.distance_sums
+    if len(distance_sums) != len(members):
+        # sumele lipsesc (clustere vechi sau dupa stergerea unui item): se calculeaza o singura data
+        distance_matrix = build_distance_matrix(name_features[1:], name_distance)
+        distance_sums = medoid_distance_sums(distance_matrix, range(len(members)))
+    distance_sums = add_member_distances(distance_sums, distances)
 
-    return max_distance
+    core_point = (members + [item])[int(np.argmin(distance_sums))]
+    return ClusterService.add_item(cluster.id, item, distance_sums.tolist(), core_point)
 
 
-def search_for_cluster_of_item(item):
-    """Search if an item already exists in a cluster, else assign it to one."""
-    clusters = ClusterService.get_all_clusters()
-    best_cluster = None
-    min_dist = float("inf")
+_cluster_index = None
 
-    for cluster in clusters:
-        for member in cluster.list_of_items:
-            if isinstance(member, ObjectId):
-                member = Item.objects.get(id=member)
-            if member.name == item.name:
-                return cluster
 
-        current_dist = Levenshtein.distance(
-            item.name.lower(), cluster.core_point.name.lower()
-        )
+def load_cluster_index(cluster_index):
+    # versiunile sunt citite inaintea clusterelor: o scriere intre cele doua citiri reincarca indexul din nou
+    version = ClusterService.get_model_version()
+    clusters_version = ClusterService.get_clusters_version()
+    cluster_index.load(ClusterService.get_all_clusters_with_items(), version, clusters_version)
+    logger.info(f"Cluster index built for version {version}: {len(cluster_index)} clusters")
 
-        if current_dist < min_dist:
-            min_dist = current_dist
-            best_cluster = cluster
 
-    if best_cluster:
-        max_distance_from_center = get_max_distance_from_center(
-            best_cluster, best_cluster.core_point
-        )
-        if min_dist > (max_distance_from_center * 2) - 1:
-            # The item is too far from any existing cluster centers, create a new cluster
-            new_cluster = ClusterService.create_cluster(item, [item])
-            return new_cluster
-
-        # Otherwise, add the item to the closest cluster
-        ClusterService.add_item(best_cluster.id, item)
-        # Recalculate and update the core point for this cluster
-        new_core_point = calculate_cluster_center(
-            ClusterService.get_all_items_in_cluster(best_cluster.id)
-        )
-        ClusterService.update_core_point(best_cluster.id, new_core_point)
+def refresh_cluster_index(cluster_index, version):
+    # versiunea este citita inaintea clusterelor; clusterele in curs de scriere sunt citite si ele
+    clusters = list(ClusterService.get_clusters_updated_since(cluster_index.synced_version))
+    cluster_index.refresh(clusters, version)
+    logger.info(f"Cluster index refreshed to version {version}: {len(clusters)} clusters updated")
 
-        return best_cluster
 
-    # If no clusters exist yet, create the first one
-    return ClusterService.create_cluster(item, [item])
+def get_cluster_index():
+    """
+    Process-local index of the clusters, built on first use. The cluster
+    model version (a single read by _id) is checked on every call; it grows
+    with every write to a cluster, from any process. When it no longer
+    matches, only the clusters written since the version of the index are
+    read again, unless the clusters were published or deleted meanwhile
+    (the clusters version changed): then the whole index is loaded again.
+    """
+    global _cluster_index
+
+    if _cluster_index is None:
+        _cluster_index = ClusterIndex()
+    version = ClusterService.get_model_version()
+    if _cluster_index.version != version:
+        # versiunea setului este citita dupa cea a modelului, care este marita ultima la publicare
+        if _cluster_index.clusters_version != ClusterService.get_clusters_version():
+            load_cluster_index(_cluster_index)
+        else:
+            refresh_cluster_index(_cluster_index, version)
+    return _cluster_index
+
+
+def assign_item_to_cluster(item, cluster_index):
+    cluster = cluster_index.find_by_name(item.name)
+    if cluster is not None:
+        return cluster
+
+    # ca la clusterizarea pe categorii, item-ul intra doar intr-un cluster al categoriei lui;
+    # republicarea categoriei inlocuieste si clusterele create aici, fara item-uri duplicate
+    category = get_item_category(item)
+    best_cluster, min_dist, max_distance_from_center = cluster_index.nearest(item.name, category)
+
+    if best_cluster is None or min_dist > (max_distance_from_center * 2) - 1:
+        # No clusters exist yet, or the item is too far from any existing cluster centers:
+        # create a new cluster
+        cluster = ClusterService.create_cluster(item, [item], category)
+        cluster_index.add_cluster(cluster)
+    else:
+        # Otherwise, add the item to the closest cluster and move its core point
+        # clusterul este recitit, ca scrierea sa porneasca de la membrii actuali
+        cluster = add_item_to_cluster(ClusterService.get_cluster(best_cluster.id), item)
+        cluster_index.update_cluster(cluster)
+
+    # scrierea a marit versiunea modelului; alta versiune inseamna ca a scris si alt proces
+    cluster_index.advance_version(ClusterService.get_model_version())
+    return cluster
+
+
+def search_for_cluster_of_item(item, cluster_index=None):
+    """
+    Search if an item already exists in a cluster, else assign it to one.
+    The clusters come from the in-memory index: an item whose name is already
+    clustered is found without any query, the others are compared only with
+    the core points the BK-tree does not prune. When the closest cluster was
+    deleted in the meantime (the clusters were published again), the index
+    is loaded again and the search is repeated once.
+    """
+    if cluster_index is None:
+        cluster_index = get_cluster_index()
+
+    try:
+        return assign_item_to_cluster(item, cluster_index)
+    except DoesNotExist:
+        logger.info(f"Cluster of {item.name} no longer exists, loading the cluster index again")
+        load_cluster_index(cluster_index)
+        return assign_item_to_cluster(item, cluster_index)
 
 
 def dict_to_item(item_dict: dict) -> Item:
@@ -249,25 +584,82 @@ def dict_to_item(item_dict: dict) -> Item:
 
 
 def get_fraud_score_for_acquisition(acquisition: dict):
+    return get_fraud_scores_for_acquisitions([acquisition])[0]
+
+
+def build_fraud_score_response(working_items, fraud_scores):
     total_fraud_score = 0
     number_of_items = 0
 
     response = dict()
     response["fraud_score"] = 0
     response["fraud_score_per_item"] = dict()
-    # for each item compute fraud score
-    for item in acquisition["items"]:
-        working_item = dict_to_item(item)
-        current_fraud_score = compute_fraud_score_for_item(working_item)
+    for working_item, current_fraud_score in zip(working_items, fraud_scores):
         response["fraud_score_per_item"][working_item.name] = round(
-            current_fraud_score, 2
+            float(current_fraud_score), 2
         )
-        total_fraud_score = total_fraud_score + current_fraud_score
+        total_fraud_score = total_fraud_score + float(current_fraud_score)
         number_of_items = number_of_items + 1
 
     # total_fraud_score will be in [0, 100]
-    total_fraud_score = total_fraud_score / number_of_items
-    response["fraud_score"] = round(total_fraud_score, 2)
+    if number_of_items:
+        total_fraud_score = total_fraud_score / number_of_items
+        response["fraud_score"] = round(total_fraud_score, 2)
 
     return response
 
+
+def get_fraud_scores_for_acquisitions(acquisitions):
+    """
+    Fraud score responses for several acquisitions, in the same order.
+    The responses stored for the current cluster model version (and the same
+    items) are returned as they are; only the other acquisitions are scored.
+    Their responses are stored only when no other process wrote to the
+    clusters meanwhile: the model version after the scoring must be the one
+    read before it plus the writes of this batch.
+    """
+    if not settings.FRAUD_SCORE_CACHE_ENABLED:
+        return compute_fraud_scores_for_acquisitions(acquisitions)
+
+    cluster_index = get_cluster_index()
+    # versiunea si numarul de scrieri sunt retinute inainte de calcul
+    model_version, writes = cluster_index.version, cluster_index.writes
+    responses = FraudScoreResultService.get_results(acquisitions, model_version)
+    missing = [
+        acquisition for acquisition in acquisitions
+        if acquisition["acquisition_id"] not in responses
+    ]
+    if missing:
+        computed = compute_fraud_scores_for_acquisitions(missing, cluster_index)
+        model_version += cluster_index.writes - writes
+        if cluster_index.version == model_version == ClusterService.get_model_version():
+            FraudScoreResultService.save_results(missing, computed, model_version)
+        else:
+            logger.info(f"Cluster model changed while scoring, {len(missing)} results not stored")
+        responses.update(
+            (acquisition["acquisition_id"], response) for acquisition, response in zip(missing, computed)
+        )
+    return [responses[acquisition["acquisition_id"]] for acquisition in acquisitions]
+
+
+def compute_fraud_scores_for_acquisitions(acquisitions, cluster_index=None):
+    """
+    Fraud score responses for several acquisitions, in the same order. The
+    items of all the acquisitions are scored in a single batch, against one
+    load of the clusters.
+    """
+    working_items = [
+        [dict_to_item(item) for item in acquisition["items"]]
+        for acquisition in acquisitions
+    ]
+    fraud_scores = compute_fraud_scores_for_items(
+        [item for acquisition_items in working_items for item in acquisition_items], cluster_index
+    )
+
+    responses = []
+    start = 0
+    for acquisition_items in working_items:
+        end = start + len(acquisition_items)
+        responses.append(build_fraud_score_response(acquisition_items, fraud_scores[start:end]))
+        start = end
+    return responses
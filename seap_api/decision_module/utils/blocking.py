@@ -0,0 +1,70 @@
+from collections import defaultdict
+
+import numpy as np
+
+from decision_module.utils.distance_matrix import SparseDistanceMatrix
+
+
+class TokenBlocking:
+    """
+    Compares only the names that share enough tokens (brand, model,
+    capacity like "256gb"), found through an inverted index from the
+    normalized tokens to the item ids.
+
+    min_shared_tokens: number of common tokens for a pair to be compared
+    max_token_frequency: tokens present in more than this fraction of the
+        names ("telefon", "ram", ...) do not say anything about the model
+        and are left out of the index
+    fallback_distance: distance for the pairs that were never compared;
+        by default one more than the largest computed distance
+    """
+
+    def __init__(self, min_shared_tokens=2, max_token_frequency=0.2, fallback_distance=None):
+        self.min_shared_tokens = min_shared_tokens
+        self.max_token_frequency = max_token_frequency
+        self.fallback_distance = fallback_distance
+
+    def build_index(self, name_features):
+        index = defaultdict(list)
+        for item_id, features in enumerate(name_features):
+            for token in features.sorted_tokens:
+                # cuvintele de o litera nu identifica un model
+                if len(token) > 1:
+                    index[token].append(item_id)
+
+        max_postings = max(2, int(self.max_token_frequency * len(name_features)))
+        return {
+            token: np.array(item_ids, dtype=np.intp)
+            for token, item_ids in index.items()
+            if 1 < len(item_ids) <= max_postings
+        }
+
+    def candidate_pairs(self, name_features):
+        """Returns the pairs (rows < cols) that share at least min_shared_tokens tokens."""
+        n = len(name_features)
+        pair_keys = []
+        for item_ids in self.build_index(name_features).values():
+            first, second = np.triu_indices(len(item_ids), k=1)
+            pair_keys.append(item_ids[first] * n + item_ids[second])
+
+        if not pair_keys:
+            empty = np.array([], dtype=np.intp)
+            return empty, empty
+
+        keys, counts = np.unique(np.concatenate(pair_keys), return_counts=True)
+        keys = keys[counts >= self.min_shared_tokens]
+        return keys // n, keys % n
+
+    def get_distance_matrix(self, name_features, metric):
+        rows, cols = self.candidate_pairs(name_features)
+        distances = [
+            metric(name_features[i], name_features[j]) for i, j in zip(rows, cols)
+        ]
+
+        fallback_distance = self.fallback_distance
+        if fallback_distance is None:
+            fallback_distance = max(distances, default=0) + 1
+
+        return SparseDistanceMatrix(
+            len(name_features), rows, cols, distances, fallback_distance
+        )
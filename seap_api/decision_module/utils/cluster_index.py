@@ -0,0 +1,195 @@
+from collections import defaultdict
+
+import Levenshtein
+
+from decision_module.utils.name_features import normalize_string
+
+
+class BKTreeNode:
+    __slots__ = ("key", "values", "children")
+
+    def __init__(self, key, value):
+        self.key = key
+        self.values = [value]
+        self.children = {}
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over strings with an integer metric. The children
+    of a node are keyed by their distance to it, so by the triangle
+    inequality a query only visits the children whose key is within the
+    best distance found so far of its own distance to the node.
+    """
+
+    def __init__(self, metric=Levenshtein.distance):
+        self.metric = metric
+        self.root = None
+
+    def add(self, key, value):
+        if self.root is None:
+            self.root = BKTreeNode(key, value)
+            return
+
+        node = self.root
+        while True:
+            distance = self.metric(key, node.key)
+            if distance == 0:
+                node.values.append(value)
+                return
+            if distance not in node.children:
+                node.children[distance] = BKTreeNode(key, value)
+                return
+            node = node.children[distance]
+
+    def remove(self, key, value):
+        """Removes value from key; the node stays in the tree to keep the others reachable."""
+        node = self.root
+        while node is not None:
+            distance = self.metric(key, node.key)
+            if distance == 0:
+                if value in node.values:
+                    node.values.remove(value)
+                return
+            node = node.children.get(distance)
+
+    def nearest(self, key):
+        """
+        Returns (distance, value) for the closest key, the smallest value
+        on ties, or (None, None) when the tree is empty.
+        """
+        best = None
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = self.metric(key, node.key)
+            if node.values and (best is None or (distance, min(node.values)) < best):
+                best = (distance, min(node.values))
+
+            for child_distance, child in node.children.items():
+                # egalitatile sunt pastrate, ca sa castige valoarea cea mai mica
+                if best is None or abs(child_distance - distance) <= best[0]:
+                    stack.append(child)
+
+        return best if best is not None else (None, None)
+
+
+class ClusterIndex:
+    """
+    Process-local lookup of the clusters of items:
+    - exact: normalized member name -> cluster, a dict lookup
+    - nearest: BK-tree over the lowercase core point names, one per category
+    The radius of every cluster (largest distance from the core point to a
+    member) is kept as well, read from the cluster statistics when present,
+    so a lookup does not read the members again.
+    version is the cluster model version the index matches, None once the
+    index may be behind the database; synced_version is the last model
+    version up to which all the written clusters were read, and
+    clusters_version the version of the set of clusters it was loaded
+    from. writes counts the writes made through the index since it was
+    loaded.
+    """
+
+    def __init__(self, clusters=(), version=None, clusters_version=None):
+        self.version = version
+        self.synced_version = version
+        self.clusters_version = clusters_version
+        self.writes = 0
+        self.clusters = []
+        self.radii = []
+        self.core_names = []
+        self.positions = {}
+        self.name_index = {}
+        self.trees = defaultdict(BKTree)
+        for cluster in clusters:
+            self.add_cluster(cluster)
+
+    def __len__(self):
+        return len(self.clusters)
+
+    def load(self, clusters, version, clusters_version=None):
+        """Replaces the whole content of the index, for every holder of this object."""
+        self.__dict__.update(ClusterIndex(clusters, version, clusters_version).__dict__)
+
+    def refresh(self, clusters, version):
+        """Applies the clusters written since synced_version; the index then matches version."""
+        for cluster in clusters:
+            self.update_cluster(cluster)
+        self.version = self.synced_version = version
+
+    def advance_version(self, version):
+        """
+        Records the model version reached by a write made through the index.
+        Only the next version keeps the index current; any other one means
+        that another process wrote as well, so the index is marked stale.
+        """
+        self.writes += 1
+        if self.version is not None and version == self.version + 1:
+            self.version = self.synced_version = version
+        else:
+            self.version = None
+
+    @staticmethod
+    def get_category(cluster):
+        return getattr(cluster, "category", None)
+
+    @staticmethod
+    def get_members(cluster):
+        # referintele catre item-uri sterse nu sunt dereferentiate si nu au denumire
+        return [member for member in cluster.list_of_items if getattr(member, "name", None) is not None]
+
+    def index_cluster(self, position, cluster):
+        core_name = cluster.core_point.name.lower()
+        members = self.get_members(cluster)
+
+        self.clusters[position] = cluster
+        self.core_names[position] = core_name
+        stats = getattr(cluster, "stats", None)
+        if stats is not None:
+            # raza salvata odata cu clusterul, fara a parcurge membrii
+            self.radii[position] = stats.radius
+        else:
+            self.radii[position] = max(
+                (Levenshtein.distance(core_name, member.name.lower()) for member in members), default=0
+            )
+        for member in members:
+            # ca la cautarea liniara, castiga primul cluster care contine denumirea
+            self.name_index.setdefault(normalize_string(member.name.lower()), position)
+        self.trees[self.get_category(cluster)].add(core_name, position)
+
+    def add_cluster(self, cluster):
+        position = len(self.clusters)
+        self.clusters.append(None)
+        self.core_names.append(None)
+        self.radii.append(0)
+        self.positions[cluster.id] = position
+        self.index_cluster(position, cluster)
+
+    def update_cluster(self, cluster):
+        """Replaces a cluster (found by id) after its members or core point changed."""
+        position = self.positions.get(cluster.id)
+        if position is None:
+            self.add_cluster(cluster)
+            return
+
+        previous = self.clusters[position]
+        self.trees[self.get_category(previous)].remove(self.core_names[position], position)
+        self.index_cluster(position, cluster)
+
+    def find_by_name(self, name):
+        """The cluster that already contains an item with this name, or None."""
+        position = self.name_index.get(normalize_string(name.lower()))
+        return None if position is None else self.clusters[position]
+
+    def nearest(self, name, category=None):
+        """
+        Returns (cluster, distance to its core point, radius) for the closest
+        core point among the clusters of the category.
+        """
+        tree = self.trees.get(category)
+        if tree is None:
+            return None, None, None
+        distance, position = tree.nearest(name.lower())
+        if position is None:
+            return None, None, None
+        return self.clusters[position], distance, self.radii[position]
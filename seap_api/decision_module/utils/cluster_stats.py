@@ -0,0 +1,49 @@
+import Levenshtein
+import numpy as np
+
+# cuantilele pretului unitar pastrate pentru fiecare cluster
+PRICE_QUANTILES = (0.1, 0.25, 0.75, 0.9)
+
+
+def get_unit_prices(items):
+    """closing_price / quantity for every item, 0 when the quantity is 0."""
+    closing_prices = np.array([item.closing_price for item in items], dtype=np.float64)
+    quantities = np.array([item.quantity for item in items], dtype=np.float64)
+    unit_prices = np.zeros(len(items))
+    np.divide(closing_prices, quantities, out=unit_prices, where=quantities != 0)
+    return unit_prices
+
+
+def get_price_stats(unit_prices):
+    """Median, PRICE_QUANTILES and median absolute deviation of the unit prices."""
+    unit_prices = np.asarray(unit_prices, dtype=np.float64)
+    if len(unit_prices) == 0:
+        return {"price_median": 0.0, "price_quantiles": [0.0] * len(PRICE_QUANTILES), "price_mad": 0.0}
+
+    median = float(np.median(unit_prices))
+    return {
+        "price_median": median,
+        "price_quantiles": np.quantile(unit_prices, PRICE_QUANTILES).tolist(),
+        "price_mad": float(np.median(np.abs(unit_prices - median))),
+    }
+
+
+def get_distance_to_core(core_point, item):
+    return Levenshtein.distance(core_point.name.lower(), item.name.lower())
+
+
+def get_radius(core_point, members):
+    """Largest distance from the core point to a member."""
+    return max((get_distance_to_core(core_point, member) for member in members), default=0)
+
+
+def get_cluster_stats(core_point, members, radius=None):
+    """
+    Size, radius and unit price summary of a cluster. radius is computed
+    from the members unless it is already known.
+    """
+    return {
+        "size": len(members),
+        "radius": get_radius(core_point, members) if radius is None else radius,
+        **get_price_stats(get_unit_prices(members)),
+    }
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from decision_module.utils.distance_matrix import (
+    CondensedDistanceMatrix,
+    build_condensed_distances,
+    condensed_size,
+    copy_condensed,
+)
+from decision_module.utils.name_features import NAME_DISTANCE_VERSION, NameFeatures
+
+
+class DistanceCache:
+    """
+    Persistent store of the pairwise distances between the normalized names
+    of one category, kept on local disk between clustering runs.
+
+    A rebuild only computes the distances for the names that are new since
+    the previous run; the rest are read from the cache. Names that were not
+    seen for more than max_idle_runs runs (the items were deleted) are
+    evicted. The distances are valid only for the version of the metric
+    they were computed with; a cache of another version is discarded.
+
+    Layout of cache_dir/<key hash>/:
+        manifest.json - metric version, names, last run each name was seen in, current run
+        distances_<run>.npy - condensed distances, in the order of the names
+    """
+
+    def __init__(self, cache_dir, key, max_idle_runs=0, dtype=np.uint16, version=NAME_DISTANCE_VERSION):
+        self.directory = os.path.join(
+            cache_dir, hashlib.md5(key.encode("utf-8")).hexdigest()
+        )
+        self.key = key
+        self.max_idle_runs = max_idle_runs
+        self.dtype = np.dtype(dtype)
+        self.version = version
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, "manifest.json")
+
+    def distances_path(self, run):
+        return os.path.join(self.directory, f"distances_{run}.npy")
+
+    def empty(self, run=0):
+        return [], np.array([], dtype=np.int64), run, np.array([], dtype=self.dtype)
+
+    def load(self):
+        """
+        Returns (names, last_seen, run, distances) from the previous run, or
+        an empty cache when there is none or its distances cannot be read.
+        """
+        if not os.path.exists(self.manifest_path):
+            return self.empty()
+
+        with open(self.manifest_path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+
+        if manifest.get("version") != self.version:
+            # distante calculate cu alta normalizare sau metrica: sunt calculate din nou,
+            # iar fisierul rularii anterioare este sters la salvare
+            return self.empty(manifest["run"])
+
+        distances_path = self.distances_path(manifest["run"])
+        if not os.path.exists(distances_path):
+            # fisierul distantelor lipseste: cache-ul este reconstruit
+            return self.empty()
+
+        distances = np.load(distances_path, mmap_mode="r")
+        if len(distances) != condensed_size(len(manifest["names"])):
+            # cache corupt: il reconstruim
+            return self.empty()
+
+        return (
+            manifest["names"],
+            np.array(manifest["last_seen"], dtype=np.int64),
+            manifest["run"],
+            distances,
+        )
+
+    def get_distance_matrix(self, name_features, metric, n_workers=None):
+        """
+        Returns the CondensedDistanceMatrix for name_features (in this order)
+        and updates the cache with the distances of the new names.
+        """
+        old_names, old_last_seen, previous_run, old_distances = self.load()
+        run = previous_run + 1
+
+        features_by_name = {features.normalized: features for features in name_features}
+        old_index = {name: i for i, name in enumerate(old_names)}
+
+        # eliminam numele care nu mai exista in items de mai mult de max_idle_runs rulari
+        kept = np.array(
+            [
+                i
+                for i, name in enumerate(old_names)
+                if name in features_by_name or run - old_last_seen[i] <= self.max_idle_runs
+            ],
+            dtype=np.intp,
+        )
+        new_names = [name for name in features_by_name if name not in old_index]
+
+        # numele noi sunt puse primele, deci se calculeaza doar primele randuri
+        names = new_names + [old_names[i] for i in kept]
+        values = [features_by_name.get(name) or NameFeatures(name) for name in names]
+
+        os.makedirs(self.directory, exist_ok=True)
+        distances = np.lib.format.open_memmap(
+            self.distances_path(run), mode="w+", dtype=self.dtype, shape=(condensed_size(len(names)),)
+        )
+        copy_condensed(old_distances, len(old_names), kept, distances, offset=len(new_names))
+        build_condensed_distances(values, metric, n_workers, out=distances, n_rows=len(new_names))
+        distances.flush()
+
+        last_seen = [run] * len(new_names) + [
+            run if old_names[i] in features_by_name else int(old_last_seen[i]) for i in kept
+        ]
+        self.save_manifest(names, last_seen, run)
+        if previous_run and os.path.exists(self.distances_path(previous_run)):
+            del old_distances
+            os.remove(self.distances_path(previous_run))
+
+        index = {name: i for i, name in enumerate(names)}
+        cached_matrix = CondensedDistanceMatrix(len(names), distances)
+        return cached_matrix.submatrix([index[features.normalized] for features in name_features])
+
+    def save_manifest(self, names, last_seen, run):
+        manifest = {
+            "key": self.key,
+            "version": self.version,
+            "names": names,
+            "last_seen": last_seen,
+            "run": run,
+        }
+
+        temporary_path = self.manifest_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, ensure_ascii=False)
+        os.replace(temporary_path, self.manifest_path)
@@ -0,0 +1,547 @@
+import os
+import tempfile
+import weakref
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial.distance import squareform
+from sklearn.metrics import calinski_harabasz_score
+
+# sub acest numar de elemente pornirea proceselor costa mai mult decat calculul
+MIN_PARALLEL_ITEMS = 200
+
+# fiecare worker primeste mai multe blocuri, pentru o incarcare echilibrata
+BLOCKS_PER_WORKER = 4
+
+# peste aceasta dimensiune distantele sunt tinute intr-un fisier (np.memmap)
+SPILL_THRESHOLD_BYTES = 512 * 1024 * 1024
+
+# numarul de elemente dintr-un bloc de randuri citit din matrice
+ROW_BLOCK_ELEMENTS = 4 * 1024 * 1024
+
+_worker_state = {}
+
+
+def price_distance(price1, price2):
+    return abs(price1 - price2)
+
+
+def condensed_size(n):
+    return n * (n - 1) // 2
+
+
+def condensed_index(n, rows, cols):
+    """Position of the pairs (rows < cols) in the condensed upper triangle."""
+    return n * rows - rows * (rows + 1) // 2 + (cols - rows - 1)
+
+
+def split_upper_triangle(n, n_blocks, n_rows=None):
+    """
+    Splits the first n_rows rows of the upper triangle into contiguous blocks
+    with roughly the same number of pairs (row i has n - 1 - i pairs).
+    """
+    n_rows = n if n_rows is None else n_rows
+    total_pairs = condensed_size(n) - condensed_size(n - n_rows)
+    pairs_per_block = max(1, total_pairs // max(1, n_blocks))
+
+    blocks = []
+    start = 0
+    pairs_in_block = 0
+    for i in range(n_rows):
+        pairs_in_block += n - 1 - i
+        if pairs_in_block >= pairs_per_block:
+            blocks.append((start, i + 1))
+            start = i + 1
+            pairs_in_block = 0
+
+    if start < n_rows:
+        blocks.append((start, n_rows))
+
+    return blocks
+
+
+def fill_rows(condensed, values, metric, start, end):
+    n = len(values)
+    for i in range(start, end):
+        offset = condensed_index(n, i, i + 1)
+        for j in range(i + 1, n):
+            condensed[offset + j - i - 1] = metric(values[i], values[j])
+
+
+def _open_target(target, size, dtype):
+    kind, location, offset = target
+    if kind == "file":
+        return None, np.memmap(location, dtype=dtype, mode="r+", shape=(size,), offset=offset)
+
+    shm = shared_memory.SharedMemory(name=location)
+    return shm, np.ndarray((size,), dtype=dtype, buffer=shm.buf)
+
+
+def _init_worker(target, n, dtype, values, metric):
+    shm, condensed = _open_target(target, condensed_size(n), dtype)
+    _worker_state["shm"] = shm
+    _worker_state["condensed"] = condensed
+    _worker_state["values"] = values
+    _worker_state["metric"] = metric
+
+
+def _fill_rows_in_worker(start, end):
+    condensed = _worker_state["condensed"]
+    fill_rows(condensed, _worker_state["values"], _worker_state["metric"], start, end)
+    if isinstance(condensed, np.memmap):
+        condensed.flush()
+
+
+def _fill_rows_in_pool(target, values, metric, dtype, n_workers, n_rows):
+    n = len(values)
+    blocks = split_upper_triangle(n, n_workers * BLOCKS_PER_WORKER, n_rows)
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_worker,
+        initargs=(target, n, dtype, values, metric),
+    ) as executor:
+        futures = [executor.submit(_fill_rows_in_worker, start, end) for start, end in blocks]
+        wait(futures)
+        for future in futures:
+            # propagam eventualele exceptii din workeri
+            future.result()
+
+
+def build_condensed_distances(values, metric, n_workers=None, out=None, n_rows=None):
+    """
+    Computes the condensed upper triangle of the distance matrix into out
+    (a new float64 array by default, or a preallocated array / np.memmap).
+    With n_rows only the pairs of the first n_rows values are computed,
+    the rest of out is left untouched.
+
+    metric must be a module level function, so it can be sent to the worker
+    processes. With n_workers > 1 the rows of the upper triangle are split
+    into blocks and computed on a process pool; the workers write directly
+    into a shared memory buffer (or into the memmap file), so no result is
+    pickled back.
+    """
+    n = len(values)
+    n_rows = n if n_rows is None else n_rows
+    size = condensed_size(n)
+    if out is None:
+        out = np.zeros(size, dtype=np.float64)
+
+    if not n_workers or n_workers <= 1 or n < MIN_PARALLEL_ITEMS:
+        fill_rows(out, values, metric, 0, n_rows)
+        return out
+
+    if isinstance(out, np.memmap) and out.filename:
+        out.flush()
+        target = ("file", out.filename, out.offset)
+        _fill_rows_in_pool(target, values, metric, out.dtype, n_workers, n_rows)
+        return out
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, size * out.dtype.itemsize))
+    try:
+        shared_condensed = np.ndarray((size,), dtype=out.dtype, buffer=shm.buf)
+        shared_condensed[:] = out
+        _fill_rows_in_pool(("shm", shm.name, 0), values, metric, out.dtype, n_workers, n_rows)
+        out[:] = shared_condensed
+        del shared_condensed
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return out
+
+
+def build_distance_matrix(values, metric, n_workers=None):
+    """Builds the symmetric n x n float64 distance matrix for the given values."""
+    return squareform(build_condensed_distances(values, metric, n_workers), checks=False)
+
+
+class CondensedDistanceMatrix:
+    """
+    Symmetric distance matrix that keeps only the condensed upper triangle,
+    in a compact dtype (uint16 is enough for Levenshtein distances).
+    Above spill_threshold bytes the triangle is kept in a np.memmap file,
+    removed when the matrix is garbage collected.
+    """
+
+    def __init__(self, n, data, path=None):
+        self.n = n
+        self.data = data
+        self.path = path
+        self._row_sums = None
+        if path:
+            weakref.finalize(self, _remove_file, path)
+
+    @classmethod
+    def allocate(cls, n, dtype=np.float32, spill_threshold=SPILL_THRESHOLD_BYTES, spill_dir=None):
+        size = condensed_size(n)
+
+        path = None
+        if size and size * np.dtype(dtype).itemsize > spill_threshold:
+            fd, path = tempfile.mkstemp(suffix=".distances", dir=spill_dir)
+            os.close(fd)
+            data = np.memmap(path, dtype=dtype, mode="w+", shape=(size,))
+        else:
+            data = np.zeros(size, dtype=dtype)
+
+        return cls(n, data, path)
+
+    @classmethod
+    def build(cls, values, metric, n_workers=None, dtype=np.float32,
+              spill_threshold=SPILL_THRESHOLD_BYTES, spill_dir=None):
+        distance_matrix = cls.allocate(len(values), dtype, spill_threshold, spill_dir)
+        build_condensed_distances(values, metric, n_workers, out=distance_matrix.data)
+        return distance_matrix
+
+    @property
+    def shape(self):
+        return self.n, self.n
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    def __len__(self):
+        return self.n
+
+    def to_condensed(self):
+        return self.data
+
+    def take_rows(self, indices):
+        """Returns the full rows for the given indices, as a float64 block."""
+        rows = np.asarray(indices, dtype=np.intp)[:, None]
+        cols = np.arange(self.n, dtype=np.intp)[None, :]
+        if not len(self.data):
+            return np.zeros((rows.shape[0], self.n))
+
+        low = np.minimum(rows, cols)
+        high = np.maximum(rows, cols)
+        diagonal = low == high
+
+        positions = condensed_index(self.n, low, np.where(diagonal, low + 1, high))
+        positions = np.minimum(positions, max(0, len(self.data) - 1))
+
+        block = self.data[positions].astype(np.float64)
+        block[diagonal] = 0
+        return block
+
+    def submatrix(self, indices):
+        """Returns the distances between the given points, in the given order."""
+        indices = np.asarray(indices, dtype=np.intp)
+        submatrix = CondensedDistanceMatrix.allocate(len(indices), self.dtype)
+        copy_condensed(self.data, self.n, indices, submatrix.data)
+        return submatrix
+
+    def row_sums(self):
+        if self._row_sums is None:
+            self._row_sums = np.zeros(self.n)
+            for start, end, block in iter_row_blocks(self):
+                self._row_sums[start:end] = block.sum(axis=1)
+        return self._row_sums
+
+    def toarray(self):
+        return squareform(np.asarray(self.data, dtype=np.float64), checks=False)
+
+    def __array__(self, dtype=None, copy=None):
+        distance_matrix = self.toarray()
+        return distance_matrix if dtype is None else distance_matrix.astype(dtype)
+
+
+@contextmanager
+def shared_distance_matrix(distance_matrix):
+    """
+    Yields a picklable handle to distance_matrix for the worker processes,
+    opened there with attach_distance_matrix. Compact matrices are placed in
+    shared memory (or referenced by their memmap file), so the workers read
+    them without a copy; other matrices are sent as they are.
+    """
+    if isinstance(distance_matrix, (np.ndarray, DistanceSubmatrix)):
+        distance_matrix = CondensedDistanceMatrix(len(distance_matrix), to_condensed(distance_matrix))
+
+    if not isinstance(distance_matrix, CondensedDistanceMatrix):
+        yield "object", distance_matrix
+        return
+
+    data = distance_matrix.data
+    if isinstance(data, np.memmap) and data.filename:
+        data.flush()
+        yield "condensed", distance_matrix.n, data.dtype, ("file", data.filename, data.offset)
+        return
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, data.nbytes))
+    try:
+        np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf)[:] = data
+        yield "condensed", distance_matrix.n, data.dtype, ("shm", shm.name, 0)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def attach_distance_matrix(handle):
+    """Returns (shm, distance_matrix) for a handle from shared_distance_matrix."""
+    if handle[0] == "object":
+        return None, handle[1]
+
+    _, n, dtype, target = handle
+    shm, data = _open_target(target, condensed_size(n), dtype)
+    return shm, CondensedDistanceMatrix(n, data)
+
+
+def copy_condensed(source, n_source, indices, target, offset=0):
+    """
+    Copies the distances between the source points given by indices into the
+    condensed target, where they become the points offset, offset + 1, ...
+    """
+    n_target = offset + len(indices)
+    for a in range(len(indices) - 1):
+        rows = np.minimum(indices[a], indices[a + 1:])
+        cols = np.maximum(indices[a], indices[a + 1:])
+        start = condensed_index(n_target, offset + a, offset + a + 1)
+        target[start:start + len(cols)] = source[condensed_index(n_source, rows, cols)]
+
+
+def _remove_file(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class SparseDistanceMatrix:
+    """
+    Distances computed only for a subset of the pairs (rows < cols).
+    The pairs that were never compared get fallback_distance.
+    Both directions of the pairs are also kept by row (CSR: the neighbours
+    of row i are indices[indptr[i]:indptr[i + 1]]), so reading a row costs
+    its number of compared pairs, not the number of all pairs.
+    """
+
+    def __init__(self, n, rows, cols, distances, fallback_distance):
+        self.n = n
+        self.rows = np.asarray(rows, dtype=np.intp)
+        self.cols = np.asarray(cols, dtype=np.intp)
+        self.distances = np.asarray(distances, dtype=np.float64)
+        self.fallback_distance = fallback_distance
+
+        both_rows = np.concatenate([self.rows, self.cols])
+        order = np.argsort(both_rows, kind="stable")
+        self.indptr = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(np.bincount(both_rows, minlength=n), out=self.indptr[1:])
+        self.indices = np.concatenate([self.cols, self.rows])[order]
+        self.data = np.concatenate([self.distances, self.distances])[order]
+
+    @property
+    def shape(self):
+        return self.n, self.n
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def dtype(self):
+        """uint16 when every distance is a small integer (Levenshtein), float64 otherwise."""
+        values = np.append(self.distances, self.fallback_distance)
+        if np.all(values >= 0) and np.all(values <= np.iinfo(np.uint16).max) and np.all(values == np.round(values)):
+            return np.dtype(np.uint16)
+        return np.dtype(np.float64)
+
+    def take_rows(self, indices):
+        indices = np.asarray(indices, dtype=np.intp)
+        block = np.full((len(indices), self.n), self.fallback_distance, dtype=np.float64)
+
+        starts = self.indptr[indices]
+        lengths = self.indptr[indices + 1] - starts
+        block_rows = np.repeat(np.arange(len(indices)), lengths)
+        positions = np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        block[block_rows, self.indices[positions]] = self.data[positions]
+
+        block[np.arange(len(indices)), indices] = 0
+        return block
+
+    def connected_components(self):
+        """Returns (n_components, labels) of the graph of the compared pairs."""
+        graph = csr_matrix((np.ones(len(self.indices)), self.indices, self.indptr), shape=self.shape)
+        return connected_components(graph, directed=False)
+
+    def toarray(self):
+        distance_matrix = np.full((self.n, self.n), self.fallback_distance, dtype=np.float64)
+        distance_matrix[self.rows, self.cols] = self.distances
+        distance_matrix[self.cols, self.rows] = self.distances
+        np.fill_diagonal(distance_matrix, 0)
+        return distance_matrix
+
+    def to_condensed_matrix(self):
+        """The same distances as a CondensedDistanceMatrix, in the compact dtype."""
+        condensed = CondensedDistanceMatrix.allocate(self.n, self.dtype)
+        condensed.data[:] = self.fallback_distance
+        condensed.data[condensed_index(self.n, self.rows, self.cols)] = self.distances
+        return condensed
+
+    def to_condensed(self):
+        return self.to_condensed_matrix().data
+
+    def __array__(self, dtype=None, copy=None):
+        distance_matrix = self.toarray()
+        return distance_matrix if dtype is None else distance_matrix.astype(dtype)
+
+
+class DistanceSubmatrix:
+    """
+    View of the distances between a subset of the points of a parent
+    matrix. Nothing is copied up front: the rows are read from the parent
+    only when they are needed.
+    """
+
+    def __init__(self, parent, indices):
+        self.parent = parent
+        self.indices = np.asarray(indices, dtype=np.intp)
+
+    @property
+    def shape(self):
+        return len(self.indices), len(self.indices)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def take_rows(self, indices):
+        indices = np.asarray(indices, dtype=np.intp)
+        return take_rows(self.parent, self.indices[indices])[:, self.indices]
+
+    def submatrix(self, indices):
+        return DistanceSubmatrix(self.parent, self.indices[np.asarray(indices, dtype=np.intp)])
+
+    def toarray(self):
+        return self.take_rows(np.arange(len(self.indices)))
+
+    def to_condensed(self):
+        if isinstance(self.parent, CondensedDistanceMatrix):
+            return self.parent.submatrix(self.indices).data
+        return squareform(self.toarray(), checks=False)
+
+    def __array__(self, dtype=None, copy=None):
+        distance_matrix = self.toarray()
+        return distance_matrix if dtype is None else distance_matrix.astype(dtype)
+
+
+def to_condensed(distance_matrix):
+    if hasattr(distance_matrix, "to_condensed"):
+        return distance_matrix.to_condensed()
+    return squareform(np.asarray(distance_matrix), checks=False)
+
+
+def take_rows(distance_matrix, indices):
+    if hasattr(distance_matrix, "take_rows"):
+        return distance_matrix.take_rows(indices)
+    return np.asarray(distance_matrix)[indices]
+
+
+def submatrix(distance_matrix, indices):
+    """Returns the distances between the given points, in the given order."""
+    if hasattr(distance_matrix, "submatrix"):
+        return distance_matrix.submatrix(indices)
+    return take_rows(distance_matrix, indices)[:, indices]
+
+
+def iter_row_blocks(distance_matrix, indices=None, block_elements=None):
+    """
+    Yields (start, end, rows) for consecutive blocks of rows, so the callers
+    never need the whole square matrix at once. The blocks hold about
+    block_elements values (ROW_BLOCK_ELEMENTS by default).
+    """
+    n = len(distance_matrix)
+    if indices is None:
+        indices = np.arange(n)
+    if block_elements is None:
+        block_elements = ROW_BLOCK_ELEMENTS
+
+    rows_per_block = max(1, block_elements // max(1, n))
+    for start in range(0, len(indices), rows_per_block):
+        end = min(len(indices), start + rows_per_block)
+        if isinstance(distance_matrix, np.ndarray) and isinstance(indices, np.ndarray) \
+                and np.all(np.diff(indices[start:end]) == 1):
+            # randuri consecutive: folosim un view, fara copie
+            yield start, end, distance_matrix[indices[start]:indices[end - 1] + 1]
+        else:
+            yield start, end, take_rows(distance_matrix, indices[start:end])
+
+
+def similarity_matrix(distance_matrix, dtype=np.float32):
+    """
+    Builds 1 / (1 + distance) with a zero diagonal, block by block,
+    as the only full size array.
+    """
+    n = len(distance_matrix)
+    similarity = np.empty((n, n), dtype=dtype)
+    for start, end, block in iter_row_blocks(distance_matrix):
+        np.divide(1, 1 + block, out=similarity[start:end], casting="unsafe")
+    np.fill_diagonal(similarity, 0)
+    return similarity
+
+
+def calinski_harabasz(distance_matrix, labels, sample_weight=None):
+    """
+    Calinski-Harabasz score using the rows of the distance matrix as
+    features, like calinski_harabasz_score(distance_matrix, labels).
+    For the compact matrices the rows are read in blocks, sorted by label,
+    and only the per cluster sums of the current block are kept.
+    With sample_weight each point counts as that many duplicates, in the
+    rows and in the columns: the score of the matrix of all the duplicates.
+    """
+    if sample_weight is None and isinstance(distance_matrix, np.ndarray):
+        return calinski_harabasz_score(distance_matrix, labels)
+
+    labels = np.unique(labels, return_inverse=True)[1]
+    n_points = len(labels)
+    n_labels = labels.max() + 1
+    weights = np.ones(n_points) if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+    n_samples = weights.sum()
+    counts = np.bincount(labels, weights=weights)
+
+    # matricea este simetrica, deci media ponderata a coloanelor este D @ w / n
+    if sample_weight is None and hasattr(distance_matrix, "row_sums"):
+        mean = distance_matrix.row_sums() / n_samples
+    else:
+        mean = np.zeros(n_points)
+        for start, end, block in iter_row_blocks(distance_matrix):
+            mean[start:end] = block @ weights
+        mean /= n_samples
+
+    order = np.argsort(labels, kind="stable")
+    sorted_labels = labels[order]
+    sorted_weights = weights[order]
+
+    # produsul scalar dintre doua randuri numara fiecare coloana de w ori
+    total_squares = 0.0
+    cluster_squares = 0.0  # suma ||S_c||^2 / n_c
+    cluster_dot_mean = 0.0  # suma S_c . mean
+    carry_label, carry_sum = -1, None
+
+    for start, end, block in iter_row_blocks(distance_matrix, order):
+        block_weights = sorted_weights[start:end]
+        total_squares += block_weights @ ((block * block) @ weights)
+
+        block_labels = sorted_labels[start:end]
+        segment_starts = np.flatnonzero(np.r_[True, block_labels[1:] != block_labels[:-1]])
+        segment_labels = block_labels[segment_starts]
+        segment_sums = np.add.reduceat(block * block_weights[:, None], segment_starts, axis=0)
+
+        if segment_labels[0] == carry_label:
+            segment_sums[0] += carry_sum
+
+        # ultimul cluster poate continua in blocul urmator
+        if end < n_points and sorted_labels[end] == segment_labels[-1]:
+            carry_label, carry_sum = segment_labels[-1], segment_sums[-1].copy()
+            segment_sums, segment_labels = segment_sums[:-1], segment_labels[:-1]
+        else:
+            carry_label, carry_sum = -1, None
+
+        cluster_squares += (((segment_sums * segment_sums) @ weights) / counts[segment_labels]).sum()
+        cluster_dot_mean += (segment_sums @ (mean * weights)).sum()
+
+    intra_disp = total_squares - cluster_squares
+    extra_disp = cluster_squares - 2 * cluster_dot_mean + n_samples * (mean @ (mean * weights))
+
+    if intra_disp <= 0.0:
+        return 1.0
+    return float(extra_disp * (n_samples - n_labels) / (intra_disp * (n_labels - 1.0)))
@@ -0,0 +1,144 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+import numpy as np
+from sklearn.metrics import silhouette_score
+
+from decision_module.utils.distance_matrix import (
+    BLOCKS_PER_WORKER,
+    MIN_PARALLEL_ITEMS,
+    attach_distance_matrix,
+    calinski_harabasz,
+    shared_distance_matrix,
+)
+
+_worker_state = {}
+
+
+def score_clustering(distance_matrix, cluster_labels, metric="calinski_harabasz", sample_weight=None):
+    # pe un subesantion pot ramane un singur cluster sau doar clustere de cate un punct
+    n_labels = len(np.unique(cluster_labels))
+    if not 1 < n_labels < len(cluster_labels):
+        return float("-inf")
+
+    if metric == "silhouette":
+        return silhouette_score(np.asarray(distance_matrix), cluster_labels, metric="precomputed")
+
+    elif metric == "calinski_harabasz":
+        # silhouette nu este ponderat; calinski_harabasz numara duplicatele
+        return calinski_harabasz(distance_matrix, cluster_labels, sample_weight)
+
+    raise ValueError(
+        f"Metric {metric} not supported. Choose from 'silhouette', 'calinski_harabasz', or 'davies_bouldin'.")
+
+
+def evaluate_n_clusters(clustering_strategy, distance_matrix, n_clusters_list, sample_weight=None,
+                        metric="calinski_harabasz", sample=None, scoring_matrix=None):
+    """
+    Clusters the matrix for every value in n_clusters_list and returns the
+    scores in the same order. With sample, only those points are scored,
+    against scoring_matrix (the distances between them).
+    """
+    if scoring_matrix is None:
+        scoring_matrix = distance_matrix
+    scoring_weight = sample_weight
+    if sample is not None and sample_weight is not None:
+        scoring_weight = np.asarray(sample_weight)[sample]
+
+    scores = {}
+    for n_clusters, cluster_labels in clustering_strategy.cluster_range(
+        distance_matrix, n_clusters_list, sample_weight=sample_weight
+    ):
+        if sample is not None:
+            cluster_labels = np.asarray(cluster_labels)[sample]
+        scores[n_clusters] = score_clustering(scoring_matrix, cluster_labels, metric, scoring_weight)
+
+    return [scores[n_clusters] for n_clusters in n_clusters_list]
+
+
+def _init_worker(clustering_strategy, handle, sample_weight, metric, sample, scoring_matrix):
+    shm, distance_matrix = attach_distance_matrix(handle)
+    _worker_state["shm"] = shm
+    _worker_state["arguments"] = (
+        clustering_strategy, distance_matrix, sample_weight, metric, sample, scoring_matrix
+    )
+
+
+def _evaluate_in_worker(n_clusters_list):
+    clustering_strategy, distance_matrix, sample_weight, metric, sample, scoring_matrix = (
+        _worker_state["arguments"]
+    )
+    return evaluate_n_clusters(
+        clustering_strategy, distance_matrix, n_clusters_list, sample_weight, metric, sample, scoring_matrix
+    )
+
+
+class KEvaluator:
+    """
+    Evaluates candidate numbers of clusters for a KSearchPolicy.
+
+    With n_workers > 1 the candidates of each call are spread over a process
+    pool, kept for the whole search; the workers read the distance matrix
+    from shared memory (or from its memmap file). What the strategy can
+    share between the numbers of clusters (the linkage tree) is fitted once
+    here and sent to the workers with it. The scores are collected by number of clusters, so the
+    result is the same as the serial evaluation.
+    """
+
+    def __init__(self, clustering_strategy, distance_matrix, sample_weight=None,
+                 metric="calinski_harabasz", sample=None, scoring_matrix=None, n_workers=None):
+        self.clustering_strategy = clustering_strategy
+        self.distance_matrix = distance_matrix
+        self.sample_weight = sample_weight
+        self.metric = metric
+        self.sample = sample
+        self.scoring_matrix = scoring_matrix
+        self.n_workers = n_workers
+        self.executor = None
+        self._exit_stack = ExitStack()
+
+    def __enter__(self):
+        if self.n_workers and self.n_workers > 1 and len(self.distance_matrix) >= MIN_PARALLEL_ITEMS:
+            handle = self._exit_stack.enter_context(shared_distance_matrix(self.distance_matrix))
+            self.executor = self._exit_stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers=self.n_workers,
+                    initializer=_init_worker,
+                    initargs=(
+                        # arborele (sau alt fit comun) este construit o data, nu in fiecare worker
+                        self.clustering_strategy.for_workers(self.distance_matrix, self.sample_weight),
+                        handle,
+                        self.sample_weight,
+                        self.metric,
+                        self.sample,
+                        self.scoring_matrix,
+                    ),
+                )
+            )
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.executor = None
+        return self._exit_stack.__exit__(exc_type, exc_value, traceback)
+
+    def evaluate(self, n_clusters_list):
+        n_clusters_list = list(n_clusters_list)
+        if self.executor is None or len(n_clusters_list) < 2:
+            return evaluate_n_clusters(
+                self.clustering_strategy,
+                self.distance_matrix,
+                n_clusters_list,
+                self.sample_weight,
+                self.metric,
+                self.sample,
+                self.scoring_matrix,
+            )
+
+        # valorile sunt intercalate, ca fiecare lot sa aiba valori mici si mari
+        n_chunks = min(len(n_clusters_list), self.n_workers * BLOCKS_PER_WORKER)
+        chunks = [n_clusters_list[i::n_chunks] for i in range(n_chunks)]
+
+        scores = {}
+        for chunk, chunk_scores in zip(chunks, self.executor.map(_evaluate_in_worker, chunks)):
+            scores.update(zip(chunk, chunk_scores))
+        return [scores[n_clusters] for n_clusters in n_clusters_list]
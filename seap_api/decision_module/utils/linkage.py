@@ -0,0 +1,158 @@
+import numpy as np
+
+from decision_module.utils.distance_matrix import SparseDistanceMatrix, condensed_index, to_condensed
+
+
+def label_merges(merges, n):
+    """
+    Renames the clusters of the merges, sorted by height, with the scipy
+    convention: the cluster made by merge k is n + k. The pairs may name any
+    point of the clusters they merge. Column 3 becomes the number of points.
+    """
+    parent = np.arange(2 * n - 1)
+    size = np.ones(2 * n - 1, dtype=np.intp)
+
+    def find(x):
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    for k in range(n - 1):
+        first, second = sorted((find(int(merges[k, 0])), find(int(merges[k, 1]))))
+        merges[k, 0], merges[k, 1] = first, second
+        parent[first] = parent[second] = n + k
+        size[n + k] = size[first] + size[second]
+        merges[k, 3] = size[n + k]
+    return merges
+
+
+def nn_chain_average(distances, n, sample_weight=None):
+    """
+    Average linkage (UPGMA) with the nearest neighbour chain algorithm, on
+    the condensed distances (a float64 copy is changed in place by the
+    merges). Unsorted and unlabeled, like the merges scipy records; with
+    unit weights the same merges in the same order.
+    """
+    distances = np.array(distances, dtype=np.float64)
+    size = np.ones(n) if sample_weight is None else np.asarray(sample_weight, dtype=np.float64).copy()
+    merges = np.empty((n - 1, 4))
+    active = np.arange(n)
+    chain = []
+
+    def row(x, others):
+        low = np.minimum(x, others)
+        high = np.maximum(x, others)
+        return condensed_index(n, low, high)
+
+    for k in range(n - 1):
+        if not chain:
+            chain.append(int(active[0]))
+
+        # lantul se prelungeste pana la doi vecini reciproci
+        while True:
+            x = chain[-1]
+            others = active[active != x]
+            row_distances = distances[row(x, others)]
+            nearest = int(np.argmin(row_distances))
+            y, current_min = int(others[nearest]), row_distances[nearest]
+
+            if len(chain) > 1:
+                previous = chain[-2]
+                previous_distance = distances[condensed_index(n, min(x, previous), max(x, previous))]
+                # la egalitate ramane elementul anterior din lant, ca in scipy
+                if previous_distance <= current_min:
+                    y, current_min = previous, previous_distance
+                    break
+            chain.append(y)
+
+        del chain[-2:]
+        x, y = min(x, y), max(x, y)
+        size_x, size_y = size[x], size[y]
+        merges[k] = x, y, current_min, size_x + size_y
+
+        # clusterul nou ia locul lui y
+        active = active[active != x]
+        size[x] = 0
+        size[y] = size_x + size_y
+        others = active[active != y]
+        positions_y = row(y, others)
+        distances[positions_y] = (
+            size_x * distances[row(x, others)] + size_y * distances[positions_y]
+        ) / (size_x + size_y)
+
+    return merges
+
+
+def sparse_average_linkage(distance_matrix, sample_weight=None):
+    """
+    Average linkage of a SparseDistanceMatrix whose fallback distance is at
+    least every computed distance. Points of different components of the
+    compared pairs are only at the fallback distance, so every component is
+    linked on its own (a dense matrix of its size) and the components are
+    joined last, at the fallback distance. Unsorted and unlabeled merges.
+    """
+    n = len(distance_matrix)
+    weights = np.ones(n) if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+    n_components, component_labels = distance_matrix.connected_components()
+
+    # punctele si perechile sunt grupate pe componente, in ordinea indicilor
+    points = np.argsort(component_labels, kind="stable")
+    point_bounds = np.r_[0, np.cumsum(np.bincount(component_labels, minlength=n_components))]
+    positions = np.empty(n, dtype=np.intp)
+    positions[points] = np.arange(n) - point_bounds[component_labels[points]]
+
+    pair_components = component_labels[distance_matrix.rows]
+    pairs = np.argsort(pair_components, kind="stable")
+    pair_bounds = np.r_[0, np.cumsum(np.bincount(pair_components, minlength=n_components))]
+
+    merges = []
+    for component in range(n_components):
+        members = points[point_bounds[component]:point_bounds[component + 1]]
+        if len(members) < 2:
+            continue
+
+        component_pairs = pairs[pair_bounds[component]:pair_bounds[component + 1]]
+        component_matrix = SparseDistanceMatrix(
+            len(members),
+            positions[distance_matrix.rows[component_pairs]],
+            positions[distance_matrix.cols[component_pairs]],
+            distance_matrix.distances[component_pairs],
+            distance_matrix.fallback_distance,
+        )
+        component_merges = nn_chain_average(component_matrix.to_condensed(), len(members), weights[members])
+        component_merges[:, :2] = members[component_merges[:, :2].astype(np.intp)]
+        merges.append(component_merges)
+
+    # componentele se unesc la distanta fallback, dupa toate celelalte uniri
+    first_points = points[point_bounds[:-1]]
+    joins = np.zeros((n_components - 1, 4))
+    joins[:, 0] = first_points[0]
+    joins[:, 1] = first_points[1:]
+    joins[:, 2] = distance_matrix.fallback_distance
+    merges.append(joins)
+
+    return np.concatenate(merges)
+
+
+def average_linkage(distance_matrix, sample_weight=None):
+    """
+    Average linkage tree of the points, each counted sample_weight times:
+    the tree scipy's linkage(method="average") builds for the points with
+    their duplicates (which are at distance 0 and merge first). With unit
+    weights it is the same tree.
+    """
+    n = len(distance_matrix)
+    if n < 2:
+        return np.empty((0, 4))
+
+    if isinstance(distance_matrix, SparseDistanceMatrix) \
+            and distance_matrix.fallback_distance >= distance_matrix.distances.max(initial=0):
+        merges = sparse_average_linkage(distance_matrix, sample_weight)
+    else:
+        merges = nn_chain_average(to_condensed(distance_matrix), n, sample_weight)
+
+    merges = merges[np.argsort(merges[:, 2], kind="mergesort")]
+    return label_merges(merges, n)
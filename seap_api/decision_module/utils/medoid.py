@@ -0,0 +1,27 @@
+import numpy as np
+
+from decision_module.utils.distance_matrix import iter_row_blocks
+
+
+def medoid_distance_sums(distance_matrix, indices, weights=None):
+    """
+    Sum of the distances from each of the given points to all of them, each
+    point counted weights times. The rows are read in blocks from the
+    existing matrix; the point with the smallest sum is the medoid.
+    """
+    indices = np.asarray(indices, dtype=np.intp)
+    weights = np.ones(len(indices)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    distance_sums = np.empty(len(indices))
+    for start, end, block in iter_row_blocks(distance_matrix, indices):
+        distance_sums[start:end] = np.asarray(block, dtype=np.float64)[:, indices] @ weights
+    return distance_sums
+
+
+def add_member_distances(distance_sums, distances):
+    """
+    Distance sums after a new member joins: every member gains its distance
+    to the new one, which gets the sum of those distances. O(m).
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    return np.append(np.asarray(distance_sums, dtype=np.float64) + distances, distances.sum())
@@ -0,0 +1,119 @@
+import re
+
+import Levenshtein
+
+# versiunea normalizarii si a distantei dintre denumiri, salvata cu distantele din cache;
+# se mareste la orice schimbare a SYNONYMS, STRINGS_TO_REMOVE, a normalizarii sau a comparatiei
+NAME_DISTANCE_VERSION = 1
+
+SYNONYMS = {"telefon": ["telefon mobil", "smartphone"]}
+
+# stringuri neimportante care sunt eliminate din denumiri
+STRINGS_TO_REMOVE = ["dual sim", "midnight black"]
+
+_SYNONYM_PATTERNS = [
+    (key, re.compile(rf"\b{re.escape(value)}\b", flags=re.IGNORECASE))
+    for key, values in SYNONYMS.items()
+    for value in values
+]
+_ALPHANUMERIC_PATTERN = re.compile(r"\b[a-zA-Z]+\d|\d+[a-zA-Z]\b")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class NameFeatures:
+    """
+    Normalized form of an item name, computed once per item.
+    Keeps the token set and the alphabetically sorted tokens needed by
+    the pairwise comparison.
+    """
+
+    __slots__ = ("normalized", "token_set", "sorted_tokens")
+
+    def __init__(self, normalized):
+        self.normalized = normalized
+        self.token_set = frozenset(normalized.split())
+        self.sorted_tokens = sorted(self.token_set)
+
+    def __repr__(self):
+        return f"NameFeatures({self.normalized!r})"
+
+
+def replace_synonyms(string):
+    for key, pattern in _SYNONYM_PATTERNS:
+        string = pattern.sub(key, string)
+    return string
+
+
+def remove_colour(string):
+    parts = string.rsplit(",", 1)
+    if len(parts) > 1:
+        before_last_comma = parts[0]
+        after_last_comma = parts[1].strip()
+
+        words_after_comma = after_last_comma.split()
+
+        # daca dupa virgula nu exista cuvinte alfanumerice (5g,..) eliminam culoarea
+        if not (
+            len(words_after_comma) > 3
+            or _ALPHANUMERIC_PATTERN.search(after_last_comma)
+        ):
+            return before_last_comma.strip()
+
+    return string.strip()
+
+
+def normalize_string(string):
+    """
+    Applies the per-string part of the comparison: synonyms, removal of
+    unimportant strings and colours, commas and extra whitespace.
+    """
+    string = replace_synonyms(string)
+
+    for string_to_remove in STRINGS_TO_REMOVE:
+        if string_to_remove in string:
+            string = string.replace(string_to_remove, "")
+
+    string = remove_colour(string)
+    string = string.replace(",", " ")
+
+    return _WHITESPACE_PATTERN.sub(" ", string).strip()
+
+
+def get_name_features(names):
+    return [NameFeatures(normalize_string(name.lower())) for name in names]
+
+
+def compare_features(features1, features2):
+    """
+    Returns the two strings that are compared with Levenshtein,
+    after eliminating the common words and merging the prefixes.
+    """
+    str1 = features1.normalized
+    str2 = features2.normalized
+
+    if str1.startswith(str2):
+        return str2, str2
+    elif str2.startswith(str1):
+        return str1, str1
+
+    new_str1 = []
+    new_str2 = []
+
+    # eliminam cuvintele comune, pastrand ordinea alfabetica
+    words1 = [word for word in features1.sorted_tokens if word not in features2.token_set]
+    words2 = [word for word in features2.sorted_tokens if word not in features1.token_set]
+
+    for word1, word2 in zip(words1, words2):
+        if word1.startswith(word2) or word2.startswith(word1):
+            new_str1.append(word2)
+            new_str2.append(word2)
+        else:
+            new_str1.append(word1)
+            new_str2.append(word2)
+
+    return " ".join(new_str1), " ".join(new_str2)
+
+
+def name_distance(features1, features2):
+    str1_to_cmp, str2_to_cmp = compare_features(features1, features2)
+    return Levenshtein.distance(str1_to_cmp, str2_to_cmp)
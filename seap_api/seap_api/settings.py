@@ -197,3 +197,28 @@ CORS_ALLOW_METHODS = [
 # If you're in development and want to allow all origins (NOT recommended for production)
 if DEBUG:
     CORS_ALLOW_ALL_ORIGINS = True
+
+# Clustering settings
+# number of categories clustered at the same time, each in its own process
+CLUSTERING_CATEGORY_WORKERS = int(
+    os.getenv("CLUSTERING_CATEGORY_WORKERS", str(os.cpu_count() or 1))
+)
+# number of worker processes used to build the distance matrices and score the
+# numbers of clusters (1 = serial); split among the categories clustered at the same time
+CLUSTERING_WORKERS = int(os.getenv("CLUSTERING_WORKERS", "1"))
+# categories with at least this many items compare only the names that share tokens
+CLUSTERING_BLOCKING_MIN_ITEMS = int(os.getenv("CLUSTERING_BLOCKING_MIN_ITEMS", "5000"))
+# pairwise name distances kept between runs, so only the new names are compared
+CLUSTERING_DISTANCE_CACHE_DIR = os.getenv(
+    "CLUSTERING_DISTANCE_CACHE_DIR", os.path.join(BASE_DIR, "distance_cache")
+)
+# online leader clustering of every category, updated with the new items after each run
+CLUSTERING_LEADER_STATE_DIR = os.getenv(
+    "CLUSTERING_LEADER_STATE_DIR", os.path.join(BASE_DIR, "leader_state")
+)
+
+# Fraud scoring settings
+# largest number of acquisitions accepted by one bulk fraud score request
+FRAUD_SCORE_MAX_BATCH_SIZE = int(os.getenv("FRAUD_SCORE_MAX_BATCH_SIZE", "100"))
+# computed fraud scores are stored per acquisition and cluster model version
+FRAUD_SCORE_CACHE_ENABLED = os.getenv("FRAUD_SCORE_CACHE_ENABLED", "True") == "True"
@@ -0,0 +1,11 @@
+import django
+import pytest
+from django.conf import settings
+
+
+@pytest.fixture(scope="session")
+def django_setup():
+    """Minimal Django configuration, for the tests that import the real views."""
+    if not settings.configured:
+        settings.configure()
+        django.setup()
@@ -95,3 +95,18 @@ def test_get_acquisitions_by_cpv_code_id(mock_acquisition_model):
     mock_acquisition_model.objects.assert_called_once_with(cpv_code_id=cpv_code_id)
     assert len(result) == 2
     assert result[0]["acquisition_id"] == "A125"
+
+
+def test_get_acquisitions_with_items(mock_acquisition_model):
+    mock_acquisition_model.objects.aggregate.return_value = iter([
+        {"_id": "first_id", "acquisition_id": 1, "items": [{"_id": "item_1", "acquisition": "first_id"}]},
+        {"_id": "second_id", "acquisition_id": 2, "items": []},
+    ])
+
+    result = AcquisitionRepository.get_acquisitions_with_items([1, 2, 3])
+
+    pipeline = mock_acquisition_model.objects.aggregate.call_args[0][0]
+    # o singura interogare pentru toate achizitiile
+    assert pipeline[0] == {"$match": {"acquisition_id": {"$in": [1, 2, 3]}}}
+    assert [acquisition["acquisition_id"] for acquisition in result] == [1, 2]
+    assert result[0]["items"][0] == {"_id": "item_1", "acquisition": "first_id"}
@@ -0,0 +1,93 @@
+import mongomock
+import pytest
+from bson import ObjectId
+from unittest.mock import patch
+from mongoengine import connect, disconnect
+from api.models.cluster import Cluster
+from api.models.item import Item
+from api.repositories.cluster_repository import ClusterRepository
+
+
+@pytest.fixture
+def mongo_test_connection():
+    """Set up a temporary in-memory MongoDB connection for testing."""
+    connect(
+        "mongoenginetest",
+        host="localhost",
+        mongo_client_class=mongomock.MongoClient,
+        uuidRepresentation="standard"
+    )
+    yield
+    disconnect()
+
+
+def make_cluster(category):
+    item = Item(id=ObjectId(), name=f"Item {category}")
+    return Cluster(core_point=item, list_of_items=[item], category=category)
+
+
+def insert_clusters(categories):
+    collection = Cluster._get_collection()
+    collection.insert_many([make_cluster(category).to_mongo() for category in categories])
+    return collection
+
+
+def get_categories():
+    return sorted(cluster["category"] for cluster in Cluster._get_collection().find())
+
+
+# --- TEST CASES --- #
+
+def test_replace_all_publishes_the_new_clusters_with_their_indexes(mongo_test_connection):
+    insert_clusters(["papetarie", "telefoane"])
+    clusters = [make_cluster("mobilier"), make_cluster("mobilier")]
+
+    ClusterRepository.replace_all(clusters)
+
+    collection = Cluster._get_collection()
+    assert get_categories() == ["mobilier", "mobilier"]
+    assert sorted(cluster["_id"] for cluster in collection.find()) == sorted(cluster.id for cluster in clusters)
+    indexes = collection.index_information()
+    assert {"core_point_1", "category_1", "list_of_items_1"} <= set(indexes)
+    assert indexes["list_of_items_1"]["sparse"]
+
+
+def test_replace_all_keeps_the_clusters_matching_the_filter(mongo_test_connection):
+    insert_clusters(["papetarie", "telefoane", "telefoane"])
+
+    ClusterRepository.replace_all([make_cluster("telefoane")], {"category": {"$nin": ["telefoane"]}})
+
+    assert get_categories() == ["papetarie", "telefoane"]
+
+
+def test_replace_all_copies_again_a_cluster_written_during_the_copy(mongo_test_connection):
+    collection = insert_clusters(["papetarie"])
+    versions = iter([0, 1, 1, 1])
+
+    def get_version():
+        version = next(versions)
+        if version == 1 and collection.count_documents({"category": "online"}) == 0:
+            # un cluster creat online dupa copierea clusterelor pastrate
+            collection.insert_one(make_cluster("online").to_mongo())
+        return version
+
+    with patch.object(ClusterRepository, "get_version", side_effect=get_version):
+        ClusterRepository.replace_all([make_cluster("telefoane")], {"category": {"$nin": ["telefoane"]}})
+
+    assert get_categories() == ["online", "papetarie", "telefoane"]
+
+
+def test_updated_clusters_are_found_by_model_version(mongo_test_connection):
+    clusters = [make_cluster(category) for category in ("vechi", "scris", "in curs", "tarziu")]
+    for cluster, model_version in zip(clusters, [3, 5, Cluster.PENDING_MODEL_VERSION, 0]):
+        cluster.model_version = model_version
+        cluster.save()
+
+    ClusterRepository.update_model_version(clusters[3].id, 6)
+    # o scriere mai veche terminata mai tarziu nu coboara versiunea
+    ClusterRepository.update_model_version(clusters[3].id, 4)
+
+    assert sorted(cluster.category for cluster in ClusterRepository.find_updated_since(3)) == [
+        "in curs", "scris", "tarziu"
+    ]
+    assert Cluster.objects.get(id=clusters[3].id).model_version == 6
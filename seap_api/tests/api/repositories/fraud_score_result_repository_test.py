@@ -0,0 +1,46 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from api.repositories.fraud_score_result_repository import FraudScoreResultRepository
+
+
+@pytest.fixture
+def mock_fraud_score_result_model():
+    """Fixture for mocking the FraudScoreResult model."""
+    with patch("api.repositories.fraud_score_result_repository.FraudScoreResult") as mock_model:
+        yield mock_model
+
+
+# --- TEST CASES --- #
+
+def test_find_by_acquisition_ids(mock_fraud_score_result_model):
+    FraudScoreResultRepository.find_by_acquisition_ids({1: "a", 2: "b"}, 7, 2)
+
+    mock_fraud_score_result_model.objects.assert_called_once_with(
+        acquisition_id__in=[1, 2], model_version=7, price_model_version=2
+    )
+
+
+def test_save_all_replaces_the_results_in_one_bulk_write(mock_fraud_score_result_model):
+    results = [MagicMock(pk=1), MagicMock(pk=2)]
+    collection = mock_fraud_score_result_model._get_collection.return_value
+
+    FraudScoreResultRepository.save_all(results)
+
+    operations = collection.bulk_write.call_args[0][0]
+    assert [operation._filter for operation in operations] == [{"_id": 1}, {"_id": 2}]
+    assert all(operation._upsert for operation in operations)
+    for result in results:
+        result.validate.assert_called_once()
+
+
+def test_save_all_without_results(mock_fraud_score_result_model):
+    FraudScoreResultRepository.save_all([])
+
+    mock_fraud_score_result_model._get_collection.assert_not_called()
+
+
+def test_delete_older_than(mock_fraud_score_result_model):
+    FraudScoreResultRepository.delete_older_than(7)
+
+    mock_fraud_score_result_model.objects.assert_called_once_with(model_version__lt=7)
+    mock_fraud_score_result_model.objects.return_value.delete.assert_called_once()
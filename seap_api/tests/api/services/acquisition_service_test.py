@@ -127,3 +127,16 @@ def test_get_acquisitions_by_cpv_code_id(mock_acquisition_repository):
     mock_acquisition_repository.get_acquisitions_by_cpv_code_id.assert_called_once_with(101)
     assert len(result) == 2
     assert result[0]["acquisition_id"] == "A125"
+
+
+def test_get_acquisitions_with_items(mock_acquisition_repository):
+    # Mock return value
+    mock_acquisition_repository.get_acquisitions_with_items.return_value = [
+        {"acquisition_id": 1, "items": [{"name": "Item 1"}]},
+        {"acquisition_id": 2, "items": []},
+    ]
+
+    result = AcquisitionService.get_acquisitions_with_items([1, 2, 3])
+
+    mock_acquisition_repository.get_acquisitions_with_items.assert_called_once_with([1, 2, 3])
+    assert [acquisition["acquisition_id"] for acquisition in result] == [1, 2]
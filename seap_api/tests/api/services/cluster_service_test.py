@@ -0,0 +1,144 @@
+from types import SimpleNamespace
+
+import pytest
+from unittest.mock import call, patch
+from api.repositories.cluster_repository import CLUSTERS_VERSION
+from api.services.cluster_service import ClusterService
+
+
+@pytest.fixture
+def mock_cluster_repository():
+    """Fixture for mocking ClusterRepository."""
+    with patch("api.services.cluster_service.ClusterRepository") as mock_repo:
+        yield mock_repo
+
+
+def make_item(name, closing_price=10.0, quantity=1):
+    return SimpleNamespace(name=name, closing_price=closing_price, quantity=quantity)
+
+
+def make_cluster(core_point, members):
+    return SimpleNamespace(
+        id="cluster_id", core_point=core_point, list_of_items=list(members), distance_sums=[],
+        stats=ClusterService.get_stats(core_point, members), price_model=ClusterService.get_price_model(members),
+    )
+
+
+# --- TEST CASES --- #
+
+def test_create_cluster_increments_the_model_version(mock_cluster_repository):
+    item = make_item("Hartie copiator A4")
+
+    cluster = ClusterService.create_cluster(item, [item], "papetarie")
+
+    mock_cluster_repository.save.assert_called_once_with(cluster)
+    mock_cluster_repository.increment_version.assert_called_once()
+
+
+def test_add_item_increments_the_model_version(mock_cluster_repository):
+    core_point = make_item("Hartie copiator A4")
+    mock_cluster_repository.find_by_id.return_value = make_cluster(core_point, [core_point])
+    mock_cluster_repository.increment_version.return_value = 8
+    saved_versions = []
+    mock_cluster_repository.update.side_effect = lambda cluster: saved_versions.append(cluster.model_version)
+
+    cluster = ClusterService.add_item("cluster_id", make_item("Hartie copiator A4 80g"))
+
+    mock_cluster_repository.update.assert_called_once()
+    mock_cluster_repository.increment_version.assert_called_once()
+    # clusterul este salvat ca fiind in curs de scriere, apoi primeste versiunea scrierii
+    assert saved_versions == [-1]
+    mock_cluster_repository.update_model_version.assert_called_once_with("cluster_id", 8)
+    assert cluster.model_version == 8
+
+
+def test_add_existing_item_keeps_the_model_version(mock_cluster_repository):
+    core_point = make_item("Hartie copiator A4")
+    mock_cluster_repository.find_by_id.return_value = make_cluster(core_point, [core_point])
+
+    ClusterService.add_item("cluster_id", core_point)
+
+    mock_cluster_repository.update.assert_not_called()
+    mock_cluster_repository.increment_version.assert_not_called()
+
+
+def test_remove_item_increments_the_model_version(mock_cluster_repository):
+    core_point, item = make_item("Hartie copiator A4"), make_item("Hartie copiator A4 80g")
+    mock_cluster_repository.find_by_id.return_value = make_cluster(core_point, [core_point, item])
+
+    ClusterService.remove_item("cluster_id", item)
+
+    mock_cluster_repository.update.assert_called_once()
+    mock_cluster_repository.increment_version.assert_called_once()
+
+
+def test_add_item_keeps_the_radius_when_the_core_point_stays(mock_cluster_repository):
+    core_point = make_item("Hartie copiator A4")
+    cluster = make_cluster(core_point, [core_point, make_item("Hartie copiator A4 80g/mp, 500 coli")])
+    # raza salvata mai mare decat cea reala: o recalculare ar micsora-o
+    cluster.stats.radius = 30
+    mock_cluster_repository.find_by_id.return_value = cluster
+
+    result = ClusterService.add_item("cluster_id", make_item("Hartie copiator A3"))
+
+    assert result.stats.radius == 30
+    assert result.stats.size == 3
+
+
+def test_add_item_grows_the_radius_for_a_farther_item(mock_cluster_repository):
+    core_point = make_item("Hartie copiator A4")
+    mock_cluster_repository.find_by_id.return_value = make_cluster(core_point, [core_point])
+    item = make_item("Hartie copiator A4 80g/mp, 500 coli")
+
+    result = ClusterService.add_item("cluster_id", item)
+
+    assert result.stats.radius == len(item.name) - len(core_point.name)
+
+
+def test_remove_item_keeps_the_radius_without_the_farthest_member(mock_cluster_repository):
+    core_point, near_item = make_item("Hartie copiator A4"), make_item("Hartie copiator A3")
+    cluster = make_cluster(core_point, [core_point, near_item, make_item("Hartie copiator A4 80g/mp, 500 coli")])
+    cluster.stats.radius = 30
+    mock_cluster_repository.find_by_id.return_value = cluster
+
+    ClusterService.remove_item("cluster_id", near_item)
+
+    assert cluster.stats.radius == 30
+    assert cluster.stats.size == 2
+
+
+def test_remove_farthest_item_computes_the_radius_again(mock_cluster_repository):
+    core_point, far_item = make_item("Hartie copiator A4"), make_item("Hartie copiator A4 80g/mp, 500 coli")
+    cluster = make_cluster(core_point, [core_point, make_item("Hartie copiator A3"), far_item])
+    mock_cluster_repository.find_by_id.return_value = cluster
+
+    ClusterService.remove_item("cluster_id", far_item)
+
+    assert cluster.stats.radius == 1
+
+
+def test_add_and_remove_item_update_the_price_model(mock_cluster_repository):
+    members = [make_item("Hartie copiator A4", closing_price=10.0), make_item("Hartie copiator A3", closing_price=12.0)]
+    cluster = make_cluster(members[0], members)
+    mock_cluster_repository.find_by_id.return_value = cluster
+    baseline = cluster.price_model.baseline
+    expensive_items = [make_item(f"Hartie copiator A4 {grams}g", closing_price=100.0) for grams in (70, 80, 90)]
+
+    for item in expensive_items:
+        ClusterService.add_item("cluster_id", item)
+    assert cluster.price_model.baseline > baseline
+
+    for item in expensive_items:
+        ClusterService.remove_item("cluster_id", item)
+    assert cluster.price_model.baseline == baseline
+
+
+def test_publish_clusters_replaces_the_categories_and_increments_both_versions(mock_cluster_repository):
+    core_point = make_item("Hartie copiator A4")
+
+    documents = ClusterService.publish_clusters([(core_point, [core_point], "papetarie", [0.0], 10.0)], {"papetarie"})
+
+    mock_cluster_repository.replace_all.assert_called_once_with(documents, {"category": {"$nin": ["papetarie"]}})
+    assert documents[0].category == "papetarie"
+    assert documents[0].price_model.baseline == 10.0
+    assert mock_cluster_repository.increment_version.call_args_list == [call(CLUSTERS_VERSION), call()]
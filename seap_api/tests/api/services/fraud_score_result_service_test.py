@@ -0,0 +1,76 @@
+import json
+from datetime import timezone
+
+import pytest
+from unittest.mock import patch, MagicMock
+from api.services.fraud_score_result_service import FraudScoreResultService
+from decision_module.DecisionalMethods.FraudDetectionClustering import PRICE_MODEL_VERSION
+
+
+@pytest.fixture
+def mock_fraud_score_result_repository():
+    """Fixture for mocking FraudScoreResultRepository."""
+    with patch("api.services.fraud_score_result_service.FraudScoreResultRepository") as mock_repo:
+        yield mock_repo
+
+
+def make_acquisition(acquisition_id, closing_price=10.0):
+    return {
+        "acquisition_id": acquisition_id,
+        "items": [{"_id": f"item_{acquisition_id}", "name": "Hartie A4", "quantity": 5, "closing_price": closing_price}],
+    }
+
+
+def make_result(acquisition, response):
+    return MagicMock(
+        acquisition_id=acquisition["acquisition_id"],
+        items_hash=FraudScoreResultService.get_items_hash(acquisition),
+        response=json.dumps(response),
+    )
+
+
+# --- TEST CASES --- #
+
+def test_get_results_returns_the_stored_responses(mock_fraud_score_result_repository):
+    acquisitions = [make_acquisition(1), make_acquisition(2)]
+    mock_fraud_score_result_repository.find_by_acquisition_ids.return_value = [
+        make_result(acquisitions[0], {"fraud_score": 12.5})
+    ]
+
+    result = FraudScoreResultService.get_results(acquisitions, 7)
+
+    args = mock_fraud_score_result_repository.find_by_acquisition_ids.call_args[0]
+    assert list(args[0]) == [1, 2]
+    assert args[1:] == (7, PRICE_MODEL_VERSION)
+    # achizitia 2 nu are rezultat salvat si va fi calculata
+    assert result == {1: {"fraud_score": 12.5}}
+
+
+def test_get_results_skips_results_of_other_items(mock_fraud_score_result_repository):
+    stored_acquisition = make_acquisition(1, closing_price=10.0)
+    mock_fraud_score_result_repository.find_by_acquisition_ids.return_value = [
+        make_result(stored_acquisition, {"fraud_score": 12.5})
+    ]
+
+    result = FraudScoreResultService.get_results([make_acquisition(1, closing_price=99.0)], 7)
+
+    assert result == {}
+
+
+def test_save_results_stores_the_responses_with_a_utc_time(mock_fraud_score_result_repository):
+    acquisitions = [make_acquisition(1), make_acquisition(2)]
+
+    FraudScoreResultService.save_results(acquisitions, [{"fraud_score": 1.0}, {"fraud_score": 2.0}], 7)
+
+    results = mock_fraud_score_result_repository.save_all.call_args[0][0]
+    assert [result.acquisition_id for result in results] == [1, 2]
+    assert [json.loads(result.response) for result in results] == [{"fraud_score": 1.0}, {"fraud_score": 2.0}]
+    assert all(result.model_version == 7 for result in results)
+    assert results[0].items_hash == FraudScoreResultService.get_items_hash(acquisitions[0])
+    assert results[0].created_at.utcoffset() == timezone.utc.utcoffset(None)
+
+
+def test_delete_stale_results(mock_fraud_score_result_repository):
+    FraudScoreResultService.delete_stale_results(7)
+
+    mock_fraud_score_result_repository.delete_older_than.assert_called_once_with(7)
@@ -1,3 +1,9 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+
 
 # ACQUISITION MOCK
 class AcquisitionServiceMock:
@@ -256,4 +262,73 @@ def test_items_by_cpv_code_view_get_not_found():
     response = view.get(cpv_code_id=999)
 
     assert response["status_code"] == 404
-    assert response["data"]["error"] == "No items found for the given CPV code ID"
\ No newline at end of file
+    assert response["data"]["error"] == "No items found for the given CPV code ID"
+
+
+# FRAUD SCORE BULK VIEW
+
+@pytest.fixture
+def fraud_score_bulk_view(django_setup):
+    """The real FraudScoreBulkView; api.views reads the Django settings when imported."""
+    from api.views import FraudScoreBulkView
+
+    return FraudScoreBulkView()
+
+
+@pytest.fixture
+def mock_bulk_scoring(fraud_score_bulk_view):
+    """Fixture for mocking the acquisitions and the fraud scoring used by FraudScoreBulkView."""
+    with patch("api.views.AcquisitionService") as mock_service, \
+         patch("api.views.get_fraud_scores_for_acquisitions") as mock_scoring, \
+         patch("api.views.settings", SimpleNamespace(FRAUD_SCORE_MAX_BATCH_SIZE=3)):
+        mock_service.get_acquisitions_with_items.return_value = [
+            {"acquisition_id": 12, "items": []}, {"acquisition_id": 7, "items": []}
+        ]
+        mock_scoring.return_value = [{"fraud_score": 10.0}, {"fraud_score": 20.0}]
+        yield mock_service, mock_scoring
+
+
+def post_bulk(view, data):
+    return view.post(SimpleNamespace(data=data))
+
+
+def test_fraud_score_bulk_view_post(fraud_score_bulk_view, mock_bulk_scoring):
+    mock_service, mock_scoring = mock_bulk_scoring
+
+    response = post_bulk(fraud_score_bulk_view, {"acquisition_ids": [12, "7", 12]})
+
+    assert response.status_code == 200
+    mock_service.get_acquisitions_with_items.assert_called_once_with([12, 7])
+    mock_scoring.assert_called_once_with(mock_service.get_acquisitions_with_items.return_value)
+    assert response.data == {"results": {"12": {"fraud_score": 10.0}, "7": {"fraud_score": 20.0}}, "not_found": []}
+
+
+def test_fraud_score_bulk_view_post_not_found(fraud_score_bulk_view, mock_bulk_scoring):
+    mock_service, mock_scoring = mock_bulk_scoring
+    mock_service.get_acquisitions_with_items.return_value = [{"acquisition_id": 7, "items": []}]
+    mock_scoring.return_value = [{"fraud_score": 20.0}]
+
+    response = post_bulk(fraud_score_bulk_view, {"acquisition_ids": [12, 7]})
+
+    assert response.data == {"results": {"7": {"fraud_score": 20.0}}, "not_found": [12]}
+
+
+@pytest.mark.parametrize("data", [
+    [12, 7],
+    {"acquisition_ids": []},
+    {"acquisition_ids": "12"},
+    {"acquisition_ids": [1, 2, 3, 4]},
+    {"acquisition_ids": [True]},
+    {"acquisition_ids": [2.9]},
+    {"acquisition_ids": ["12a"]},
+    {"acquisition_ids": ["-12"]},
+])
+def test_fraud_score_bulk_view_post_bad_request(fraud_score_bulk_view, mock_bulk_scoring, data):
+    mock_service, mock_scoring = mock_bulk_scoring
+
+    response = post_bulk(fraud_score_bulk_view, data)
+
+    assert response.status_code == 400
+    assert "error" in response.data
+    mock_service.get_acquisitions_with_items.assert_not_called()
+    mock_scoring.assert_not_called()
@@ -0,0 +1,63 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from decision_module.Algorithms.AgglomerativeClusteringStrategy import (
+    AgglomerativeClusteringStrategy,
+)
+from decision_module.utils.linkage import average_linkage
+from sklearn.cluster import AgglomerativeClustering
+from sklearn.metrics import adjusted_rand_score
+
+
+@pytest.fixture
+def distance_matrix():
+    # distante intregi cu multe egalitati, ca in cazul Levenshtein
+    rng = np.random.default_rng(0)
+    points = rng.integers(0, 6, size=(40, 3))
+    matrix = np.abs(points[:, None, :] - points[None, :, :]).sum(axis=2)
+    return matrix.astype(float)
+
+
+def test_cluster_range_matches_sklearn_for_every_cut(distance_matrix):
+    strategy = AgglomerativeClusteringStrategy()
+    n_clusters_range = range(2, len(distance_matrix))
+
+    for n_clusters, labels in strategy.cluster_range(distance_matrix, n_clusters_range):
+        expected = AgglomerativeClustering(
+            n_clusters=n_clusters, metric="precomputed", linkage="average"
+        ).fit_predict(distance_matrix)
+
+        assert len(np.unique(labels)) == n_clusters
+        assert adjusted_rand_score(expected, labels) == 1.0
+
+
+def test_tree_is_built_once_per_matrix(distance_matrix):
+    strategy = AgglomerativeClusteringStrategy()
+
+    with patch(
+        "decision_module.Algorithms.AgglomerativeClusteringStrategy.average_linkage",
+        wraps=average_linkage,
+    ) as mock_linkage:
+        list(strategy.cluster_range(distance_matrix, range(2, 10)))
+        labels = strategy.cluster(distance_matrix, 4)
+
+    assert mock_linkage.call_count == 1
+    assert len(np.unique(labels)) == 4
+
+
+def test_weights_cluster_like_the_duplicated_points():
+    rng = np.random.default_rng(1)
+    points = rng.random((15, 2))
+    matrix = np.abs(points[:, None, :] - points[None, :, :]).sum(axis=2)
+    weights = rng.integers(1, 4, size=15)
+    duplicated = np.repeat(np.arange(15), weights)
+
+    strategy = AgglomerativeClusteringStrategy()
+    for n_clusters in range(2, 8):
+        expected = AgglomerativeClustering(
+            n_clusters=n_clusters, metric="precomputed", linkage="average"
+        ).fit_predict(matrix[np.ix_(duplicated, duplicated)])
+        labels = strategy.cluster(matrix, n_clusters, sample_weight=weights)
+
+        assert adjusted_rand_score(expected, labels[duplicated]) == 1.0
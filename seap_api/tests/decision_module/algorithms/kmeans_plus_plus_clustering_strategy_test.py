@@ -0,0 +1,81 @@
+import pickle
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from decision_module.Algorithms import KMeansPlusPlusClusteringStrategy as strategy_module
+from decision_module.Algorithms.KMeansPlusPlusClusteringStrategy import (
+    KMeansPlusPlusClusteringStrategy,
+)
+
+
+@pytest.fixture
+def distance_matrix():
+    rng = np.random.default_rng(0)
+    centers = rng.integers(0, 40, size=(6, 3))
+    points = np.repeat(centers, 8, axis=0) + rng.integers(0, 3, size=(48, 3))
+    return np.abs(points[:, None, :] - points[None, :, :]).sum(axis=2).astype(float)
+
+
+def test_embedding_is_computed_once_per_sweep(distance_matrix):
+    strategy = KMeansPlusPlusClusteringStrategy(random_state=0)
+
+    with patch.object(
+        strategy_module, "similarity_matrix", wraps=strategy_module.similarity_matrix
+    ) as similarity_matrix:
+        results = list(strategy.cluster_range(distance_matrix, [9, 2, 5, 3]))
+        strategy.cluster(distance_matrix, 4)
+
+    assert similarity_matrix.call_count == 1
+    assert [n_clusters for n_clusters, _ in results] == [9, 2, 5, 3]
+    for n_clusters, labels in results:
+        assert len(labels) == len(distance_matrix)
+        assert len(np.unique(labels)) == n_clusters
+
+
+def test_sweep_is_reproducible_with_random_state(distance_matrix):
+    first = dict(KMeansPlusPlusClusteringStrategy(random_state=0).cluster_range(distance_matrix, range(2, 10)))
+    second = dict(KMeansPlusPlusClusteringStrategy(random_state=0).cluster_range(distance_matrix, range(2, 10)))
+
+    for n_clusters in range(2, 10):
+        assert np.array_equal(first[n_clusters], second[n_clusters])
+
+
+def test_adaptive_n_init():
+    n_init = KMeansPlusPlusClusteringStrategy.adaptive_n_init
+
+    assert n_init(50, 2) == strategy_module.MAX_N_INIT
+    assert n_init(5000, 1000) == strategy_module.MIN_N_INIT
+    assert n_init(50, 2, warm_start=True) == strategy_module.WARM_START_N_INIT
+
+
+def test_extend_centers_keeps_previous_centroids():
+    points = np.array([[0.0, 0.0], [0.0, 1.0], [10.0, 0.0], [10.0, 1.0], [5.0, 8.0]])
+    centers = np.array([[0.0, 0.5], [10.0, 0.5]])
+
+    extended = KMeansPlusPlusClusteringStrategy.extend_centers(
+        points, centers, np.array([0, 0, 1, 1, 0]), 3, np.ones(5), np.random.default_rng(0)
+    )
+
+    assert np.array_equal(extended[:2], centers)
+    assert extended.shape == (3, 2)
+
+
+def test_cached_embedding_is_not_pickled(distance_matrix):
+    strategy = KMeansPlusPlusClusteringStrategy(random_state=1)
+    strategy.cluster(distance_matrix, 3)
+
+    copy = pickle.loads(pickle.dumps(strategy))
+
+    assert copy.random_state == 1
+    assert copy._embedding is None
+
+
+def test_labels_do_not_depend_on_the_values_swept_together(distance_matrix):
+    strategy = KMeansPlusPlusClusteringStrategy(random_state=0)
+    full = dict(strategy.cluster_range(distance_matrix, range(2, 14)))
+
+    for n_clusters_list in ([2, 7, 12], [13, 5], [9], [3, 11, 6]):
+        batch = dict(KMeansPlusPlusClusteringStrategy(random_state=0).cluster_range(distance_matrix, n_clusters_list))
+        for n_clusters in n_clusters_list:
+            assert np.array_equal(batch[n_clusters], full[n_clusters])
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from decision_module.Algorithms.LeaderClusteringStrategy import LeaderClusteringStrategy
+from decision_module.utils.distance_matrix import build_distance_matrix
+from decision_module.utils.name_features import get_name_features, name_distance
+
+
+@pytest.fixture
+def name_features():
+    names = [
+        "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB, Midnight Black",
+        "Telefon mobil Google Pixel 9 Pro, 128GB, 16GB RAM, 5G, Obsidian",
+        "Smartphone Xiaomi Redmi 13C 256GB 8GB RAM Dual SIM Midnight Black",
+        "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB, Midnight Black",
+        "TELEFON FIX OHO 5005",
+        "Telefon Mobil Samsung Galaxy A05, 4GB RAM, 64GB, (Negru/Non-Eu)",
+        "Telefon mobil Google Pixel 9 Pro, 128GB, 16GB RAM, 5G, Obsidian",
+    ]
+    return get_name_features(names)
+
+
+def test_batches_match_precomputed_matrix(name_features):
+    strategy = LeaderClusteringStrategy()
+    labels = np.r_[strategy.partial_fit(name_features[:3]), strategy.partial_fit(name_features[3:])]
+
+    matrix_labels = LeaderClusteringStrategy().cluster(build_distance_matrix(name_features, name_distance), 0)
+
+    assert np.array_equal(labels, matrix_labels)
+    assert labels[0] == labels[3]
+    assert labels[1] == labels[6]
+    assert strategy.n_clusters == len(set(labels))
+    assert sum(strategy.counts) == len(name_features)
+
+
+def test_state_is_restored_between_runs(tmp_path, name_features):
+    path = str(tmp_path / "leaders.json")
+    strategy = LeaderClusteringStrategy(max_distance=1)
+    first_labels = strategy.partial_fit(name_features[:4])
+    strategy.save(path)
+
+    restored = LeaderClusteringStrategy.load(path)
+
+    assert restored.max_distance == 1
+    assert restored.counts == strategy.counts
+    assert np.array_equal(restored.partial_fit(name_features[:4]), first_labels)
+    assert np.array_equal(restored.partial_fit(name_features[4:]), strategy.partial_fit(name_features[4:]))
+
+
+def test_missing_state_gives_empty_strategy(tmp_path):
+    strategy = LeaderClusteringStrategy.load(str(tmp_path / "missing.json"), max_distance=3)
+
+    assert strategy.n_clusters == 0
+    assert strategy.max_distance == 3
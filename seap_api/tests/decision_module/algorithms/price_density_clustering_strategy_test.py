@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from decision_module.Algorithms.PriceDensityClusteringStrategy import (
+    PriceDensityClusteringStrategy,
+)
+from sklearn.cluster import OPTICS
+
+
+def make_prices(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(3, 60))
+    if seed % 2:
+        # multe preturi egale, ca sa fie verificata ordinea la egalitate
+        return rng.integers(0, 8, n).astype(float)
+    return np.round(rng.lognormal(5, 0.6, n), 2)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_optics_with_min_samples_2(seed):
+    prices = make_prices(seed)
+    optics = OPTICS(metric="precomputed", min_samples=2).fit(np.abs(prices[:, None] - prices[None, :]))
+
+    strategy = PriceDensityClusteringStrategy()
+    ordering, reachability, predecessor = strategy.optics_graph(prices)
+
+    assert list(ordering) == list(optics.ordering_)
+    assert list(reachability) == list(optics.reachability_)
+    assert list(predecessor) == list(optics.predecessor_)
+    assert list(strategy.cluster(prices)) == list(optics.labels_)
+
+
+def test_takes_values_instead_of_distances():
+    strategy = PriceDensityClusteringStrategy()
+
+    assert not strategy.precomputed
+    assert list(strategy.cluster(np.array([5.0]))) == [-1]
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from decision_module.Algorithms.AgglomerativeClusteringStrategy import (
+    AgglomerativeClusteringStrategy,
+)
+from decision_module.ClusteringMethod.SimpleClustering import SimpleClustering
+
+
+@pytest.fixture
+def items(make_items):
+    names = [
+        "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB, Midnight Black",
+        "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB, Midnight Black",
+        "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB, Midnight Black",
+        "Telefon mobil Google Pixel 9 Pro, 128GB, 16GB RAM, 5G, Obsidian",
+        "Telefon mobil Google Pixel 9 Pro, 128GB, 16GB RAM, 5G, Obsidian",
+        "Telefon Mobil Samsung Galaxy A05, 4GB RAM, 64GB, (Negru/Non-Eu)",
+        "TELEFON FIX OHO 5005",
+        "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB, Midnight Black",
+    ]
+    return make_items(names)
+
+
+def test_items_are_deduplicated_with_weights(items):
+    clustering = SimpleClustering(items, AgglomerativeClusteringStrategy())
+
+    assert len(clustering.unique_items) == 4
+    assert clustering.distance_matrix.shape == (4, 4)
+    assert list(clustering.weights) == [4, 2, 1, 1]
+    assert clustering.max_clusters == 3
+
+
+def test_labels_are_expanded_to_every_item(items):
+    clustering = SimpleClustering(items, AgglomerativeClusteringStrategy())
+
+    labels = clustering.expand_labels(np.array([0, 1, 2, 3]))
+
+    assert list(labels) == [0, 0, 0, 1, 1, 2, 3, 0]
+
+
+def test_duplicates_end_up_in_the_same_cluster(items):
+    clusters = SimpleClustering(items, AgglomerativeClusteringStrategy()).execute_clustering()
+
+    assert sum(len(members) for members in clusters.values()) == len(items)
+    for members in clusters.values():
+        if items[0] in members:
+            assert all(item in members for item in items[:3] + items[7:])
+
+
+def test_too_few_distinct_names_give_a_single_cluster(items):
+    clusters = SimpleClustering(items[:3], AgglomerativeClusteringStrategy()).execute_clustering()
+
+    assert clusters == {0: items[:3]}
+
+
+def test_medoid_is_read_from_the_distance_matrix(items):
+    clustering = SimpleClustering(items, AgglomerativeClusteringStrategy())
+    member_indices = [3, 0, 1, 7, 6]
+
+    medoid, distance_sums = clustering.find_medoid(member_indices)
+
+    distance_matrix = np.asarray(clustering.distance_matrix)
+    unique_indices = clustering.item_to_unique[member_indices]
+    expected = distance_matrix[np.ix_(unique_indices, unique_indices)].sum(axis=1)
+    assert np.allclose(distance_sums, expected)
+    assert medoid == int(np.argmin(expected))
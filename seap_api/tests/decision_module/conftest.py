@@ -0,0 +1,18 @@
+import pytest
+
+
+class FakeItem:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+@pytest.fixture
+def make_items():
+    """Builds a FakeItem (only a name) for every given name."""
+    def make(names):
+        return [FakeItem(name) for name in names]
+
+    return make
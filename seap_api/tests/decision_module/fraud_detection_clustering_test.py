@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from decision_module.Algorithms.OPTICSClusteringStrategy import OPTICSClusteringStrategy
+from decision_module.DecisionalMethods.FraudDetectionClustering import (
+    FraudDetectionClustering,
+)
+
+
+def make_items(closing_prices, quantities):
+    return [
+        SimpleNamespace(closing_price=float(closing_price), quantity=float(quantity))
+        for closing_price, quantity in zip(closing_prices, quantities)
+    ]
+
+
+@pytest.mark.parametrize("n_items", [1, 2, 3, 12, 40])
+def test_stored_baseline_gives_the_same_scores(n_items):
+    generator = np.random.default_rng(n_items)
+    items = make_items(
+        np.round(generator.lognormal(5, 0.5, n_items), 2),
+        generator.integers(0, 4, n_items),
+    )
+
+    baseline = FraudDetectionClustering(None, items).get_price_baseline()
+
+    for item in items:
+        expected = FraudDetectionClustering(item, items).detect_fraud()
+        score = FraudDetectionClustering.score_price(FraudDetectionClustering.get_unit_price(item), baseline)
+        assert score == pytest.approx(expected)
+
+
+def test_small_clusters_use_a_baseline_of_at_least_one():
+    items = make_items([0, 0], [1, 1])
+
+    assert FraudDetectionClustering(None, items).get_price_baseline() == 1
+    assert FraudDetectionClustering.score_price(0, 0) == 0
+
+
+@pytest.mark.parametrize("n_items", [2, 3, 40])
+def test_score_all_matches_the_per_item_scores(n_items):
+    generator = np.random.default_rng(n_items)
+    items = make_items(
+        np.round(generator.lognormal(5, 0.5, n_items), 2),
+        generator.integers(0, 4, n_items),
+    )
+
+    scores = FraudDetectionClustering(None, items).score_all()
+
+    expected = [FraudDetectionClustering(item, items).detect_fraud() for item in items]
+    assert scores == pytest.approx(expected)
+
+
+def test_first_largest_cluster_wins_ties():
+    items = make_items([10, 20, 10, 20], [1, 1, 1, 1])
+
+    price = FraudDetectionClustering(None, items).get_largest_cluster_price(items, [1, 0, 1, 0])
+
+    assert price == 10
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_default_strategy_gives_the_optics_baseline():
+    generator = np.random.default_rng(3)
+    items = make_items(np.round(generator.lognormal(5, 0.5, 60), 2), generator.integers(1, 4, 60))
+
+    baseline = FraudDetectionClustering(None, items).get_price_baseline()
+
+    optics = FraudDetectionClustering(None, items, OPTICSClusteringStrategy())
+    assert baseline == pytest.approx(optics.get_price_baseline())
+
+
+def test_score_prices_with_a_baseline_per_item():
+    scores = FraudDetectionClustering.score_prices([10, 15, 50, 3], [10, 10, 20, 0])
+
+    assert list(scores) == [0, 50, 100, 0]
@@ -0,0 +1,323 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from mongoengine import DoesNotExist
+
+from decision_module import fraud_scoring
+from decision_module.Algorithms.LeaderClusteringStrategy import LeaderClusteringStrategy
+from decision_module.utils.cluster_index import ClusterIndex
+
+NAMES = [
+    "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB, Midnight Black",
+    "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 128GB, Midnight Black",
+    "Telefon mobil Google Pixel 9 Pro, 128GB, 16GB RAM, 5G, Obsidian",
+]
+
+
+def make_cluster(cluster_id, names):
+    members = [SimpleNamespace(name=name) for name in names]
+    return SimpleNamespace(id=cluster_id, core_point=members[0], list_of_items=members)
+
+
+@pytest.fixture
+def mock_cluster_service():
+    with patch("decision_module.fraud_scoring.ClusterService") as mock_service:
+        yield mock_service
+
+
+@pytest.fixture(autouse=True)
+def reset_cluster_index():
+    fraud_scoring._cluster_index = None
+    yield
+    fraud_scoring._cluster_index = None
+
+
+def test_cluster_index_reads_only_the_clusters_written_since_its_version(mock_cluster_service):
+    mock_cluster_service.get_model_version.return_value = 3
+    mock_cluster_service.get_clusters_version.return_value = 1
+    mock_cluster_service.get_all_clusters_with_items.return_value = [make_cluster(1, NAMES[:1])]
+
+    cluster_index = fraud_scoring.get_cluster_index()
+    assert fraud_scoring.get_cluster_index() is cluster_index
+    assert mock_cluster_service.get_all_clusters_with_items.call_count == 1
+
+    # o scriere din alt proces mareste versiunea modelului: sunt citite doar clusterele scrise
+    mock_cluster_service.get_model_version.return_value = 4
+    mock_cluster_service.get_clusters_updated_since.return_value = [make_cluster(1, NAMES[:2])]
+
+    assert fraud_scoring.get_cluster_index() is cluster_index
+    mock_cluster_service.get_clusters_updated_since.assert_called_once_with(3)
+    assert mock_cluster_service.get_all_clusters_with_items.call_count == 1
+    assert cluster_index.version == cluster_index.synced_version == 4
+    assert cluster_index.find_by_name(NAMES[1]).id == 1
+
+
+def test_cluster_index_is_loaded_when_the_clusters_are_published(mock_cluster_service):
+    mock_cluster_service.get_model_version.return_value = 3
+    mock_cluster_service.get_clusters_version.return_value = 1
+    mock_cluster_service.get_all_clusters_with_items.return_value = [make_cluster(1, NAMES[:2])]
+    cluster_index = fraud_scoring.get_cluster_index()
+
+    # publicarea mareste ambele versiuni: indexul este reincarcat complet
+    mock_cluster_service.get_model_version.return_value = 4
+    mock_cluster_service.get_clusters_version.return_value = 2
+    mock_cluster_service.get_all_clusters_with_items.return_value = [make_cluster(2, NAMES[2:])]
+
+    assert fraud_scoring.get_cluster_index() is cluster_index
+    mock_cluster_service.get_clusters_updated_since.assert_not_called()
+    assert cluster_index.version == 4
+    assert cluster_index.find_by_name(NAMES[2]).id == 2
+    assert cluster_index.find_by_name(NAMES[0]) is None
+
+
+def test_stale_index_after_a_concurrent_write_is_refreshed(mock_cluster_service):
+    cluster_index = fraud_scoring._cluster_index = ClusterIndex([make_cluster(1, NAMES[:1])], 3, clusters_version=1)
+    # scrierea proprie ajunge la versiunea 5: a scris intre timp si alt proces
+    cluster_index.advance_version(5)
+    mock_cluster_service.get_model_version.return_value = 5
+    mock_cluster_service.get_clusters_version.return_value = 1
+    mock_cluster_service.get_clusters_updated_since.return_value = [make_cluster(2, NAMES[2:])]
+
+    assert fraud_scoring.get_cluster_index() is cluster_index
+
+    mock_cluster_service.get_clusters_updated_since.assert_called_once_with(3)
+    mock_cluster_service.get_all_clusters_with_items.assert_not_called()
+    assert cluster_index.version == 5
+    assert cluster_index.find_by_name(NAMES[2]).id == 2
+
+
+def test_new_cluster_keeps_the_index_current(mock_cluster_service):
+    cluster_index = ClusterIndex([], version=3)
+    item = SimpleNamespace(name=NAMES[2], cpv_code_id=None)
+    new_cluster = make_cluster(7, NAMES[2:])
+    mock_cluster_service.create_cluster.return_value = new_cluster
+    mock_cluster_service.get_model_version.return_value = 4
+
+    assert fraud_scoring.search_for_cluster_of_item(item, cluster_index) is new_cluster
+    assert cluster_index.version == 4
+    assert cluster_index.find_by_name(NAMES[2]) is new_cluster
+
+
+def test_deleted_cluster_reloads_the_index_and_searches_again(mock_cluster_service):
+    stale_cluster = make_cluster(1, NAMES[:1])
+    stale_cluster.stats = SimpleNamespace(radius=5)
+    cluster_index = ClusterIndex([stale_cluster], version=3)
+    published_cluster = make_cluster(2, NAMES[:2])
+    mock_cluster_service.get_cluster.side_effect = DoesNotExist("Cluster matching query does not exist.")
+    mock_cluster_service.get_model_version.return_value = 5
+    mock_cluster_service.get_all_clusters_with_items.return_value = [published_cluster]
+
+    cluster = fraud_scoring.search_for_cluster_of_item(SimpleNamespace(name=NAMES[1], cpv_code_id=None), cluster_index)
+
+    assert cluster is published_cluster
+    assert cluster_index.version == 5
+    mock_cluster_service.add_item.assert_not_called()
+
+
+@pytest.fixture
+def mock_result_service():
+    with patch("decision_module.fraud_scoring.FraudScoreResultService") as mock_service, \
+         patch("decision_module.fraud_scoring.settings", SimpleNamespace(FRAUD_SCORE_CACHE_ENABLED=True)):
+        yield mock_service
+
+
+def scoring_with_writes(cluster_index, versions):
+    """Stands in for the scoring of the batch: one write through the index per version."""
+    def compute(acquisitions, index):
+        assert index is cluster_index
+        for version in versions:
+            cluster_index.advance_version(version)
+        return [{"fraud_score": 10.0} for _ in acquisitions]
+
+    return compute
+
+
+def test_stored_responses_are_not_scored_again(mock_cluster_service, mock_result_service):
+    fraud_scoring._cluster_index = ClusterIndex([], version=3)
+    mock_cluster_service.get_model_version.return_value = 3
+    mock_result_service.get_results.return_value = {1: {"fraud_score": 5.0}}
+
+    with patch("decision_module.fraud_scoring.compute_fraud_scores_for_acquisitions") as mock_compute:
+        responses = fraud_scoring.get_fraud_scores_for_acquisitions([{"acquisition_id": 1, "items": []}])
+
+    assert responses == [{"fraud_score": 5.0}]
+    mock_result_service.get_results.assert_called_once_with([{"acquisition_id": 1, "items": []}], 3)
+    mock_compute.assert_not_called()
+    mock_result_service.save_results.assert_not_called()
+
+
+def test_scored_responses_are_stored_with_the_version_of_the_batch(mock_cluster_service, mock_result_service):
+    cluster_index = fraud_scoring._cluster_index = ClusterIndex([], version=3)
+    acquisitions = [{"acquisition_id": 1, "items": []}, {"acquisition_id": 2, "items": []}]
+    mock_result_service.get_results.return_value = {1: {"fraud_score": 5.0}}
+    # versiunea citita de get_cluster_index, apoi cea de dupa cele doua scrieri ale lotului
+    mock_cluster_service.get_model_version.side_effect = [3, 5]
+
+    with patch(
+        "decision_module.fraud_scoring.compute_fraud_scores_for_acquisitions",
+        side_effect=scoring_with_writes(cluster_index, [4, 5]),
+    ):
+        responses = fraud_scoring.get_fraud_scores_for_acquisitions(acquisitions)
+
+    assert responses == [{"fraud_score": 5.0}, {"fraud_score": 10.0}]
+    mock_result_service.save_results.assert_called_once_with(acquisitions[1:], [{"fraud_score": 10.0}], 5)
+
+
+def test_responses_are_not_stored_after_a_write_from_another_process(mock_cluster_service, mock_result_service):
+    cluster_index = fraud_scoring._cluster_index = ClusterIndex([], version=3)
+    mock_result_service.get_results.return_value = {}
+    # scrierea lotului ajunge la versiunea 5: a scris intre timp si alt proces
+    mock_cluster_service.get_model_version.side_effect = [3, 5]
+
+    with patch(
+        "decision_module.fraud_scoring.compute_fraud_scores_for_acquisitions",
+        side_effect=scoring_with_writes(cluster_index, [5]),
+    ):
+        responses = fraud_scoring.get_fraud_scores_for_acquisitions([{"acquisition_id": 1, "items": []}])
+
+    assert responses == [{"fraud_score": 10.0}]
+    mock_result_service.save_results.assert_not_called()
+
+
+@pytest.fixture
+def clustering_settings(tmp_path):
+    with patch(
+        "decision_module.fraud_scoring.settings",
+        SimpleNamespace(CLUSTERING_BLOCKING_MIN_ITEMS=5000, CLUSTERING_DISTANCE_CACHE_DIR=str(tmp_path)),
+    ):
+        yield
+
+
+def test_cluster_category_returns_the_members_medoids_and_baselines(clustering_settings):
+    names = [
+        "Hartie copiator A4 80g", "Hartie copiator A4 80 g", "Hartie copiator A4, 80g",
+        "Toner imprimanta HP 85A", "Toner imprimanta HP 85 A", "Toner imprimanta HP 85A,",
+    ]
+    prices = [(20.0, 1), (22.0, 1), (21.0, 1), (300.0, 1), (310.0, 1), (305.0, 1)]
+
+    clusters = fraud_scoring.cluster_category("papetarie", names, prices)
+
+    assert sorted(index for members, _, _, _ in clusters for index in members) == list(range(len(names)))
+    # hartia si tonerul nu ajung in acelasi cluster
+    assert all(max(members) < 3 or min(members) >= 3 for members, _, _, _ in clusters)
+    for members, medoid, distance_sums, baseline in clusters:
+        assert 0 <= medoid < len(members)
+        assert len(distance_sums) == len(members)
+        assert min(prices[index][0] for index in members) <= baseline <= max(prices[index][0] for index in members)
+
+
+def test_small_category_is_a_single_cluster(clustering_settings):
+    clusters = fraud_scoring.cluster_category(
+        "papetarie", ["Hartie copiator A4", "Toner HP 85A", "Hartie copiator A4"], [(20.0, 1), (300.0, 1), (22.0, 1)]
+    )
+
+    assert len(clusters) == 1
+    assert sorted(clusters[0][0]) == [0, 1, 2]
+
+
+def make_category_items(names):
+    return [{"name": name, "closing_price": 10.0, "quantity": 1} for name in names]
+
+
+def test_failed_category_is_reported_and_the_others_are_clustered():
+    category_items = {"mic": make_category_items(["a"]), "mare": make_category_items(["a", "b", "c"])}
+
+    def cluster(category, item_names, item_prices, n_workers):
+        if category == "mic":
+            raise ValueError("clustering failed")
+        return [(list(range(len(item_names))), 0, [0.0] * len(item_names), 10.0)]
+
+    with patch("decision_module.fraud_scoring.cluster_category", side_effect=cluster) as mock_cluster:
+        results = list(fraud_scoring.cluster_categories(category_items, 1, 4))
+
+    # categoriile mari sunt clusterizate primele, cu toti workerii
+    assert [category for category, _, _ in results] == ["mare", "mic"]
+    assert results[0][1] == [([0, 1, 2], 0, [0.0, 0.0, 0.0], 10.0)] and results[0][2] is None
+    assert results[1][1] is None and str(results[1][2]) == "clustering failed"
+    assert all(call.args[3] == 4 for call in mock_cluster.call_args_list)
+
+
+def test_parallel_categories_share_the_clustering_workers():
+    category_items = {category: make_category_items(["a", "b"]) for category in ("a", "b", "c")}
+
+    # procesele sunt inlocuite cu fire de executie, ca sa poata fi folosit mock-ul
+    with patch("decision_module.fraud_scoring.ProcessPoolExecutor", ThreadPoolExecutor), \
+         patch("decision_module.fraud_scoring.cluster_category", return_value=[]) as mock_cluster:
+        results = list(fraud_scoring.cluster_categories(category_items, 2, 8))
+
+    assert sorted(category for category, _, _ in results) == ["a", "b", "c"]
+    assert [call.args[3] for call in mock_cluster.call_args_list] == [4, 4, 4]
+
+
+def test_new_cluster_gets_the_category_of_the_item(mock_cluster_service):
+    cluster_index = ClusterIndex([make_cluster(1, NAMES[:1])], version=3)
+    item = SimpleNamespace(name=NAMES[1], cpv_code_id=123)
+    mock_cluster_service.create_cluster.return_value = make_cluster(2, NAMES[1:2])
+    mock_cluster_service.get_model_version.return_value = 4
+
+    # clusterul fara categorie nu este un candidat pentru un item din categoria "Telefoane mobile"
+    with patch("decision_module.fraud_scoring._category_of_cpv", {123: "Telefoane mobile"}):
+        fraud_scoring.search_for_cluster_of_item(item, cluster_index)
+
+    mock_cluster_service.create_cluster.assert_called_once_with(item, [item], "Telefoane mobile")
+    mock_cluster_service.get_cluster.assert_not_called()
+
+
+class WatermarkItem(dict):
+    pk = property(lambda self: self["_id"])
+
+
+def test_edited_item_changes_the_category_watermark():
+    items = [WatermarkItem(_id=i, name=name, closing_price=10.0, quantity=1) for i, name in enumerate(NAMES)]
+    stored_watermark = SimpleNamespace(**fraud_scoring.get_category_watermark(items))
+
+    assert fraud_scoring.is_category_unchanged(stored_watermark, fraud_scoring.get_category_watermark(items))
+
+    items[0]["closing_price"] = 99.0
+    assert not fraud_scoring.is_category_unchanged(stored_watermark, fraud_scoring.get_category_watermark(items))
+
+
+def test_leader_state_absorbs_only_the_new_items(tmp_path):
+    items = [WatermarkItem(_id=i, name=name, closing_price=10.0, quantity=1) for i, name in enumerate(NAMES)]
+
+    with patch("decision_module.fraud_scoring.settings", SimpleNamespace(CLUSTERING_LEADER_STATE_DIR=str(tmp_path))):
+        n_leaders = fraud_scoring.update_leader_state("Telefoane mobile", items[:2])
+        stored_watermark = SimpleNamespace(**fraud_scoring.get_category_watermark(items[:2]))
+
+        with patch.object(
+            LeaderClusteringStrategy, "partial_fit", autospec=True, side_effect=LeaderClusteringStrategy.partial_fit
+        ) as partial_fit:
+            assert fraud_scoring.update_leader_state("Telefoane mobile", items, stored_watermark) >= n_leaders
+
+        state = LeaderClusteringStrategy.load(fraud_scoring.leader_state_path("Telefoane mobile"))
+
+    assert len(partial_fit.call_args.args[1]) == len(items) - 2
+    assert sum(state.counts) == len(items)
+
+
+def make_item_dict(name, closing_price):
+    return {
+        "_id": None, "name": name, "description": "", "unit_type": "buc", "quantity": 1,
+        "closing_price": closing_price, "cpv_code_id": 1, "cpv_code_text": "", "acquisition": None,
+    }
+
+
+def test_batch_scores_are_split_per_acquisition():
+    acquisitions = [
+        {"acquisition_id": 1, "items": [make_item_dict("Hartie A4", 10.0), make_item_dict("Toner HP", 20.0)]},
+        {"acquisition_id": 2, "items": []},
+        {"acquisition_id": 3, "items": [make_item_dict("Capsator", 30.0)]},
+    ]
+
+    with patch("decision_module.fraud_scoring.compute_fraud_scores_for_items", return_value=[10.0, 30.0, 50.0]) as mock_scores:
+        responses = fraud_scoring.compute_fraud_scores_for_acquisitions(acquisitions)
+
+    # toate item-urile sunt calculate intr-un singur lot
+    assert [item.name for item in mock_scores.call_args[0][0]] == ["Hartie A4", "Toner HP", "Capsator"]
+    assert responses == [
+        {"fraud_score": 20.0, "fraud_score_per_item": {"Hartie A4": 10.0, "Toner HP": 30.0}},
+        {"fraud_score": 0, "fraud_score_per_item": {}},
+        {"fraud_score": 50.0, "fraud_score_per_item": {"Capsator": 50.0}},
+    ]
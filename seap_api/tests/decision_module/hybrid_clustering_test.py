@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from decision_module.AbstractBaseClasses.BaseClusteringTemplate import BaseClusteringTemplate
+from decision_module.Algorithms.AgglomerativeClusteringStrategy import (
+    AgglomerativeClusteringStrategy,
+)
+from decision_module.ClusteringMethod.HybridClustering import HybridClustering
+from decision_module.ClusteringMethod.SimpleClustering import SimpleClustering
+from decision_module.utils.distance_matrix import DistanceSubmatrix
+
+
+@pytest.fixture
+def items(make_items):
+    names = [
+        "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB",
+        "Telefon mobil Xiaomi Redmi 13C, 4GB RAM, 128GB",
+        "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB",
+        "Telefon mobil Xiaomi Redmi Note 13, 8GB RAM, 256GB",
+        "Telefon mobil Samsung Galaxy A05, 4GB RAM, 64GB",
+        "Telefon mobil Samsung Galaxy A15, 4GB RAM, 128GB",
+        "Telefon mobil Samsung Galaxy A05, 4GB RAM, 64GB",
+        "Telefon mobil Samsung Galaxy S24, 8GB RAM, 256GB",
+        "TELEFON FIX OHO 5005",
+        "Telefon fix Panasonic KX-TS500",
+    ]
+    return make_items(names)
+
+
+def test_members_distance_matrix_matches_recomputed_one(items):
+    clustering = HybridClustering(items, AgglomerativeClusteringStrategy())
+    member_indices = [6, 0, 5, 4, 2, 3]
+
+    view = clustering.get_members_distance_matrix(member_indices)
+    recomputed = SimpleClustering(
+        [items[i] for i in member_indices], AgglomerativeClusteringStrategy()
+    ).distance_matrix
+
+    assert isinstance(view, DistanceSubmatrix)
+    assert np.array_equal(view.toarray(), recomputed.toarray())
+    assert np.array_equal(view.to_condensed(), recomputed.to_condensed())
+    assert np.array_equal(view.take_rows([2, 0]), recomputed.take_rows([2, 0]))
+
+
+def test_second_pass_does_not_recompute_distances(items, monkeypatch):
+    clustering = HybridClustering(items, AgglomerativeClusteringStrategy())
+
+    def fail(self, items):
+        raise AssertionError("distances recomputed")
+
+    monkeypatch.setattr(BaseClusteringTemplate, "get_distance_matrix", fail)
+    clusters = clustering.perform_clustering(2)
+
+    assert sorted(item.name for members in clusters.values() for item in members) == sorted(
+        item.name for item in items
+    )
+
+
+def test_concurrent_refinement_keeps_serial_order(items, monkeypatch):
+    from decision_module.ClusteringMethod import HybridClustering as hybrid_module
+
+    # strategie determinista in a doua trecere, ca rezultatele sa fie comparabile
+    monkeypatch.setattr(hybrid_module, "KMeansPlusPlusClusteringStrategy", AgglomerativeClusteringStrategy)
+    monkeypatch.setattr(hybrid_module, "MIN_PARALLEL_ITEMS", 2)
+
+    submitted = []
+    original_submit = hybrid_module.ProcessPoolExecutor.submit
+
+    def submit(executor, function, *args):
+        submitted.append(args)
+        return original_submit(executor, function, *args)
+
+    monkeypatch.setattr(hybrid_module.ProcessPoolExecutor, "submit", submit)
+
+    serial = HybridClustering(items, AgglomerativeClusteringStrategy()).perform_clustering(3)
+    concurrent = HybridClustering(items, AgglomerativeClusteringStrategy(), n_workers=2).perform_clustering(3)
+
+    assert len(submitted) == 2
+    assert len(serial) > 3
+    assert {
+        cluster_id: [item.name for item in members] for cluster_id, members in serial.items()
+    } == {cluster_id: [item.name for item in members] for cluster_id, members in concurrent.items()}
@@ -0,0 +1,91 @@
+import pytest
+from decision_module.Algorithms.AgglomerativeClusteringStrategy import (
+    AgglomerativeClusteringStrategy,
+)
+from decision_module.ClusteringMethod.SimpleClustering import SimpleClustering
+from decision_module.KSearch.CoarseToFineKSearch import CoarseToFineKSearch
+from decision_module.KSearch.EarlyStoppingKSearch import EarlyStoppingKSearch
+from decision_module.KSearch.GoldenSectionKSearch import GoldenSectionKSearch
+from decision_module.KSearch.LinearKSearch import LinearKSearch
+
+CANDIDATES = range(2, 301)
+
+
+def single_peak(peak):
+    def evaluate(n_clusters_list):
+        return [-abs(n_clusters - peak) for n_clusters in n_clusters_list]
+
+    return evaluate
+
+
+def test_linear_search_evaluates_every_value():
+    result = LinearKSearch().run(single_peak(57), CANDIDATES)
+
+    assert result.n_clusters == 57
+    assert result.n_fits == len(CANDIDATES)
+
+
+@pytest.mark.parametrize(
+    "policy",
+    [CoarseToFineKSearch(), CoarseToFineKSearch(n_points=3), GoldenSectionKSearch()],
+)
+@pytest.mark.parametrize("peak", [2, 57, 211, 300])
+def test_adaptive_search_finds_single_peak_with_fewer_fits(policy, peak):
+    result = policy.run(single_peak(peak), CANDIDATES)
+
+    assert result.n_clusters == peak
+    assert result.n_fits < len(CANDIDATES) / 3
+
+
+def test_early_stopping_after_patience_values_without_improvement():
+    result = EarlyStoppingKSearch(patience=5).run(single_peak(20), CANDIDATES)
+
+    assert result.n_clusters == 20
+    # ultimul lot de patience valori este evaluat complet
+    assert 25 <= max(result.scores) < 30
+
+
+def test_values_are_evaluated_only_once():
+    evaluated = []
+
+    def evaluate(n_clusters_list):
+        evaluated.extend(n_clusters_list)
+        return single_peak(40)(n_clusters_list)
+
+    result = GoldenSectionKSearch().run(evaluate, CANDIDATES)
+
+    assert len(evaluated) == len(set(evaluated)) == result.n_fits
+
+
+def test_ties_keep_the_smallest_number_of_clusters():
+    result = LinearKSearch().run(lambda n_clusters_list: [1.0] * len(n_clusters_list), CANDIDATES)
+
+    assert result.n_clusters == 2
+
+
+def test_empty_range_has_no_result():
+    assert LinearKSearch().run(single_peak(3), range(2, 2)).n_clusters is None
+
+
+def test_sample_indices():
+    policy = LinearKSearch(sample_size=10)
+
+    assert policy.sample_indices(10) is None
+    assert sorted(set(policy.sample_indices(100))) == list(policy.sample_indices(100))
+    assert len(policy.sample_indices(100)) == 10
+
+
+def test_template_reports_number_of_fits(make_items):
+    names = [f"Telefon mobil Model{i} {i}GB" for i in range(12)]
+    clustering = SimpleClustering(
+        make_items(names),
+        AgglomerativeClusteringStrategy(),
+        search_policy=EarlyStoppingKSearch(patience=2, sample_size=8),
+    )
+
+    n_clusters = clustering.find_optimal_clusters()
+
+    assert n_clusters == clustering.search_result.n_clusters
+    assert 0 < clustering.search_result.n_fits <= clustering.max_clusters - 1
+    assert clustering.find_optimal_clusters(search_policy=LinearKSearch()) is not None
+    assert clustering.search_result.n_fits == clustering.max_clusters - 1
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from decision_module.utils.blocking import TokenBlocking
+from decision_module.utils.distance_matrix import SparseDistanceMatrix, to_condensed
+from decision_module.utils.name_features import get_name_features, name_distance
+
+
+@pytest.fixture
+def name_features():
+    names = [
+        "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB",
+        "Telefon mobil Xiaomi Redmi 13C, 4GB RAM, 128GB",
+        "Telefon mobil Google Pixel 9 Pro, 128GB, 16GB RAM, 5G",
+        "Telefon mobil Google Pixel 9, 128GB, 8GB RAM",
+        "Telefon mobil Samsung Galaxy A05, 4GB RAM, 64GB",
+        "Telefon mobil Samsung Galaxy A15, 4GB RAM, 128GB",
+        "Telefon mobil Apple iPhone 15 Pro Max, 256GB",
+        "Telefon mobil Apple iPhone 15, 128GB",
+        "Telefon mobil Motorola Moto g24 Power, 256GB",
+        "Telefon mobil Nokia 105",
+    ]
+    return get_name_features(names)
+
+
+def test_frequent_tokens_are_left_out_of_the_index(name_features):
+    index = TokenBlocking(max_token_frequency=0.4).build_index(name_features)
+
+    assert "telefon" not in index
+    assert "ram" not in index
+    assert list(index["xiaomi"]) == [0, 1]
+
+
+def test_only_pairs_sharing_tokens_are_compared(name_features):
+    rows, cols = TokenBlocking(min_shared_tokens=2, max_token_frequency=0.5).candidate_pairs(
+        name_features
+    )
+    pairs = set(zip(rows.tolist(), cols.tolist()))
+
+    assert (0, 1) in pairs
+    assert (2, 3) in pairs
+    assert (0, 9) not in pairs
+    assert all(i < j for i, j in pairs)
+
+
+def test_sparse_distance_matrix_uses_fallback_distance(name_features):
+    blocking = TokenBlocking(max_token_frequency=0.5, fallback_distance=100)
+    sparse_matrix = blocking.get_distance_matrix(name_features, name_distance)
+    dense_matrix = np.asarray(sparse_matrix)
+
+    assert dense_matrix[0, 1] == name_distance(name_features[0], name_features[1])
+    assert dense_matrix[0, 9] == 100
+    assert np.array_equal(dense_matrix, dense_matrix.T)
+    assert np.array_equal(to_condensed(sparse_matrix), to_condensed(dense_matrix))
+
+
+def test_default_fallback_is_larger_than_computed_distances(name_features):
+    sparse_matrix = TokenBlocking(max_token_frequency=0.5).get_distance_matrix(
+        name_features, name_distance
+    )
+
+    assert sparse_matrix.fallback_distance == sparse_matrix.distances.max() + 1
+
+
+def test_sparse_rows_are_read_through_the_row_pointer(name_features):
+    sparse_matrix = TokenBlocking(max_token_frequency=0.5).get_distance_matrix(name_features, name_distance)
+    dense_matrix = sparse_matrix.toarray()
+
+    rows = [9, 0, 3, 3]
+    assert np.array_equal(sparse_matrix.take_rows(rows), dense_matrix[rows])
+    assert sparse_matrix.indptr[-1] == 2 * len(sparse_matrix.distances)
+
+
+def test_sparse_condensed_form_is_compact(name_features):
+    sparse_matrix = TokenBlocking(max_token_frequency=0.5).get_distance_matrix(name_features, name_distance)
+
+    assert to_condensed(sparse_matrix).dtype == np.uint16
+    assert SparseDistanceMatrix(3, [0], [1], [0.5], 2.0).to_condensed().dtype == np.float64
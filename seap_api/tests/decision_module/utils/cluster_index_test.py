@@ -0,0 +1,127 @@
+import random
+from types import SimpleNamespace
+
+import Levenshtein
+import pytest
+from decision_module.utils.cluster_index import BKTree, ClusterIndex
+
+NAMES = [
+    "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB, Midnight Black",
+    "Telefon mobil Google Pixel 9 Pro, 128GB, 16GB RAM, 5G, Obsidian",
+    "Telefon Mobil Samsung Galaxy A05, 4GB RAM, 64GB, (Negru/Non-Eu)",
+    "TELEFON FIX OHO 5005",
+    "Smartphone Motorola Moto g24 Power 256GB 8GB RAM Dual SIM Ink Blue",
+]
+
+
+def make_cluster(cluster_id, names):
+    members = [SimpleNamespace(name=name) for name in names]
+    return SimpleNamespace(id=cluster_id, core_point=members[0], list_of_items=members)
+
+
+@pytest.fixture
+def cluster_index():
+    return ClusterIndex(
+        [make_cluster(0, NAMES[:1] + NAMES[4:]), make_cluster(1, NAMES[1:3]), make_cluster(2, NAMES[3:4])],
+        version=7,
+    )
+
+
+def test_nearest_matches_a_linear_scan():
+    generator = random.Random(0)
+    keys = ["".join(generator.choice("abc") for _ in range(generator.randint(1, 8))) for _ in range(300)]
+    tree = BKTree()
+    for position, key in enumerate(keys):
+        tree.add(key, position)
+
+    for _ in range(50):
+        query = "".join(generator.choice("abcd") for _ in range(generator.randint(1, 8)))
+        expected = min((Levenshtein.distance(query, key), position) for position, key in enumerate(keys))
+        assert tree.nearest(query) == expected
+
+
+def test_removed_values_are_not_returned():
+    tree = BKTree()
+    for position, key in enumerate(["abc", "abd", "xyz"]):
+        tree.add(key, position)
+
+    tree.remove("abc", 0)
+
+    assert tree.nearest("abc") == (1, 1)
+    assert BKTree().nearest("abc") == (None, None)
+
+
+def test_exact_lookup_uses_the_normalized_name(cluster_index):
+    assert cluster_index.find_by_name(NAMES[2].upper()).id == 1
+    assert cluster_index.find_by_name("Telefon mobil Nokia 105") is None
+
+
+def test_nearest_cluster_and_radius(cluster_index):
+    cluster, distance, radius = cluster_index.nearest("Telefon mobil Google Pixel 9 Pro, 128GB, 16GB RAM, Obsidian")
+
+    assert cluster.id == 1
+    assert distance == Levenshtein.distance("telefon mobil google pixel 9 pro, 128gb, 16gb ram, obsidian", NAMES[1].lower())
+    assert radius == Levenshtein.distance(NAMES[1].lower(), NAMES[2].lower())
+
+
+def test_updated_cluster_moves_in_the_tree(cluster_index):
+    cluster = make_cluster(2, ["Telefon fix Panasonic KX-TG", NAMES[3]])
+
+    cluster_index.update_cluster(cluster)
+
+    assert cluster_index.nearest("telefon fix panasonic kx-tg")[:2] == (cluster, 0)
+    assert cluster_index.find_by_name("Telefon fix Panasonic KX-TG") is cluster
+    assert len(cluster_index) == 3
+
+
+def test_stored_radius_is_used(cluster_index):
+    cluster = make_cluster(3, ["Telefon mobil Nokia 105", "Telefon mobil Nokia 106"])
+    cluster.stats = SimpleNamespace(radius=5)
+
+    cluster_index.add_cluster(cluster)
+
+    assert cluster_index.nearest("Telefon mobil Nokia 105")[1:] == (0, 5)
+
+
+def test_own_writes_keep_the_index_current(cluster_index):
+    cluster_index.advance_version(8)
+    assert cluster_index.version == 8
+
+    # o alta versiune decat urmatoarea: a scris si alt proces
+    cluster_index.advance_version(10)
+    assert cluster_index.version is None
+    assert cluster_index.synced_version == 8
+    cluster_index.advance_version(11)
+    assert cluster_index.version is None
+
+
+def test_refresh_applies_the_written_clusters(cluster_index):
+    cluster_index.advance_version(9)
+    assert cluster_index.version is None
+
+    cluster = make_cluster(5, ["Telefon mobil Nokia 105"])
+    cluster_index.refresh([cluster], 12)
+
+    assert cluster_index.version == cluster_index.synced_version == 12
+    assert cluster_index.find_by_name("Telefon mobil Nokia 105") is cluster
+
+
+def test_load_replaces_the_content_in_place(cluster_index):
+    cluster = make_cluster(5, ["Telefon mobil Nokia 105"])
+
+    cluster_index.load([cluster], 12)
+
+    assert len(cluster_index) == 1
+    assert cluster_index.version == 12
+    assert cluster_index.find_by_name(NAMES[2]) is None
+    assert cluster_index.nearest("Telefon mobil Nokia 106")[0] is cluster
+
+
+def test_nearest_searches_only_the_clusters_of_the_category(cluster_index):
+    cluster = make_cluster(3, ["Telefon mobil Nokia 105"])
+    cluster.category = "Telefoane mobile"
+    cluster_index.add_cluster(cluster)
+
+    assert cluster_index.nearest("Telefon mobil Nokia 106", "Telefoane mobile")[:2] == (cluster, 1)
+    assert cluster_index.nearest("Telefon mobil Nokia 106")[0] is not cluster
+    assert cluster_index.nearest("Telefon mobil Nokia 106", "Papetarie") == (None, None, None)
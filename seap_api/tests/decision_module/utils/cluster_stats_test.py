@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+import numpy as np
+from decision_module.utils.cluster_stats import (
+    PRICE_QUANTILES,
+    get_cluster_stats,
+    get_price_stats,
+    get_unit_prices,
+)
+
+
+def make_item(name, closing_price, quantity):
+    return SimpleNamespace(name=name, closing_price=closing_price, quantity=quantity)
+
+
+def test_unit_prices_are_zero_for_zero_quantities():
+    items = [make_item("a", 100, 4), make_item("b", 50, 0), make_item("c", 30, 3)]
+
+    assert list(get_unit_prices(items)) == [25, 0, 10]
+
+
+def test_price_stats():
+    stats = get_price_stats([10, 12, 11, 13, 100])
+
+    assert stats["price_median"] == 12
+    assert stats["price_mad"] == 1
+    assert np.allclose(stats["price_quantiles"], np.quantile([10, 12, 11, 13, 100], PRICE_QUANTILES))
+    assert get_price_stats([])["price_median"] == 0
+
+
+def test_cluster_stats():
+    members = [make_item("Telefon Nokia", 100, 1), make_item("Telefon Nokia 105", 120, 1), make_item("Telefon", 90, 1)]
+
+    stats = get_cluster_stats(members[0], members)
+
+    assert stats["size"] == 3
+    assert stats["radius"] == 6
+    assert stats["price_median"] == 100
+    assert get_cluster_stats(members[0], members, radius=2)["radius"] == 2
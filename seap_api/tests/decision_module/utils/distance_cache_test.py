@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pytest
+from decision_module.utils.distance_cache import DistanceCache
+from decision_module.utils.distance_matrix import build_distance_matrix
+from decision_module.utils.name_features import get_name_features, name_distance
+
+
+@pytest.fixture
+def names():
+    return [
+        "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB",
+        "Telefon mobil Xiaomi Redmi 13C, 4GB RAM, 128GB",
+        "Telefon mobil Google Pixel 9 Pro, 128GB, 16GB RAM, 5G",
+        "Telefon mobil Google Pixel 9, 128GB, 8GB RAM",
+        "Telefon mobil Samsung Galaxy A05, 4GB RAM, 64GB",
+        "Telefon mobil Samsung Galaxy A15, 4GB RAM, 128GB",
+        "Telefon mobil Apple iPhone 15 Pro Max, 256GB",
+        "Telefon mobil Apple iPhone 15, 128GB",
+        "Telefon mobil Motorola Moto g24 Power, 256GB",
+        "Telefon mobil Nokia 105",
+    ]
+
+
+def counting_metric(calls):
+    def metric(first, second):
+        calls.append((first.normalized, second.normalized))
+        return name_distance(first, second)
+
+    return metric
+
+
+def test_first_run_matches_fresh_build(tmp_path, names):
+    features = get_name_features(names)
+    matrix = DistanceCache(str(tmp_path), "Telefoane").get_distance_matrix(features, name_distance)
+
+    assert np.array_equal(matrix.toarray(), build_distance_matrix(features, name_distance))
+
+
+def test_second_run_only_computes_new_names(tmp_path, names):
+    cache = DistanceCache(str(tmp_path), "Telefoane")
+    cache.get_distance_matrix(get_name_features(names[:7]), name_distance)
+
+    calls = []
+    features = get_name_features(names[3:] + names[:2])
+    matrix = cache.get_distance_matrix(features, counting_metric(calls))
+
+    new_names = {feature.normalized for feature in get_name_features(names[7:])}
+    assert calls
+    assert all(first in new_names for first, _ in calls)
+    assert np.array_equal(matrix.toarray(), build_distance_matrix(features, name_distance))
+
+
+def test_missing_names_are_evicted(tmp_path, names):
+    cache = DistanceCache(str(tmp_path), "Telefoane")
+    cache.get_distance_matrix(get_name_features(names), name_distance)
+    cache.get_distance_matrix(get_name_features(names[:5]), name_distance)
+
+    cached_names, _, run, distances = cache.load()
+
+    assert run == 2
+    assert len(cached_names) == 5
+    assert len(distances) == 10
+    assert sorted(os.listdir(cache.directory)) == ["distances_2.npy", "manifest.json"]
+
+
+def test_idle_names_are_kept_for_max_idle_runs(tmp_path, names):
+    cache = DistanceCache(str(tmp_path), "Telefoane", max_idle_runs=1)
+    cache.get_distance_matrix(get_name_features(names), name_distance)
+    cache.get_distance_matrix(get_name_features(names[:5]), name_distance)
+
+    assert len(cache.load()[0]) == len(names)
+
+    cache.get_distance_matrix(get_name_features(names[:5]), name_distance)
+
+    assert len(cache.load()[0]) == 5
+
+
+def test_missing_distances_file_rebuilds_the_cache(tmp_path, names):
+    cache = DistanceCache(str(tmp_path), "Telefoane")
+    cache.get_distance_matrix(get_name_features(names), name_distance)
+    os.remove(cache.distances_path(cache.load()[2]))
+
+    calls = []
+    features = get_name_features(names)
+    matrix = cache.get_distance_matrix(features, counting_metric(calls))
+
+    assert len(calls) == len(names) * (len(names) - 1) // 2
+    assert np.array_equal(matrix.toarray(), build_distance_matrix(features, name_distance))
+
+
+def test_cache_of_another_metric_version_is_discarded(tmp_path, names):
+    features = get_name_features(names)
+    DistanceCache(str(tmp_path), "Telefoane", version=1).get_distance_matrix(features, name_distance)
+
+    calls = []
+    cache = DistanceCache(str(tmp_path), "Telefoane", version=2)
+    cache.get_distance_matrix(features, counting_metric(calls))
+
+    # toate perechile sunt calculate din nou, iar distantele vechi sunt sterse
+    assert len(calls) == len(names) * (len(names) - 1) // 2
+    assert sorted(os.listdir(cache.directory)) == ["distances_2.npy", "manifest.json"]
@@ -0,0 +1,124 @@
+import os
+
+import numpy as np
+import pytest
+from decision_module.utils import distance_matrix
+from decision_module.utils.distance_matrix import (
+    CondensedDistanceMatrix,
+    build_distance_matrix,
+    calinski_harabasz,
+    iter_row_blocks,
+    price_distance,
+    similarity_matrix,
+    split_upper_triangle,
+)
+from sklearn.metrics import calinski_harabasz_score
+from decision_module.utils.name_features import get_name_features, name_distance
+
+
+@pytest.fixture
+def name_features():
+    names = [
+        "Smartphone Xiaomi Redmi 13C 256GB 8GB RAM Dual SIM Midnight Black",
+        "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB, Midnight Black",
+        "Telefon mobil Google Pixel 9 Pro, 128GB, 16GB RAM, 5G, Obsidian",
+        "Telefon Mobil Samsung Galaxy A05, 4GB RAM, 64GB, (Negru/Non-Eu)",
+        "TELEFON FIX OHO 5005",
+        "Smartphone Motorola Moto g24 Power 256GB 8GB RAM Dual SIM Ink Blue",
+    ]
+    return get_name_features(names * 3)
+
+
+def test_split_upper_triangle_covers_all_rows():
+    blocks = split_upper_triangle(50, 7)
+
+    assert blocks[0][0] == 0
+    assert blocks[-1][1] == 50
+    for (_, end), (start, _) in zip(blocks, blocks[1:]):
+        assert end == start
+
+
+def test_serial_distance_matrix_is_symmetric(name_features):
+    matrix = build_distance_matrix(name_features, name_distance)
+
+    assert matrix.shape == (len(name_features), len(name_features))
+    assert np.array_equal(matrix, matrix.T)
+    assert not np.any(np.diag(matrix))
+
+
+def test_parallel_distance_matrix_matches_serial(name_features, monkeypatch):
+    monkeypatch.setattr(distance_matrix, "MIN_PARALLEL_ITEMS", 2)
+
+    serial = build_distance_matrix(name_features, name_distance)
+    parallel = build_distance_matrix(name_features, name_distance, n_workers=2)
+
+    assert np.array_equal(serial, parallel)
+
+
+def test_price_distance_matrix():
+    matrix = build_distance_matrix([10.0, 12.5, 7.0], price_distance)
+
+    assert matrix[0, 1] == 2.5
+    assert matrix[2, 1] == 5.5
+
+
+def test_condensed_distance_matrix_matches_dense(name_features):
+    dense = build_distance_matrix(name_features, name_distance)
+    condensed = CondensedDistanceMatrix.build(name_features, name_distance, dtype=np.uint16)
+
+    assert condensed.shape == dense.shape
+    assert condensed.data.nbytes < dense.nbytes / 4
+    assert np.array_equal(condensed.toarray(), dense)
+    assert np.array_equal(condensed.take_rows([5, 0, 17]), dense[[5, 0, 17]])
+    assert np.array_equal(condensed.row_sums(), dense.sum(axis=1))
+
+
+def test_condensed_distance_matrix_spills_to_memmap(name_features):
+    dense = build_distance_matrix(name_features, name_distance)
+    condensed = CondensedDistanceMatrix.build(
+        name_features, name_distance, dtype=np.uint16, spill_threshold=16
+    )
+    path = condensed.path
+
+    assert isinstance(condensed.data, np.memmap)
+    assert np.array_equal(condensed.toarray(), dense)
+
+    del condensed
+    assert not os.path.exists(path)
+
+
+def test_calinski_harabasz_reads_condensed_matrix_in_blocks(name_features, monkeypatch):
+    dense = build_distance_matrix(name_features, name_distance)
+    condensed = CondensedDistanceMatrix.build(name_features, name_distance, dtype=np.uint16)
+    labels = np.arange(len(name_features)) % 4
+
+    monkeypatch.setattr(distance_matrix, "ROW_BLOCK_ELEMENTS", len(name_features) * 5)
+    # blocuri de 5 randuri: un cluster incepe intr-un bloc si continua in urmatorul
+    assert [end - start for start, end, _ in iter_row_blocks(condensed)] == [5, 5, 5, 3]
+
+    assert calinski_harabasz(condensed, labels) == pytest.approx(
+        calinski_harabasz_score(dense, labels)
+    )
+
+
+def test_weighted_calinski_harabasz_scores_the_duplicated_points(name_features):
+    unique_features = name_features[:6]
+    condensed = CondensedDistanceMatrix.build(unique_features, name_distance, dtype=np.uint16)
+    weights = np.array([3, 1, 2, 1, 1, 2])
+    labels = np.array([0, 0, 1, 1, 2, 0])
+    duplicated = np.repeat(np.arange(6), weights)
+
+    expected = calinski_harabasz_score(condensed.toarray()[np.ix_(duplicated, duplicated)], labels[duplicated])
+
+    assert calinski_harabasz(condensed, labels, weights) == pytest.approx(expected)
+    assert calinski_harabasz(condensed.toarray(), labels, weights) == pytest.approx(expected)
+
+
+def test_similarity_matrix(name_features):
+    dense = build_distance_matrix(name_features, name_distance)
+    condensed = CondensedDistanceMatrix.build(name_features, name_distance, dtype=np.uint16)
+
+    expected = 1 / (1 + dense)
+    np.fill_diagonal(expected, 0)
+
+    assert np.allclose(similarity_matrix(condensed), expected)
@@ -0,0 +1,83 @@
+import pickle
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from decision_module.Algorithms.AgglomerativeClusteringStrategy import (
+    AgglomerativeClusteringStrategy,
+)
+from decision_module.Algorithms.KMeansPlusPlusClusteringStrategy import (
+    KMeansPlusPlusClusteringStrategy,
+)
+from decision_module.ClusteringMethod.SimpleClustering import SimpleClustering
+from decision_module.utils import k_evaluation
+from decision_module.utils.distance_matrix import CondensedDistanceMatrix
+from decision_module.utils.k_evaluation import KEvaluator, score_clustering
+from decision_module.utils.name_features import get_name_features, name_distance
+
+NAMES = [
+    f"Telefon mobil {brand} {model}, {memory}GB RAM"
+    for brand, model in [("Xiaomi", "Redmi 13C"), ("Samsung", "Galaxy A05"), ("Google", "Pixel 9")]
+    for memory in (4, 8, 16, 32)
+]
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    monkeypatch.setattr(k_evaluation, "MIN_PARALLEL_ITEMS", 2)
+
+
+def test_degenerate_labels_get_the_lowest_score():
+    distance_matrix = np.ones((3, 3)) - np.eye(3)
+
+    assert score_clustering(distance_matrix, [0, 0, 0]) == float("-inf")
+    assert score_clustering(distance_matrix, [0, 1, 2]) == float("-inf")
+
+
+@pytest.mark.parametrize("spill_threshold", [2 ** 30, 8])
+def test_parallel_scores_match_serial(parallel, spill_threshold):
+    distance_matrix = CondensedDistanceMatrix.build(
+        get_name_features(NAMES), name_distance, dtype=np.uint16, spill_threshold=spill_threshold
+    )
+    n_clusters_list = list(range(2, len(NAMES)))
+
+    serial = KEvaluator(AgglomerativeClusteringStrategy(), distance_matrix).evaluate(n_clusters_list)
+    with KEvaluator(AgglomerativeClusteringStrategy(), distance_matrix, n_workers=2) as evaluator:
+        assert evaluator.executor is not None
+        assert evaluator.evaluate(n_clusters_list) == serial
+
+
+def test_parallel_kmeans_scores_match_serial(parallel):
+    distance_matrix = CondensedDistanceMatrix.build(get_name_features(NAMES), name_distance, dtype=np.uint16)
+    n_clusters_list = list(range(2, len(NAMES)))
+
+    serial = KEvaluator(KMeansPlusPlusClusteringStrategy(random_state=0), distance_matrix).evaluate(n_clusters_list)
+    with KEvaluator(KMeansPlusPlusClusteringStrategy(random_state=0), distance_matrix, n_workers=4) as evaluator:
+        assert evaluator.evaluate(n_clusters_list) == serial
+
+
+def test_parallel_sweep_selects_the_same_number_of_clusters(parallel, make_items):
+    items = make_items(NAMES)
+
+    serial = SimpleClustering(items, AgglomerativeClusteringStrategy())
+    parallel_clustering = SimpleClustering(items, AgglomerativeClusteringStrategy(), n_workers=2)
+
+    assert serial.find_optimal_clusters() == parallel_clustering.find_optimal_clusters()
+    assert serial.search_result.scores == parallel_clustering.search_result.scores
+
+
+def test_workers_get_the_tree_built_once():
+    distance_matrix = CondensedDistanceMatrix.build(
+        get_name_features(NAMES), name_distance, dtype=np.uint16
+    )
+    strategy = AgglomerativeClusteringStrategy()
+    # strategia ajunge in workeri prin pickle, cu arborele gata construit
+    worker_strategy = pickle.loads(pickle.dumps(strategy.for_workers(distance_matrix)))
+
+    with patch(
+        "decision_module.Algorithms.AgglomerativeClusteringStrategy.average_linkage"
+    ) as mock_linkage:
+        labels = worker_strategy.cluster(distance_matrix, 4)
+
+    mock_linkage.assert_not_called()
+    assert np.array_equal(labels, strategy.cluster(distance_matrix, 4))
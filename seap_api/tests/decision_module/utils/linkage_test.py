@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from scipy.cluster.hierarchy import linkage
+from scipy.spatial.distance import squareform
+
+from decision_module.utils.distance_matrix import SparseDistanceMatrix, to_condensed
+from decision_module.utils.linkage import average_linkage, nn_chain_average
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_unit_weights_give_the_scipy_tree(seed):
+    rng = np.random.default_rng(seed)
+    # distante intregi, cu multe egalitati
+    condensed = rng.integers(0, 6, size=30 * 29 // 2).astype(float)
+
+    np.testing.assert_array_equal(average_linkage(squareform(condensed)), linkage(condensed, "average"))
+
+
+def test_weights_merge_at_the_average_over_the_duplicates():
+    distance_matrix = np.array([[0, 1, 4], [1, 0, 2], [4, 2, 0]], dtype=float)
+
+    tree = average_linkage(distance_matrix, sample_weight=[3, 1, 1])
+
+    np.testing.assert_array_equal(tree[:, :2], [[0, 1], [2, 3]])
+    # (3 * 4 + 1 * 2) / 4
+    assert tree[1, 2] == pytest.approx(3.5)
+    np.testing.assert_array_equal(tree[:, 3], [2, 3])
+
+
+def test_fewer_than_two_points_give_an_empty_tree():
+    assert average_linkage(np.zeros((1, 1))).shape == (0, 4)
+
+
+def test_sparse_matrix_is_linked_per_component():
+    rng = np.random.default_rng(0)
+    rows, cols = np.triu_indices(12, k=1)
+    # doua grupuri de puncte comparate doar intre ele
+    compared = (rows < 6) == (cols < 6)
+    sparse_matrix = SparseDistanceMatrix(
+        12, rows[compared], cols[compared], rng.random(compared.sum()) * 5, fallback_distance=6
+    )
+
+    with patch("decision_module.utils.linkage.nn_chain_average", wraps=nn_chain_average) as mock_chain:
+        tree = average_linkage(sparse_matrix)
+
+    # fiecare componenta este legata separat, pe o matrice de 6 puncte
+    assert [call.args[1] for call in mock_chain.call_args_list] == [6, 6]
+    np.testing.assert_allclose(tree, linkage(to_condensed(sparse_matrix.toarray()), "average"))
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from decision_module.utils.distance_matrix import CondensedDistanceMatrix, build_distance_matrix
+from decision_module.utils.medoid import add_member_distances, medoid_distance_sums
+from decision_module.utils.name_features import get_name_features, name_distance
+
+NAMES = [
+    "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB, Midnight Black",
+    "Smartphone Xiaomi Redmi 13C 256GB 8GB RAM Dual SIM Midnight Black",
+    "Telefon mobil Google Pixel 9 Pro, 128GB, 16GB RAM, 5G, Obsidian",
+    "Telefon Mobil Samsung Galaxy A05, 4GB RAM, 64GB, (Negru/Non-Eu)",
+    "TELEFON FIX OHO 5005",
+]
+
+
+@pytest.fixture
+def distance_matrix():
+    return build_distance_matrix(get_name_features(NAMES), name_distance)
+
+
+def test_sums_are_weighted_row_sums_of_the_submatrix(distance_matrix):
+    indices = [4, 0, 2]
+    weights = [1, 3, 2]
+
+    expected = distance_matrix[np.ix_(indices, indices)] @ weights
+    condensed = CondensedDistanceMatrix.build(get_name_features(NAMES), name_distance)
+
+    assert np.allclose(medoid_distance_sums(distance_matrix, indices, weights), expected)
+    assert np.allclose(medoid_distance_sums(condensed, indices, weights), expected)
+
+
+def test_incremental_sums_match_a_full_recomputation(distance_matrix):
+    distance_sums = medoid_distance_sums(distance_matrix, range(3))
+
+    for new_member in range(3, len(NAMES)):
+        distance_sums = add_member_distances(distance_sums, distance_matrix[new_member, :new_member])
+
+    assert np.allclose(distance_sums, distance_matrix.sum(axis=1))
@@ -0,0 +1,53 @@
+import pytest
+from decision_module.utils.name_features import (
+    compare_features,
+    get_name_features,
+    name_distance,
+    normalize_string,
+)
+
+
+@pytest.fixture
+def phone_names():
+    return [
+        "Smartphone Xiaomi Redmi 13C 256GB 8GB RAM Dual SIM Midnight Black",
+        "Telefon mobil Xiaomi Redmi 13C, 8GB RAM, 256GB, Midnight Black",
+        "Telefon mobil Google Pixel 9 Pro, 128GB, 16GB RAM, 5G, Obsidian",
+        "Telefon Mobil Xiaomi Redmi 13C, Procesor Mediatek MT6769Z Helio G85",
+    ]
+
+
+def test_normalize_string_replaces_synonyms_and_removes_colour():
+    assert normalize_string("telefon mobil xiaomi redmi 13c, 8gb ram, 256gb, midnight black") == \
+        "telefon xiaomi redmi 13c 8gb ram 256gb"
+    assert normalize_string("smartphone motorola, ink blue") == "telefon motorola"
+
+
+def test_get_name_features_keeps_sorted_tokens(phone_names):
+    features = get_name_features(phone_names)
+
+    assert len(features) == len(phone_names)
+    for feature in features:
+        assert feature.sorted_tokens == sorted(set(feature.normalized.split()))
+        assert feature.token_set == set(feature.normalized.split())
+
+
+def test_compare_features_prefix_match():
+    first, second = get_name_features(["Telefon mobil Xiaomi", "Telefon mobil Xiaomi Redmi"])
+
+    assert compare_features(first, second) == ("telefon xiaomi", "telefon xiaomi")
+    assert name_distance(first, second) == 0
+
+
+def test_name_distance_is_symmetric(phone_names):
+    features = get_name_features(phone_names)
+
+    for first in features:
+        for second in features:
+            assert name_distance(first, second) == name_distance(second, first)
+
+
+def test_same_model_is_closer_than_other_model(phone_names):
+    features = get_name_features(phone_names)
+
+    assert name_distance(features[0], features[1]) < name_distance(features[0], features[2])